@@ -0,0 +1,227 @@
+# admission/limits.py
+
+import asyncio
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+
+from telemetry.metrics import (
+    ADMISSION_ACTIVE,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_WAIT_SECONDS,
+    ADMISSION_REJECTED,
+)
+
+# ============================================================
+# Admission Control (per worker process)
+#
+# Every stage has a concurrency limit, a bounded wait queue and a
+# wait timeout. When the queue is full, work is rejected immediately
+# (429); when a slot does not free up in time it is rejected after the
+# timeout (503). Both carry a Retry-After estimated from recent slot
+# hold times, so overload degrades predictably instead of exhausting
+# memory or the LLM provider's rate limit.
+#
+# Configure with LIMIT_<STAGE>_CONCURRENCY / _QUEUE / _TIMEOUT_S.
+# ============================================================
+STAGE_DEFAULTS = {
+    # stage: (concurrency, queue, timeout seconds)
+    "requests": (8, 32, 30),
+    "ingest": (2, 16, 60),
+    "engines": (4, 32, 30),
+    "custom_query": (4, 16, 10),
+    "llm": (8, 32, 30),
+}
+
+
+def _stage_config(stage):
+    concurrency, queue, timeout = STAGE_DEFAULTS[stage]
+    prefix = f"LIMIT_{stage.upper()}"
+    return (
+        int(os.getenv(f"{prefix}_CONCURRENCY", concurrency)),
+        int(os.getenv(f"{prefix}_QUEUE", queue)),
+        float(os.getenv(f"{prefix}_TIMEOUT_S", timeout)),
+    )
+
+
+class Overloaded(Exception):
+    """
+    Raised when a stage turns work away. status is 429 (queue full)
+    or 503 (timed out waiting); retry_after is in seconds.
+    """
+
+    def __init__(self, stage, status, retry_after, reason):
+        super().__init__(f"Server busy ({stage}: {reason}), retry in {retry_after}s")
+        self.stage = stage
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class _Limiter:
+    def __init__(self, stage, concurrency=None, max_queue=None, timeout=None):
+        default_concurrency, default_queue, default_timeout = _stage_config(stage)
+        self.stage = stage
+        self.concurrency = default_concurrency if concurrency is None else concurrency
+        self.max_queue = default_queue if max_queue is None else max_queue
+        self.timeout = default_timeout if timeout is None else timeout
+
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._hold_ewma = 1.0
+        self._stats_lock = threading.Lock()
+
+    def retry_after(self):
+        """
+        Seconds until the current backlog should have drained.
+        """
+        backlog = (self.waiting + self.active) / max(self.concurrency, 1)
+        return max(1, math.ceil(self._hold_ewma * backlog))
+
+    def _reject(self, reason):
+        status = 429 if reason == "queue_full" else 503
+        ADMISSION_REJECTED.inc(stage=self.stage, reason=reason)
+        with self._stats_lock:
+            self.rejected += 1
+        raise Overloaded(self.stage, status, self.retry_after(), reason)
+
+    def _enqueue(self):
+        with self._stats_lock:
+            if self.waiting >= self.max_queue and self.active >= self.concurrency:
+                full = True
+            else:
+                full = False
+                self.waiting += 1
+        if full:
+            self._reject("queue_full")
+        ADMISSION_QUEUE_DEPTH.inc(stage=self.stage)
+
+    def _dequeue(self, admitted, waited):
+        ADMISSION_QUEUE_DEPTH.dec(stage=self.stage)
+        ADMISSION_WAIT_SECONDS.observe(waited, stage=self.stage)
+        with self._stats_lock:
+            self.waiting -= 1
+            if admitted:
+                self.active += 1
+        if admitted:
+            ADMISSION_ACTIVE.inc(stage=self.stage)
+
+    def _release(self, held):
+        ADMISSION_ACTIVE.dec(stage=self.stage)
+        with self._stats_lock:
+            self.active -= 1
+            self._hold_ewma = 0.8 * self._hold_ewma + 0.2 * held
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "timeout_s": self.timeout,
+                "active": self.active,
+                "waiting": self.waiting,
+                "rejected": self.rejected,
+            }
+
+
+class StageLimiter(_Limiter):
+    """
+    Thread-side limiter for work running in worker threads
+    (CSV ingest, engine nodes, generated-code eval, LLM calls).
+    """
+
+    def __init__(self, stage, **kwargs):
+        super().__init__(stage, **kwargs)
+        self._semaphore = threading.BoundedSemaphore(self.concurrency)
+
+    @contextmanager
+    def slot(self):
+        self._enqueue()
+        start = time.perf_counter()
+        admitted = self._semaphore.acquire(timeout=self.timeout)
+        self._dequeue(admitted, time.perf_counter() - start)
+        if not admitted:
+            self._reject("timeout")
+
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            self._release(time.perf_counter() - held_from)
+
+
+class RequestLimiter(_Limiter):
+    """
+    Event-loop-side limiter for whole requests, checked before the
+    upload body is read so rejections cost almost nothing.
+    """
+
+    def __init__(self, stage="requests", **kwargs):
+        super().__init__(stage, **kwargs)
+        self._semaphore = None
+
+    def _sem(self):
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        semaphore = self._sem()
+        self._enqueue()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.timeout)
+            admitted = True
+        except asyncio.TimeoutError:
+            admitted = False
+        except BaseException:
+            # Client went away while queued
+            self._dequeue(False, time.perf_counter() - start)
+            raise
+        self._dequeue(admitted, time.perf_counter() - start)
+        if not admitted:
+            self._reject("timeout")
+
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            semaphore.release()
+            self._release(time.perf_counter() - held_from)
+
+
+# ============================================================
+# Per-process Limiters
+# ============================================================
+request_limiter = RequestLimiter()
+
+STAGE_LIMITERS = {
+    stage: StageLimiter(stage)
+    for stage in STAGE_DEFAULTS
+    if stage != "requests"
+}
+
+
+def stage_slot(stage):
+    return STAGE_LIMITERS[stage].slot()
+
+
+async def request_slot():
+    """
+    FastAPI dependency: holds a "requests" slot for the whole handler.
+    """
+    async with request_limiter.slot():
+        yield
+
+
+def admission_stats():
+    return {
+        "requests": request_limiter.stats(),
+        **{stage: limiter.stats() for stage, limiter in STAGE_LIMITERS.items()},
+    }
@@ -1,17 +1,13 @@
 # ai/ai_summary.py
 
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
+from ai.llm_client import get_llm_client
+from telemetry.metrics import timed
 
 
 # =========================================================
 # Prompt Builder (Executive, Deterministic)
 # =========================================================
+@timed("prompt_build")
 def build_ai_prompt(trend_results, anomaly_results, analysis_week):
     """
     Builds a senior, decision-oriented AI prompt for an executive weekly performance review.
@@ -163,8 +159,9 @@ CEO Question (answer explicitly):
 # =========================================================
 # AI Summary Generator
 # =========================================================
+@timed("llm.executive_summary")
 def generate_ai_summary(prompt):
-    response = client.chat.completions.create(
+    response = get_llm_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.2,
@@ -0,0 +1,101 @@
+# ai/llm_client.py
+
+import os
+import threading
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+from admission.limits import stage_slot
+
+load_dotenv(encoding="utf-8")
+
+# "openai" (default) or "local" (ai/local_llm.py stand-in for load tests)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
+
+
+# =========================================================
+# Concurrency-limited Wrapper
+# =========================================================
+class _LimitedCompletions:
+    def __init__(self, completions):
+        self._completions = completions
+
+    def create(self, **kwargs):
+        # Bounded per process: bursts queue (or get Overloaded) here
+        # instead of tripping the provider's rate limit
+        with stage_slot("llm"):
+            return self._completions.create(**kwargs)
+
+
+class LimitedLLMClient:
+    """
+    Wraps a chat-completions client so every call holds an "llm"
+    admission slot (admission/limits.py).
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self.chat = SimpleNamespace(completions=_LimitedCompletions(client.chat.completions))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# =========================================================
+# Chat Completions Client Factory
+# =========================================================
+def create_llm_client(provider=None):
+    """
+    Returns an object exposing chat.completions.create(...) for the
+    configured provider.
+    """
+    provider = (provider or LLM_PROVIDER).lower()
+
+    if provider == "local":
+        from ai.local_llm import LocalLLMClient
+
+        return LimitedLLMClient(LocalLLMClient())
+
+    if provider == "openai":
+        from openai import OpenAI
+
+        return LimitedLLMClient(OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+
+    raise ValueError(f"Unknown LLM_PROVIDER '{provider}' (expected 'openai' or 'local')")
+
+
+# =========================================================
+# Shared Client (built on first use)
+# =========================================================
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """
+    Process-wide client for LLM_PROVIDER. Built on the first call, so
+    importing the engines neither imports the provider SDK nor needs
+    credentials.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_llm_client()
+    return _client
+
+
+def prime_llm_client(timeout=None):
+    """
+    Opens the provider connection ahead of the first real call (a model
+    listing, no tokens spent). No-op for clients without one. With a
+    timeout, the listing is a single attempt bounded by it (seconds).
+    """
+    client = get_llm_client()
+    if getattr(client, "models", None) is None:
+        return
+    if timeout is not None and hasattr(client, "with_options"):
+        # Same connection pool, no retries
+        client = client.with_options(timeout=timeout, max_retries=0)
+    client.models.list()
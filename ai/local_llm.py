@@ -0,0 +1,157 @@
+# ai/local_llm.py
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+# ============================================================
+# Local LLM Stand-in (offline load testing)
+#
+# Mimics the subset of openai.OpenAI().chat.completions.create used
+# by ai_summary.py and query_engine.py, including json_object mode.
+# Responses are deterministic templates chosen from the prompt, so
+# the rest of the pipeline runs unchanged without an API key.
+# ============================================================
+LOCAL_LLM_LATENCY_MS = float(os.getenv("LOCAL_LLM_LATENCY_MS", "300"))
+LOCAL_LLM_JITTER_MS = float(os.getenv("LOCAL_LLM_JITTER_MS", "100"))
+LOCAL_LLM_ERROR_RATE = float(os.getenv("LOCAL_LLM_ERROR_RATE", "0.0"))
+
+
+class LocalLLMError(RuntimeError):
+    """Injected provider failure (rate limit / 5xx stand-in)."""
+
+
+# ------------------------------------------------------------
+# Canned Responses
+# ------------------------------------------------------------
+INTENT_KEYWORDS = [
+    ("anomaly_detection", ("anomal", "unusual", "outlier")),
+    ("promotion_impact", ("promo",)),
+    ("price_demand", ("price", "pricing", "demand")),
+    ("channel_performance", ("channel", "online", "retail")),
+    ("revenue_trend", ("trend", "week over week", "growing", "declining")),
+    ("regional_performance", ("region", "country", "countries")),
+]
+
+CUSTOM_KEYWORDS = ("average", "top ", "bottom ", "sum", "total", "where", ">", "<", "by ")
+
+
+def _user_query(prompt):
+    match = re.search(r'User (?:query|Query|asked): "(.*?)"', prompt, re.DOTALL)
+    return match.group(1) if match else ""
+
+
+def _classify(query):
+    q = query.lower()
+    if any(k in q for k in CUSTOM_KEYWORDS):
+        return "custom_exploration"
+    for query_type, keywords in INTENT_KEYWORDS:
+        if any(k in q for k in keywords):
+            return query_type
+    return "revenue_trend"
+
+
+def _pandas_code(query):
+    q = query.lower()
+    dimension = next(
+        (d for d in ("Country", "Channel", "Store", "SKU", "Promotion") if d.lower() in q),
+        "Country",
+    )
+    if "average" in q or "mean" in q:
+        return f"df.groupby('{dimension}')['Revenue'].mean().sort_values(ascending=False)"
+    if "discount" in q:
+        return "df[df['Discount'] > 0.3][['Store', 'Country', 'Revenue', 'Discount']].sort_values('Revenue', ascending=False)"
+    return f"df.groupby('{dimension}')['Revenue'].sum().sort_values(ascending=False).head(5)"
+
+
+def respond(prompt, json_mode):
+    """
+    Pick a plausible completion for one of the app's prompts.
+    """
+    if "query intent classifier" in prompt:
+        query_type = _classify(_user_query(prompt))
+        return json.dumps({
+            "query_type": query_type,
+            "filters": {},
+            "confidence": 0.9,
+            "requires_calculation": query_type == "custom_exploration",
+        })
+
+    if "generating Pandas code" in prompt:
+        return _pandas_code(_user_query(prompt))
+
+    if "senior business analyst presenting" in prompt:
+        return json.dumps({
+            "answer": "Based on the analysis, performance is within the normal weekly range.",
+            "key_insights": [
+                "Local LLM stand-in response",
+                "Numbers come from the deterministic engines",
+            ],
+            "chart_suggestion": "table",
+            "follow_up_questions": [
+                "Which region performed best?",
+                "Are there any anomalies?",
+            ],
+        })
+
+    text = (
+        "Executive judgment (local stand-in): revenue movement this week is "
+        "driven by regional and channel mix. Stabilize the weakest region "
+        "first, then rebalance channel investment."
+    )
+    return json.dumps({"summary": text}) if json_mode else text
+
+
+# ------------------------------------------------------------
+# OpenAI-compatible Surface
+# ------------------------------------------------------------
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, model, messages, temperature=None, response_format=None, **kwargs):
+        owner = self._owner
+        owner._record_call()
+
+        delay_ms = max(0.0, random.gauss(owner.latency_ms, owner.jitter_ms))
+        time.sleep(delay_ms / 1000)
+
+        if random.random() < owner.error_rate:
+            raise LocalLLMError("Local LLM stand-in: injected failure")
+
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        json_mode = (response_format or {}).get("type") == "json_object"
+        content = respond(prompt, json_mode)
+
+        return SimpleNamespace(
+            id=f"local-{owner.calls}",
+            model=model,
+            choices=[SimpleNamespace(
+                index=0,
+                finish_reason="stop",
+                message=SimpleNamespace(role="assistant", content=content),
+            )],
+            usage=SimpleNamespace(
+                prompt_tokens=len(prompt) // 4,
+                completion_tokens=len(content) // 4,
+                total_tokens=(len(prompt) + len(content)) // 4,
+            ),
+        )
+
+
+class LocalLLMClient:
+    def __init__(self, latency_ms=None, jitter_ms=None, error_rate=None):
+        self.latency_ms = LOCAL_LLM_LATENCY_MS if latency_ms is None else latency_ms
+        self.jitter_ms = LOCAL_LLM_JITTER_MS if jitter_ms is None else jitter_ms
+        self.error_rate = LOCAL_LLM_ERROR_RATE if error_rate is None else error_rate
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def _record_call(self):
+        with self._lock:
+            self.calls += 1
@@ -0,0 +1,164 @@
+# api/compression.py
+
+import gzip
+import os
+
+import anyio
+
+try:
+    import zstandard
+except ImportError:  # optional — gzip only without it
+    zstandard = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+# Bodies at least this large are compressed on a worker thread, off the event loop
+COMPRESSION_THREAD_MIN_BYTES = int(os.getenv("COMPRESSION_THREAD_MIN_BYTES", "262144"))
+
+
+# =====================================================
+# Accept-Encoding Negotiation
+# =====================================================
+def supported_encodings():
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str):
+    """
+    Best supported coding from an Accept-Encoding header, honouring
+    q-values (q=0 refuses a coding). Ties prefer zstd over gzip.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+# =====================================================
+# ASGI Middleware
+# =====================================================
+def _with_vary(headers, drop=()):
+    """
+    headers plus Vary: Accept-Encoding (merged into an existing Vary),
+    leaving out the names in drop.
+    """
+    vary = None
+    kept = []
+    for k, v in headers:
+        if k.lower() == b"vary":
+            vary = v
+        elif k.lower() not in drop:
+            kept.append((k, v))
+    if vary is None:
+        vary = b"Accept-Encoding"
+    elif b"accept-encoding" not in vary.lower():
+        vary += b", Accept-Encoding"
+    return kept + [(b"vary", vary)]
+
+
+class CompressionMiddleware:
+    """
+    Compresses complete (non-streaming) responses of at least
+    COMPRESSION_MIN_BYTES with zstd or gzip, per Accept-Encoding.
+    Streaming and already-encoded responses pass through untouched.
+
+    Every response the app did not encode itself carries Vary:
+    Accept-Encoding, compressed or not, so shared caches keep the
+    encodings (and their 304s) apart.
+    """
+
+    def __init__(self, app, minimum_size=None, thread_min_size=None):
+        self.app = app
+        self.minimum_size = COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+        self.thread_min_size = COMPRESSION_THREAD_MIN_BYTES if thread_min_size is None else thread_min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            original = start_message.get("headers", [])
+            existing = {k.lower(): v for k, v in original}
+
+            if b"content-encoding" in existing:
+                # Encoded by the app: its headers, its business
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if (
+                encoding is None
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or start_message["status"] in (204, 304)
+            ):
+                # Not compressed (not accepted / streaming / too small): as-is + Vary
+                passthrough = True
+                await send({**start_message, "headers": _with_vary(original)})
+                await send(message)
+                return
+
+            if len(body) >= self.thread_min_size:
+                # Multi-MB bodies take tens of ms: keep the event loop serving
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+
+            response_headers = _with_vary(original, drop=(b"content-length",)) + [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+            ]
+
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
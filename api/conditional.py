@@ -0,0 +1,41 @@
+# api/conditional.py
+
+import hashlib
+
+from fastapi import Response
+
+# Bump when the review response shape or engine semantics change, so
+# clients holding an old ETag get a fresh body instead of a 304.
+RESPONSE_VERSION = "1"
+
+
+# =====================================================
+# ETags for Review Responses
+# =====================================================
+def review_etag(flight_key: str) -> str:
+    """
+    Weak ETag from the request_key() of a review (endpoint + dataset
+    hash + parameters). Weak, because the AI text may differ byte-wise
+    between recomputations and because compression varies the body.
+    """
+    digest = hashlib.sha256(f"{RESPONSE_VERSION}:{flight_key}".encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match comparison (weak, so W/ prefixes are ignored).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == wanted
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
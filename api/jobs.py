@@ -0,0 +1,358 @@
+# api/jobs.py
+
+import contextvars
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from admission.limits import Overloaded
+from cache.disk_cache import CACHE_DIR
+from cache.shared_store import _pid_alive
+from telemetry.log import get_logger
+from telemetry.metrics import ADMISSION_REJECTED
+
+logger = get_logger("jobs")
+
+# Reviews processed concurrently per worker process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# Submissions beyond this many unstarted jobs are rejected (429)
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "16"))
+
+# Finished jobs (status + result) are kept this long
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+
+# Expired jobs are swept on submission, at most this often
+JOB_PRUNE_INTERVAL_S = int(os.getenv("JOB_PRUNE_INTERVAL_S", "60"))
+
+# Inside the dataset cache dir so every gunicorn worker can answer polls;
+# the leading dot keeps it out of cache eviction.
+JOB_DIR = os.getenv("JOB_DIR", os.path.join(CACHE_DIR, ".jobs"))
+
+# Uploads waiting for a queued job, under job_dir
+SPOOL_DIR = ".uploads"
+
+# (stage, share of overall progress) in pipeline order
+JOB_STAGES = (
+    ("parse", 40),
+    ("prep", 25),
+    ("engines", 15),
+    ("summary", 20),
+)
+
+
+def _job_error(e):
+    """
+    (HTTP status, message) a failed job reports: client errors raised
+    by the job (HTTPException 400 / 409, Overloaded) keep their status.
+    """
+    status = getattr(e, "status_code", None) or getattr(e, "status", None)
+    detail = getattr(e, "detail", None)
+    return (status if isinstance(status, int) else 500), str(e if detail is None else detail)
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+# ============================================================
+# Progress Reporting
+# ============================================================
+class JobProgress:
+    """
+    Handed to the job function. stage() moves to a pipeline stage,
+    update() reports completion within it (0-1). Status is persisted
+    only when the stage or the overall percentage actually changes.
+    """
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+        self.stage_name = None
+        self.stage_fraction = 0.0
+        self._last_written = None
+
+    def stage(self, name, fraction=0.0):
+        self.stage_name = name
+        self.update(fraction)
+
+    def update(self, fraction):
+        self.stage_fraction = min(max(fraction, 0.0), 1.0)
+        overall = self.overall()
+        if (self.stage_name, overall) != self._last_written:
+            self._last_written = (self.stage_name, overall)
+            self.store._update(
+                self.job_id,
+                stage=self.stage_name,
+                stage_progress=round(self.stage_fraction * 100),
+                progress=overall,
+            )
+
+    def overall(self):
+        done = 0
+        for name, weight in JOB_STAGES:
+            if name == self.stage_name:
+                return int(done + weight * self.stage_fraction)
+            done += weight
+        return 0
+
+    def node_done(self, name, completed, total):
+        """
+        EngineGraph on_node hook: engine nodes advance "engines"; once
+        the prompt is built the LLM call is all that remains.
+        """
+        if name == "prompt":
+            self.stage("summary")
+        elif self.stage_name != "summary":
+            if self.stage_name != "engines":
+                self.stage("engines")
+            self.update(completed / total)
+
+
+# ============================================================
+# Job Store + Worker Pool
+# ============================================================
+class JobStore:
+    """
+    Runs submitted functions on a local thread pool and keeps each
+    job's status / result as files under job_dir.
+    """
+
+    def __init__(self, job_dir=None, workers=None, ttl_seconds=None, max_queued=None):
+        self.job_dir = job_dir or JOB_DIR
+        self.workers = JOB_WORKERS if workers is None else workers
+        self.ttl_seconds = JOB_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_queued = JOB_MAX_QUEUED if max_queued is None else max_queued
+        self._executor = None
+        self._lock = threading.Lock()
+        # Submitted to this process's pool but not yet started
+        self._queued = 0
+        self._rejected = 0
+        self._pruned_at = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.workers),
+                    thread_name_prefix="job",
+                )
+            return self._executor
+
+    def _path(self, job_id, name="status.json"):
+        return os.path.join(self.job_dir, job_id, name)
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            status = self._read(job_id) or {}
+            status.update(fields)
+            _write_json(self._path(job_id), status)
+
+    def _read(self, job_id):
+        try:
+            with open(self._path(job_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+    def submit(self, kind, fn, **meta):
+        """
+        Queue fn(progress) -> JSON-safe result. Returns the job id.
+        Raises Overloaded when max_queued jobs are already waiting.
+        Blocking (file I/O): call it off the event loop.
+        """
+        with self._lock:
+            if self._queued >= self.max_queued:
+                self._rejected += 1
+                full = True
+            else:
+                self._queued += 1
+                full = False
+        if full:
+            ADMISSION_REJECTED.inc(stage="jobs", reason="queue_full")
+            # Roughly one job's worth of wait per worker slot ahead
+            raise Overloaded("jobs", 429, max(1, self.max_queued // max(self.workers, 1)), "queue_full")
+
+        try:
+            now = time.monotonic()
+            if self._pruned_at is None or now - self._pruned_at >= JOB_PRUNE_INTERVAL_S:
+                self._pruned_at = now
+                self.prune()
+
+            job_id = uuid.uuid4().hex
+            os.makedirs(os.path.join(self.job_dir, job_id), exist_ok=True)
+            _write_json(self._path(job_id), {
+                "job_id": job_id,
+                "kind": kind,
+                "status": "queued",
+                "stage": None,
+                "stage_progress": 0,
+                "progress": 0,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+                "error_status": None,
+                "pid": os.getpid(),
+                **meta,
+            })
+
+            # Keep the submitting request's context (request id in logs)
+            ctx = contextvars.copy_context()
+            self._pool().submit(ctx.run, self._run, job_id, fn)
+        except BaseException:
+            # Never queued: give the slot back
+            with self._lock:
+                self._queued -= 1
+            raise
+        return job_id
+
+    def _run(self, job_id, fn):
+        with self._lock:
+            self._queued -= 1
+        self._update(job_id, status="running", started_at=time.time())
+        progress = JobProgress(self, job_id)
+
+        try:
+            result = fn(progress)
+            _write_json(self._path(job_id, "result.json"), result)
+        except Exception as e:
+            error_status, error = _job_error(e)
+            if error_status >= 500:
+                logger.exception("Job %s failed", job_id)
+            else:
+                logger.warning("Job %s rejected (%s): %s", job_id, error_status, error)
+            self._update(
+                job_id,
+                status="failed",
+                error=error,
+                error_status=error_status,
+                finished_at=time.time(),
+            )
+            return
+
+        self._update(
+            job_id,
+            status="done",
+            stage=None,
+            stage_progress=100,
+            progress=100,
+            finished_at=time.time(),
+        )
+
+    def status(self, job_id):
+        """
+        Current status dict, or None for unknown / expired jobs.
+        """
+        if not job_id.isalnum():
+            return None
+        status = self._read(job_id)
+        if status is None:
+            return None
+
+        # The process running it is gone (crash / redeploy)
+        if status["status"] in ("queued", "running") and not _pid_alive(status["pid"]):
+            status["status"] = "failed"
+            status["error"] = "Worker process exited before the job finished"
+            status["error_status"] = 500
+        return status
+
+    def result_bytes(self, job_id):
+        try:
+            with open(self._path(job_id, "result.json"), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def spool(self, data):
+        """
+        Writes an upload to disk so a queued job holds its path rather
+        than the bytes. Returns the path, for take_spooled.
+        """
+        spool_dir = os.path.join(self.job_dir, SPOOL_DIR)
+        os.makedirs(spool_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=spool_dir, suffix=".csv")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        except BaseException:
+            self.discard_spooled(path)
+            raise
+        return path
+
+    def take_spooled(self, path):
+        """
+        Bytes of a spooled upload; the file is removed once read.
+        """
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            self.discard_spooled(path)
+
+    @staticmethod
+    def discard_spooled(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        """
+        Remove jobs that finished more than ttl_seconds ago, and uploads
+        spooled that long ago whose job never ran (worker exited).
+        """
+        if not os.path.isdir(self.job_dir):
+            return 0
+
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+
+        spool_dir = os.path.join(self.job_dir, SPOOL_DIR)
+        if os.path.isdir(spool_dir):
+            for name in os.listdir(spool_dir):
+                path = os.path.join(spool_dir, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+        for job_id in os.listdir(self.job_dir):
+            status = self.status(job_id) or {}
+            # Orphaned jobs (dead worker) never finish — age them from creation
+            ended = status.get("finished_at") or (
+                status.get("created_at") if status.get("status") == "failed" else None
+            )
+            if ended is not None and ended < cutoff:
+                shutil.rmtree(os.path.join(self.job_dir, job_id), ignore_errors=True)
+                removed += 1
+        return removed
+
+    def stats(self):
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        if os.path.isdir(self.job_dir):
+            for job_id in os.listdir(self.job_dir):
+                status = self.status(job_id)
+                if status is not None:
+                    counts[status["status"]] = counts.get(status["status"], 0) + 1
+        return {
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "rejected": self._rejected,
+            **counts,
+        }
+
+
+job_store = JobStore()
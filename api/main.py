@@ -1,7 +1,40 @@
-from fastapi import FastAPI
+import time
+
+# Cold start: module import time is logged at startup (budget check:
+# python -m benchmarks.cold_start)
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import os
 
+from dotenv import load_dotenv
+
+# Before any module reads its env config (.env is a local-dev convenience)
+load_dotenv(encoding="utf-8")
+
+from api.compression import CompressionMiddleware
+from admission.limits import Overloaded, admission_stats
+
+from telemetry.metrics import (
+    REGISTRY,
+    PROMETHEUS_CONTENT_TYPE,
+    REQUEST_SECONDS,
+    RESPONSE_BYTES,
+    IN_FLIGHT,
+)
+from telemetry.log import (
+    configure_logging,
+    shutdown_logging,
+    get_logger,
+    client_request_id,
+    request_id_var,
+)
+
+configure_logging()
+logger = get_logger("api")
+
 app = FastAPI(
     title="AI Data-to-Insight Agent API",
     description="Deterministic analytics + executive AI reasoning",
@@ -15,11 +48,88 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Request-ID"],
 )
 
+# zstd / gzip per Accept-Encoding (inside the metrics middleware, so
+# http_response_bytes reports bytes actually sent)
+app.add_middleware(CompressionMiddleware)
+
+# Per-request id (propagated to every log record via contextvar)
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    request_id = client_request_id(request.headers.get("x-request-id"))
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+# Request metrics (latency, response size, in-flight)
+def _route_label(request: Request) -> str:
+    """
+    Metric label for a request. Templated routes (path parameters) are
+    reported by template so label cardinality stays bounded.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    if "{" in route.path:
+        return route.path
+    return request.url.path
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+
+    with IN_FLIGHT.track_inprogress():
+        response = await call_next(request)
+
+    path = _route_label(request)
+
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        path=path,
+        status=response.status_code
+    )
+
+    content_length = response.headers.get("content-length")
+    if content_length is not None:
+        RESPONSE_BYTES.observe(int(content_length), path=path)
+
+    return response
+
+# Admission control: shed load with 429 / 503 + Retry-After
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    logger.warning(
+        "Request rejected by admission control",
+        extra={"stage": exc.stage, "reason": exc.reason, "path": request.url.path}
+    )
+    return JSONResponse(
+        status_code=exc.status,
+        content={"detail": str(exc), "stage": exc.stage, "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Include routers
-from api.routes import review
+from api.routes import review, jobs, session, charts
+from api.jobs import job_store
+from api.sessions import session_registry
+from cache.memory_cache import memory_cache
+from cache.shared_store import dataset_store
+from cache.spec_cache import chart_spec_cache
+from engines.dag import engine_memo
+from api.warmup import warmup, WARMUP_ON_STARTUP
+
+_import_seconds = round(time.perf_counter() - _import_started, 3)
 app.include_router(review.router, prefix="/review", tags=["Review"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(session.router, prefix="/session", tags=["Session"])
+app.include_router(charts.router, prefix="/charts", tags=["Charts"])
 
 # Health check endpoint (root)
 @app.get("/")
@@ -31,17 +141,76 @@ async def root():
         "endpoints": {
             "full_analysis": "/review/full",
             "query": "/review/query",
+            "jobs": "/jobs/review",
+            "session": "/session/dataset → ws /session/ws",
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
 
+# Liveness: the process is up and the event loop responsive
+@app.get("/health/live")
+async def liveness():
+    return {"status": "alive"}
+
+# Readiness: warmup has run (imports, hot paths, cached datasets), so
+# this worker will not make the first real request the slow one
+@app.get("/health/ready")
+async def readiness():
+    ready = warmup.ready or not WARMUP_ON_STARTUP
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "warmup": warmup.state()}
+    )
+
+# Warmup progress (read-only: warmup runs once, at startup)
+@app.get("/health/warmup")
+async def warmup_status():
+    return warmup.state()
+
+# Dataset cache usage (per-tenant memory + shared store). Plain def:
+# the store and job stats read files, so this runs on the threadpool
+@app.get("/cache/stats")
+def cache_stats():
+    return {
+        "memory": memory_cache.stats(),
+        "shared_store": dataset_store.stats(),
+        "engine_intermediates": engine_memo.stats(),
+        "chart_specs": chart_spec_cache.stats(),
+        "jobs": job_store.stats(),
+        "sessions": session_registry.stats(),
+    }
+
+# Concurrency limits, queue depths and rejections per stage
+@app.get("/admission/stats")
+async def admission_stats_endpoint():
+    return admission_stats()
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    print("🚀 FastAPI server started successfully")
-    print(f"📊 OpenAI API Key configured: {bool(os.getenv('OPENAI_API_KEY'))}")
+    logger.info(
+        "FastAPI server started",
+        extra={
+            "openai_key_configured": bool(os.getenv("OPENAI_API_KEY")),
+            "import_seconds": _import_seconds,
+        }
+    )
+
+    # pandas, engines, the LLM client and cached datasets load in the
+    # background; liveness is answered meanwhile, readiness once done
+    if WARMUP_ON_STARTUP:
+        warmup.start()
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
-    print("👋 FastAPI server shutting down")
+    logger.info("FastAPI server shutting down")
+    shutdown_logging()
@@ -0,0 +1,130 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from fastapi.encoders import jsonable_encoder
+
+from api.conditional import review_etag, etag_matches, not_modified
+from api.singleflight import review_flights, request_key
+from api.upload import read_upload, upload_openapi, DATASET_KEY_PATTERN
+from api.routes.review import open_dataset, build_full_review, to_native
+from admission.limits import Overloaded, request_slot
+from cache.memory_cache import DEFAULT_TENANT
+from cache.spec_cache import chart_spec_cache
+from telemetry.metrics import timed
+from telemetry.log import get_logger
+from viz.names import CHART_NAMES, chart_fields
+
+# plotly / pandas load with viz.specs on the first cache miss
+
+router = APIRouter()
+
+logger = get_logger("charts")
+
+
+def parse_charts(value):
+    """
+    "country_drivers, weekly_revenue" → ("country_drivers", "weekly_revenue").
+    None / empty means every chart.
+    """
+    if not value:
+        return CHART_NAMES
+
+    charts = {c.strip() for c in value.split(",") if c.strip()}
+    unknown = sorted(charts - set(CHART_NAMES))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown charts {unknown}. Choose from {list(CHART_NAMES)}"
+        )
+    return tuple(sorted(charts))
+
+
+# =====================================================
+# Chart Specs (ready-to-render Plotly figure JSON)
+#
+# {"analysis_week", "charts": {name: {"data", "layout"}}, "template"}
+# Render with Plotly.newPlot(el, spec.data, {...spec.layout, template}).
+# =====================================================
+@router.post("", openapi_extra=upload_openapi(), dependencies=[Depends(request_slot)])
+async def chart_specs_for_upload(
+    request: Request,
+    tenant: str = Header(DEFAULT_TENANT, alias="X-Tenant-ID"),
+    charts: str = Query(None, description="Comma-separated charts, e.g. weekly_revenue (default: all)"),
+    max_points: int = Query(None, ge=3, description="Points per time series (default CHART_MAX_POINTS)"),
+    top_n: int = Query(None, ge=0, description="Driver bars before the rest collapse into Other (default CHART_TOP_N, 0 = all)"),
+    template: bool = Query(True, description="Include the shared layout template"),
+    if_none_match: str = Header(None, alias="If-None-Match")
+):
+    """
+    Chart specs for an uploaded CSV (or dataset_key of a cached one).
+    """
+    selected = parse_charts(charts)
+    upload = await read_upload(request)
+    return await serve_chart_specs(
+        upload.raw_bytes, upload.key, tenant, selected, max_points, top_n, template, if_none_match
+    )
+
+
+@router.get("/{dataset_key}", dependencies=[Depends(request_slot)])
+async def chart_specs_for_dataset(
+    dataset_key: str,
+    tenant: str = Header(DEFAULT_TENANT, alias="X-Tenant-ID"),
+    charts: str = Query(None, description="Comma-separated charts, e.g. weekly_revenue (default: all)"),
+    max_points: int = Query(None, ge=3, description="Points per time series (default CHART_MAX_POINTS)"),
+    top_n: int = Query(None, ge=0, description="Driver bars before the rest collapse into Other (default CHART_TOP_N, 0 = all)"),
+    template: bool = Query(True, description="Include the shared layout template"),
+    if_none_match: str = Header(None, alias="If-None-Match")
+):
+    """
+    Chart specs for a dataset the server already has (409 once it
+    is no longer cached: POST the file instead).
+    """
+    selected = parse_charts(charts)
+    key = dataset_key.lower()
+    if not DATASET_KEY_PATTERN.match(key):
+        raise HTTPException(status_code=400, detail="dataset_key must be a SHA-256 hex digest")
+    return await serve_chart_specs(None, key, tenant, selected, max_points, top_n, template, if_none_match)
+
+
+async def serve_chart_specs(raw_bytes, key, tenant, charts, max_points, top_n, template, if_none_match):
+    flight_key = request_key(
+        "charts", key, charts=",".join(charts), max_points=max_points, top_n=top_n, template=template
+    )
+    etag = review_etag(flight_key)
+
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        body = chart_spec_cache.get(flight_key)
+
+        if body is None:
+            def compute():
+                from viz.specs import chart_specs
+
+                with open_dataset(raw_bytes, tenant, key) as prepared:
+                    review = build_full_review(*prepared, dataset_key=key, fields=chart_fields(charts))
+
+                # Drawn from the /review/full JSON, exactly as the Streamlit UI does
+                review = jsonable_encoder(to_native(review))
+
+                with timed("serialize"):
+                    specs = chart_specs(
+                        review, charts, max_points=max_points, top_n=top_n, include_template=template
+                    )
+                    encoded = json.dumps(specs, separators=(",", ":")).encode("utf-8")
+                return chart_spec_cache.put(flight_key, encoded)
+
+            # Identical concurrent requests share one computation
+            body = await review_flights.do(flight_key, lambda: run_in_threadpool(compute))
+
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    except (Overloaded, HTTPException):
+        raise
+
+    except Exception as e:
+        logger.exception("Fatal error in /charts")
+        raise HTTPException(status_code=500, detail=str(e))
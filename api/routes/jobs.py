@@ -0,0 +1,116 @@
+from fastapi import APIRouter, HTTPException, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from fastapi.encoders import jsonable_encoder
+
+from api.jobs import job_store, JOB_STAGES
+from api.upload import read_upload, upload_openapi
+from api.routes.review import open_dataset, build_full_review, dataset_cached, parse_fields, to_native
+from cache.memory_cache import DEFAULT_TENANT
+from telemetry.log import get_logger
+
+router = APIRouter()
+
+logger = get_logger("jobs")
+
+
+# =====================================================
+# Submit: Full Review as a Background Job
+# =====================================================
+@router.post("/review", status_code=202, openapi_extra=upload_openapi())
+async def submit_review_job(
+    request: Request,
+    tenant: str = Header(DEFAULT_TENANT, alias="X-Tenant-ID"),
+    fields: str = Query(None, description="Comma-separated sections, e.g. metrics,country_trends (default: all)"),
+    max_points: int = Query(None, ge=3, description="Downsample trends.weekly_total to at most this many weeks")
+):
+    """
+    Queues a /review/full computation and returns immediately.
+    Poll GET /jobs/{job_id}, then fetch GET /jobs/{job_id}/result.
+    """
+    selected = parse_fields(fields)
+    upload = await read_upload(request)
+
+    key, rows = upload.key, upload.rows
+
+    # Upload-by-hash of a dataset this server lacks: answer 409 now (as
+    # /review/full does) rather than from a queued job
+    if upload.raw_bytes is None and not await run_in_threadpool(dataset_cached, key, tenant):
+        raise HTTPException(status_code=409, detail=f"Dataset {key[:12]} is no longer cached; upload the file")
+
+    # Queued jobs hold a spool path, not the upload: JOB_MAX_QUEUED
+    # bodies would otherwise sit in memory until a worker frees up.
+    # dataset_key uploads have no body (the key is enough).
+    spooled = None
+    if upload.raw_bytes is not None:
+        spooled = await run_in_threadpool(job_store.spool, upload.raw_bytes)
+    del upload
+
+    def run(progress):
+        raw_bytes = job_store.take_spooled(spooled) if spooled is not None else None
+        with open_dataset(raw_bytes, tenant, key, progress=progress) as prepared:
+            progress.stage("engines")
+            response = build_full_review(
+                *prepared,
+                dataset_key=key,
+                fields=selected,
+                on_node=progress.node_done,
+                max_points=max_points
+            )
+        return jsonable_encoder(to_native(response))
+
+    try:
+        job_id = await run_in_threadpool(
+            job_store.submit,
+            "review",
+            run,
+            dataset=key[:12],
+            rows=rows,
+            fields=list(selected),
+        )
+    except BaseException:
+        # Rejected (429) or never queued: nothing will read the spool
+        if spooled is not None:
+            job_store.discard_spooled(spooled)
+        raise
+    logger.info("Review job queued", extra={"job_id": job_id, "rows": rows})
+
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "stages": [name for name, _ in JOB_STAGES],
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result",
+    }
+
+
+# =====================================================
+# Poll Status / Progress
+# =====================================================
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    status = await run_in_threadpool(job_store.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job '{job_id}'")
+    return status
+
+
+# =====================================================
+# Fetch Result
+# =====================================================
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    status = await run_in_threadpool(job_store.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job '{job_id}'")
+
+    if status["status"] == "failed":
+        # The job's own status: 400 / 409 from open_dataset stay client errors
+        raise HTTPException(status_code=status.get("error_status") or 500, detail=status["error"])
+
+    if status["status"] != "done":
+        # Not ready yet — same body as the status endpoint
+        return JSONResponse(status_code=202, content=status)
+
+    body = await run_in_threadpool(job_store.result_bytes, job_id)
+    return Response(content=body, media_type="application/json")
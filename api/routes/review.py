@@ -1,17 +1,31 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-import pandas as pd
-import traceback
-import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 import math
+import io
+from contextlib import contextmanager, nullcontext
 
-from engines.prep_engine import prepare_data
-from engines.trend_engine import run_trend_engine
-from engines.anomaly_engine import run_anomaly_engine
-from engines.query_engine import process_natural_language_query
-from ai.ai_summary import build_ai_prompt, generate_ai_summary
+from cache.disk_cache import dataset_key, has_prepared, read_meta
+from cache.shared_store import dataset_store
+from cache.memory_cache import memory_cache, DEFAULT_TENANT
+from api.singleflight import review_flights, request_key
+from api.conditional import review_etag, etag_matches, not_modified
+from api.upload import read_upload, upload_openapi
+from admission.limits import Overloaded, request_slot, stage_slot
+from telemetry.metrics import timed, CACHE_LOOKUPS, ROWS_INGESTED
+from telemetry.log import get_logger, log_sampled, request_id_var
+from telemetry.profiling import RequestProfile, parse_profile_mode
+
+# pandas / numpy and the engines (which pull in the LLM client) are
+# imported inside the functions that need them: importing this router
+# stays cheap, so a cold worker answers health checks sooner. The
+# startup warmup (api/warmup.py) loads them in the background.
 
 router = APIRouter()
 
+logger = get_logger("review")
+
 
 # =====================================================
 # JSON Sanitizer (CRITICAL FOR FASTAPI)
@@ -22,6 +36,8 @@ def to_native(obj):
     Recursively convert NumPy / Pandas scalars and invalid floats
     (NaN, Inf) into JSON-safe Python types.
     """
+    import numpy as np
+
     if isinstance(obj, dict):
         return {k: to_native(v) for k, v in obj.items()}
 
@@ -40,98 +56,350 @@ def to_native(obj):
     return obj
 
 
-@router.post("/full")
-async def run_full_review(file: UploadFile = File(...)):
-    try:
-        # =====================================================
-        # 1. Load CSV
-        # =====================================================
-        df = pd.read_csv(file.file)
+class ProgressReader(io.RawIOBase):
+    """
+    File wrapper reporting the fraction of bytes consumed, so a single
+    read_csv call can drive a parse-% progress bar.
+    """
 
-        print("✅ CSV loaded successfully")
-        print("Columns:", df.columns.tolist())
-        print(df.head(2))
+    def __init__(self, raw, total, report):
+        self._raw = raw
+        self._total = max(total, 1)
+        self._report = report
 
-        # =====================================================
-        # 2. Canonical Data Prep
-        # =====================================================
-        clean_df, weekly_df, weekly_total, analysis_week = prepare_data(df)
+    def readable(self):
+        return True
 
-        print("✅ Data preparation successful")
-        print("Weeks available:", weekly_total["week"].tolist())
+    def readinto(self, buffer):
+        n = self._raw.readinto(buffer)
+        self._report(self._raw.tell() / self._total)
+        return n
 
-        analysis_week = str(weekly_total.iloc[-1]["week"])
 
-        # =====================================================
-        # 3. Deterministic Engines
-        # =====================================================
-        trend_results = run_trend_engine(
-            df=clean_df,
-            weekly_df=weekly_df,
-            weekly_total=weekly_total
-        )
+# =====================================================
+# Prepared Dataset Loader
+# memory cache → shared on-disk store → parse + prep
+# =====================================================
+@contextmanager
+def open_dataset(raw_bytes: bytes, tenant: str = DEFAULT_TENANT, key: str = None, progress=None):
+    """
+    Yields prepare_data() output for an uploaded CSV.
 
-        print("✅ Trend engine executed")
+    Serves from the per-process memory cache when resident, otherwise
+    from the memory-mapped shared store (kept pinned until the block
+    exits), and only parses + prepares the CSV when neither has it.
+    progress (api.jobs.JobProgress) receives parse % and the prep stage.
 
-        anomaly_results = run_anomaly_engine(
-            weekly_total=weekly_total,
-            weekly_df=weekly_df
-        )
+    raw_bytes=None (upload-by-hash) raises 409 when neither cache has
+    key any more — the client should upload the file itself.
+    """
+    key = key or dataset_key(raw_bytes)
 
-        print("✅ Anomaly engine executed")
+    resident = memory_cache.get(key, tenant)
+    CACHE_LOOKUPS.inc(layer="memory", result="miss" if resident is None else "hit")
+    if resident is not None:
+        yield resident
+        return
 
-        # =====================================================
-        # 4. AI Executive Summary (FAULT-TOLERANT)
-        # =====================================================
-        try:
-            prompt = build_ai_prompt(
-                trend_results=trend_results,
-                anomaly_results=anomaly_results,
-                analysis_week=analysis_week
+    with dataset_store.attach(key) as cached:
+        CACHE_LOOKUPS.inc(layer="shared_store", result="miss" if cached is None else "hit")
+        if cached is not None:
+            logger.debug("Prepared dataset cache hit", extra={"dataset": key[:12]})
+            yield memory_cache.put(key, cached, tenant)
+            return
+
+        if raw_bytes is None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Dataset {key[:12]} is no longer cached; upload the file"
             )
 
-            executive_summary = generate_ai_summary(prompt)
-            print("🧠 AI summary generated")
+        import pandas as pd
+        from engines.prep_engine import prepare_data, EmptyDatasetError
 
-        except Exception as ai_error:
-            print("⚠️ AI SUMMARY FAILED — FALLING BACK")
-            print(str(ai_error))
+        source = io.BytesIO(raw_bytes)
+        if progress is not None:
+            progress.stage("parse")
+            source = ProgressReader(source, len(raw_bytes), progress.update)
 
-            executive_summary = (
-                "Executive summary could not be generated due to an AI service issue. "
-                "All deterministic analytics and signals are valid."
-            )
+        # Parse + prep is the memory-heavy part: bounded separately
+        with stage_slot("ingest"):
+            with timed("csv_parse"):
+                df = pd.read_csv(source)
+            ROWS_INGESTED.inc(len(df))
+
+            if progress is not None:
+                progress.stage("prep")
+
+            try:
+                prepared = prepare_data(df)
+            except EmptyDatasetError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        try:
+            dataset_store.put(key, *prepared[:3])
+        except Exception as cache_error:
+            # The cache is an optimization — never fail the request over it
+            logger.warning("Could not cache prepared dataset: %s", cache_error)
+
+        yield memory_cache.put(key, prepared, tenant)
+
+
+# =====================================================
+# Upload-by-hash: does the server already have this file?
+# =====================================================
+def dataset_cached(key, tenant=DEFAULT_TENANT):
+    """
+    True when open_dataset can serve key without the file.
+    """
+    return memory_cache.get(key, tenant) is not None or has_prepared(key, dataset_store.store_dir)
+
+
+@router.api_route("/datasets/{key}", methods=["GET", "HEAD"])
+async def dataset_status(
+    key: str,
+    tenant: str = Header(DEFAULT_TENANT, alias="X-Tenant-ID")
+):
+    """
+    200 when the dataset with this SHA-256 is cached (send
+    dataset_key=<key> instead of the file), 404 when it must be uploaded.
+    """
+    key = key.lower()
+    resident = memory_cache.get(key, tenant)
+    if resident is not None:
+        return {"dataset_key": key, "cached": "memory", "rows": len(resident[0])}
+
+    meta = read_meta(key, dataset_store.store_dir) if key.isalnum() else None
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"Dataset {key[:12]} is not cached; upload the file")
+    return {"dataset_key": key, "cached": "shared_store", "rows": meta["rows"]["clean_df"]}
+
+
+# =====================================================
+# Field Selection (?fields=metrics,country_trends)
+# Only requested sections and their dependencies are computed
+# =====================================================
+TREND_SECTIONS = (
+    "overall_revenue_trend",
+    "country_trends",
+    "channel_trends",
+    "promotion_trend",
+    "unit_price_trend",
+    "weekly_total",
+)
+
+ANOMALY_SECTIONS = ("overall_anomaly", "driver_anomalies")
 
+REVIEW_FIELDS = ("metrics", "trends", "anomalies", "executive_summary") + TREND_SECTIONS + ANOMALY_SECTIONS
+
+DEFAULT_FIELDS = ("metrics", "trends", "anomalies", "executive_summary")
+
+
+def parse_fields(value):
+    """
+    "metrics, country_trends" → ("country_trends", "metrics").
+    None / empty means the full response.
+    """
+    if not value:
+        return DEFAULT_FIELDS
+
+    fields = {f.strip() for f in value.split(",") if f.strip()}
+    unknown = sorted(fields - set(REVIEW_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {unknown}. Choose from {list(REVIEW_FIELDS)}"
+        )
+    return tuple(sorted(fields))
+
+
+def field_targets(fields):
+    """
+    Graph nodes (engines/review_graph.py) needed for the requested fields.
+    """
+    targets = set()
+    for field in fields:
+        if field == "metrics":
+            targets.add("overall_revenue_trend")
+        elif field == "trends":
+            targets.add("trend_results")
+        elif field == "anomalies":
+            targets.add("anomaly_results")
+        elif field != "weekly_total":
+            targets.add(field)
+    return sorted(targets)
+
+
+# =====================================================
+# Opt-in Request Profiling
+# =====================================================
+def start_profile(mode):
+    """
+    Returns (profile, context manager). Both are inert when profiling
+    was not requested.
+    """
+    if mode is None:
+        return None, nullcontext()
+    profile = RequestProfile(mode, request_id_var.get())
+    return profile, profile.capture()
+
+
+@router.post("/full", openapi_extra=upload_openapi(), dependencies=[Depends(request_slot)])
+async def run_full_review(
+    request: Request,
+    tenant: str = Header(DEFAULT_TENANT, alias="X-Tenant-ID"),
+    fields: str = Query(None, description="Comma-separated sections, e.g. metrics,country_trends (default: all)"),
+    profile: str = Query(None, description="timing | cprofile | tracemalloc"),
+    max_points: int = Query(None, ge=3, description="Downsample trends.weekly_total to at most this many weeks"),
+    x_profile: str = Header(None, alias="X-Profile"),
+    if_none_match: str = Header(None, alias="If-None-Match")
+):
+    selected = parse_fields(fields)
+
+    # Streamed + validated: bad or oversized uploads fail here (4xx)
+    upload = await read_upload(request)
+
+    try:
         # =====================================================
-        # 5. LOCKED & JSON-SAFE API RESPONSE
+        # 1. Load CSV + 2. Canonical Data Prep (cached)
         # =====================================================
-        response = {
-            "analysis_week": analysis_week,
-            "metrics": trend_results["overall_revenue_trend"],
-            "trends": {
-                **trend_results,
-                "weekly_total": weekly_total.to_dict("records")
-            },
-            "anomalies": anomaly_results,
-            "executive_summary": executive_summary
-        }
-
-        # 🔐 FINAL SANITIZATION STEP
-        return to_native(response)
+        raw_bytes = upload.raw_bytes
+        key = upload.key
+
+        profile_mode = parse_profile_mode(x_profile or profile)
+
+        params = {"fields": ",".join(selected)}
+        if max_points is not None:
+            params["max_points"] = max_points
+        flight_key = request_key("full", key, **params)
+        etag = review_etag(flight_key)
+
+        # Same file + same fields as the client's copy: nothing to recompute
+        if profile_mode is None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        def compute():
+            from engines.review_graph import AI_FALLBACK_SUMMARY
+
+            profiler, capture = start_profile(profile_mode)
+
+            with capture:
+                with open_dataset(raw_bytes, tenant, key) as prepared:
+                    response = build_full_review(*prepared, dataset_key=key, fields=selected, max_points=max_points)
+
+            if profiler is not None:
+                response["profile"] = profiler.report()
+
+            # A fallback summary must not be cached by clients, nor a
+            # profiled body (its timings are not the resource the ETag names)
+            cacheable = profiler is None and response.get("executive_summary") != AI_FALLBACK_SUMMARY
+
+            # 🔐 FINAL SANITIZATION STEP
+            with timed("serialize"):
+                return JSONResponse(
+                    jsonable_encoder(to_native(response)),
+                    headers={"ETag": etag} if cacheable else None
+                )
+
+        # Profiled requests must measure their own run, not a shared one
+        if profile_mode is not None:
+            return await run_in_threadpool(compute)
+
+        # Identical concurrent uploads share one computation
+        return await review_flights.do(
+            flight_key,
+            lambda: run_in_threadpool(compute)
+        )
+
+    except (Overloaded, HTTPException):
+        raise
 
     except Exception as e:
-        print("❌ FATAL ERROR IN /review/full")
-        print(traceback.format_exc())
+        logger.exception("Fatal error in /review/full")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_full_review(
+    clean_df, weekly_df, weekly_total, analysis_week,
+    dataset_key=None, fields=DEFAULT_FIELDS, on_node=None, max_points=None
+):
+    """
+    Runs engines + AI summary over prepared frames and returns the
+    LOCKED /review/full response shape (not yet JSON-sanitized).
+    Independent engine stages run concurrently (engines/review_graph.py).
+
+    With a subset of fields, only those sections (and what they depend
+    on) are computed; the summary's LLM call is skipped unless requested.
+    max_points caps trends.weekly_total (viz/downsample.py); the engines
+    still see every week.
+    """
+    from engines.review_graph import run_full_review_graph
+
+    logger.debug("Data prepared", extra={"rows": len(clean_df), "weeks": len(weekly_total)})
+    log_sampled(logger, "Prepared data sample", lambda: {
+        "columns": clean_df.columns.tolist(),
+        "head": clean_df.head(2).to_dict("records"),
+        "weeks": weekly_total["week"].astype(str).tolist(),
+    })
+
+    analysis_week = str(weekly_total.iloc[-1]["week"])
+
+    # =====================================================
+    # 3. Deterministic Engines + 4. AI Executive Summary
+    # =====================================================
+    results = run_full_review_graph(
+        clean_df, weekly_df, weekly_total, analysis_week,
+        dataset_key=dataset_key,
+        targets=field_targets(fields),
+        on_node=on_node
+    )
+
+    logger.debug("Review sections computed", extra={"fields": list(fields)})
+
+    # =====================================================
+    # 5. LOCKED API RESPONSE (requested sections only)
+    # =====================================================
+    response = {"analysis_week": analysis_week}
+
+    if "metrics" in fields:
+        response["metrics"] = results["overall_revenue_trend"]
+
+    if "trends" in fields:
+        trends = dict(results["trend_results"])
+    else:
+        trends = {s: results[s] for s in TREND_SECTIONS if s in fields and s != "weekly_total"}
+    if "trends" in fields or "weekly_total" in fields:
+        if max_points is not None:
+            from viz.downsample import downsample_weekly_total
+            trends["weekly_total"] = downsample_weekly_total(weekly_total, max_points).to_dict("records")
+        else:
+            trends["weekly_total"] = weekly_total.to_dict("records")
+    if trends:
+        response["trends"] = trends
+
+    if "anomalies" in fields:
+        response["anomalies"] = results["anomaly_results"]
+    else:
+        anomalies = {s: results[s] for s in ANOMALY_SECTIONS if s in fields}
+        if anomalies:
+            response["anomalies"] = anomalies
+
+    if "executive_summary" in fields:
+        response["executive_summary"] = results["executive_summary"]
+
+    return response
+
+
 # =====================================================
 # NEW ENDPOINT: Natural Language Query
 # =====================================================
-@router.post("/query")
+@router.post("/query", openapi_extra=upload_openapi(query=True), dependencies=[Depends(request_slot)])
 async def natural_language_query(
-    file: UploadFile = File(...),
-    query: str = Form(...)
+    request: Request,
+    tenant: str = Header(DEFAULT_TENANT, alias="X-Tenant-ID"),
+    profile: str = Query(None, description="timing | cprofile | tracemalloc"),
+    x_profile: str = Header(None, alias="X-Profile"),
+    if_none_match: str = Header(None, alias="If-None-Match")
 ):
     """
     Endpoint for natural language queries.
@@ -141,35 +409,70 @@ async def natural_language_query(
     - "Show me channel trends"
     - "Are there any anomalies?"
     """
+    upload = await read_upload(request, form_fields=("query",))
+    query = upload.form["query"]
+
     try:
-        print(f"📝 Received query: {query}")
+        logger.debug("Received query", extra={"query": query})
         
         # =====================================================
         # 1. Load and Prepare Data
         # =====================================================
-        df = pd.read_csv(file.file)
-        clean_df, weekly_df, weekly_total, analysis_week = prepare_data(df)
-        
-        print("✅ Data prepared for query")
-        
-        # =====================================================
-        # 2. Process Natural Language Query
-        # =====================================================
-        result = process_natural_language_query(
-            user_query=query,
-            clean_df=clean_df,
-            weekly_df=weekly_df,
-            weekly_total=weekly_total
+        raw_bytes = upload.raw_bytes
+        key = upload.key
+
+        profile_mode = parse_profile_mode(x_profile or profile)
+
+        flight_key = request_key("query", key, query=query)
+        etag = review_etag(flight_key)
+
+        if profile_mode is None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        def compute():
+            from engines.query_engine import process_natural_language_query
+
+            profiler, capture = start_profile(profile_mode)
+
+            with capture, open_dataset(raw_bytes, tenant, key) as (clean_df, weekly_df, weekly_total, analysis_week):
+                logger.debug("Data prepared for query")
+
+                # =====================================================
+                # 2. Process Natural Language Query
+                # =====================================================
+                result = process_natural_language_query(
+                    user_query=query,
+                    clean_df=clean_df,
+                    weekly_df=weekly_df,
+                    weekly_total=weekly_total
+                )
+
+            if profiler is not None:
+                result["profile"] = profiler.report()
+
+            logger.debug("Query processed")
+
+            # =====================================================
+            # 3. Return Sanitized Response
+            # =====================================================
+            with timed("serialize"):
+                return JSONResponse(
+                    jsonable_encoder(to_native(result)),
+                    headers={"ETag": etag} if profiler is None and result.get("success", True) else None
+                )
+
+        if profile_mode is not None:
+            return await run_in_threadpool(compute)
+
+        # Identical concurrent questions on the same file share one answer
+        return await review_flights.do(
+            flight_key,
+            lambda: run_in_threadpool(compute)
         )
         
-        print("✅ Query processed successfully")
-        
-        # =====================================================
-        # 3. Return Sanitized Response
-        # =====================================================
-        return to_native(result)
-        
+    except (Overloaded, HTTPException):
+        raise
+
     except Exception as e:
-        print("❌ FATAL ERROR IN /review/query")
-        print(traceback.format_exc())
+        logger.exception("Fatal error in /review/query")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import time
+
+from fastapi import APIRouter, Depends, Header, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+from api.sessions import session_registry
+from api.upload import read_upload, upload_openapi
+from api.routes.review import open_dataset, to_native
+from admission.limits import Overloaded, request_limiter, request_slot
+from cache.memory_cache import memory_cache, tenant_id, DEFAULT_TENANT
+from cache.shared_store import dataset_store
+from telemetry.log import get_logger, new_request_id, request_id_var
+
+router = APIRouter()
+
+logger = get_logger("session")
+
+# WebSocket close codes (4xxx = application-defined)
+CLOSE_UNKNOWN_DATASET = 4404
+CLOSE_IDLE = 4408
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+# =====================================================
+# Bind Step: Upload Once, Get a Dataset Key
+# =====================================================
+@router.post("/dataset", openapi_extra=upload_openapi(), dependencies=[Depends(request_slot)])
+async def create_session_dataset(
+    request: Request,
+    tenant: str = Header(DEFAULT_TENANT, alias="X-Tenant-ID")
+):
+    """
+    Parses + prepares the CSV (or finds it cached) and returns the key
+    to open a session with: ws /session/ws?dataset_key=...
+    """
+    upload = await read_upload(request)
+
+    def prepare():
+        with open_dataset(upload.raw_bytes, tenant, upload.key) as (clean_df, weekly_df, weekly_total, analysis_week):
+            return {"rows": len(clean_df), "weeks": len(weekly_total), "analysis_week": str(analysis_week)}
+
+    summary = await run_in_threadpool(prepare)
+    return {
+        "dataset_key": upload.key,
+        **summary,
+        "websocket": f"/session/ws?dataset_key={upload.key}",
+    }
+
+
+def cached_dataset(key, tenant):
+    """
+    Prepared frames from the memory cache or the shared store; None if
+    neither has them (the client must upload via POST /session/dataset).
+    """
+    prepared = memory_cache.get(key, tenant)
+    if prepared is not None:
+        return prepared
+    with dataset_store.attach(key) as cached:
+        if cached is None:
+            return None
+        return memory_cache.put(key, cached, tenant)
+
+
+# =====================================================
+# Interactive Session (WebSocket)
+#
+# → {"type": "query", "query": "...", "id": <optional, echoed>}
+# → {"type": "ping"}
+# ← {"type": "ready", ...session info}
+# ← {"type": "answer", "id", "seconds", "intent_cached", "result"}
+# ← {"type": "error", "id", "error", "detail"[, "retry_after"]}
+# =====================================================
+@router.websocket("/ws")
+async def session_socket(
+    websocket: WebSocket,
+    dataset_key: str = Query(...),
+    tenant: str = Query(None),
+    tenant_header: str = Header(None, alias="X-Tenant-ID")
+):
+    tenant = tenant_id(tenant or tenant_header)
+    await websocket.accept()
+
+    prepared = None
+    if dataset_key.isalnum():
+        prepared = await run_in_threadpool(cached_dataset, dataset_key, tenant)
+    if prepared is None:
+        await websocket.send_json({
+            "type": "error",
+            "error": "unknown_dataset",
+            "detail": "Dataset not cached on the server; upload it with POST /session/dataset",
+        })
+        await websocket.close(code=CLOSE_UNKNOWN_DATASET)
+        return
+
+    session = await run_in_threadpool(session_registry.open, dataset_key, tenant, prepared)
+    if session is None:
+        await websocket.send_json({
+            "type": "error",
+            "error": "overloaded",
+            "detail": "Too many open sessions, or their datasets fill this worker's memory budget",
+        })
+        await websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+        return
+
+    idle = False
+    try:
+        await websocket.send_json({"type": "ready", **session.info()})
+
+        while True:
+            try:
+                raw = await asyncio.wait_for(websocket.receive_text(), timeout=session_registry.idle_seconds)
+            except asyncio.TimeoutError:
+                idle = True
+                await websocket.send_json({"type": "closing", "reason": "idle"})
+                await websocket.close(code=CLOSE_IDLE)
+                return
+
+            session.touch()
+            await websocket.send_json(await handle_message(session, raw))
+            session.touch()
+
+    except WebSocketDisconnect:
+        pass
+
+    finally:
+        session_registry.close(session, idle=idle)
+
+
+async def handle_message(session, raw):
+    try:
+        message = json.loads(raw)
+    except ValueError:
+        return {"type": "error", "error": "invalid_message", "detail": "Messages must be JSON objects"}
+    if not isinstance(message, dict):
+        return {"type": "error", "error": "invalid_message", "detail": "Messages must be JSON objects"}
+
+    message_id = message.get("id")
+    kind = message.get("type", "query")
+
+    if kind == "ping":
+        return {"type": "pong", "id": message_id}
+
+    query = message.get("query")
+    if kind != "query" or not isinstance(query, str) or not query.strip():
+        return {
+            "type": "error",
+            "id": message_id,
+            "error": "invalid_message",
+            "detail": "Expected {\"type\": \"query\", \"query\": \"...\"} or {\"type\": \"ping\"}",
+        }
+
+    # One request id per question, like an HTTP request
+    token = request_id_var.set(new_request_id())
+    try:
+        return await answer_query(session, query, message_id)
+    finally:
+        request_id_var.reset(token)
+
+
+async def answer_query(session, query, message_id):
+    from engines.query_engine import process_natural_language_query
+
+    clean_df, weekly_df, weekly_total, _ = session.prepared
+    intent = session.cached_intent(query)
+    start = time.perf_counter()
+
+    try:
+        async with request_limiter.slot():
+            result = await run_in_threadpool(
+                process_natural_language_query,
+                user_query=query,
+                clean_df=clean_df,
+                weekly_df=weekly_df,
+                weekly_total=weekly_total,
+                intent=intent,
+            )
+
+    except Overloaded as e:
+        return {
+            "type": "error",
+            "id": message_id,
+            "error": "overloaded",
+            "detail": str(e),
+            "retry_after": e.retry_after,
+        }
+
+    except Exception as e:
+        logger.exception("Session query failed")
+        return {"type": "error", "id": message_id, "error": "failed", "detail": str(e)}
+
+    session.queries += 1
+    session.remember_intent(query, result["intent"])
+
+    return {
+        "type": "answer",
+        "id": message_id,
+        "seconds": round(time.perf_counter() - start, 3),
+        "intent_cached": intent is not None,
+        "result": jsonable_encoder(to_native(result)),
+    }
@@ -0,0 +1,155 @@
+# api/sessions.py
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from cache.memory_cache import memory_cache
+from telemetry.log import get_logger
+
+logger = get_logger("sessions")
+
+# A session with no question for this long is closed
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "600"))
+
+# Open sessions per worker process; more are refused (close code 1013)
+SESSION_MAX = int(os.getenv("SESSION_MAX", "64"))
+
+# Classified intents remembered per session (identical follow-ups skip the classifier)
+SESSION_RECENT_INTENTS = int(os.getenv("SESSION_RECENT_INTENTS", "32"))
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+# ============================================================
+# One Interactive Session (one WebSocket connection)
+# ============================================================
+class Session:
+    """
+    Holds a bound dataset's prepared frames (clean_df, weekly cube,
+    weekly_total) for the life of the connection — pinned in the memory
+    cache, so they count against DATASET_MEMORY_BUDGET_MB — plus
+    recently classified intents.
+    """
+
+    def __init__(self, dataset_key, tenant, prepared):
+        self.session_id = uuid.uuid4().hex
+        self.dataset_key = dataset_key
+        self.tenant = tenant
+        self.prepared = prepared
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.queries = 0
+        self._intents = OrderedDict()
+
+    def touch(self):
+        self.last_active = time.time()
+
+    def cached_intent(self, query):
+        intent = self._intents.get(normalize_query(query))
+        if intent is not None:
+            self._intents.move_to_end(normalize_query(query))
+        return intent
+
+    def remember_intent(self, query, intent):
+        key = normalize_query(query)
+        # Without the per-question field, so it can be reused verbatim
+        self._intents[key] = {k: v for k, v in intent.items() if k != "original_query"}
+        self._intents.move_to_end(key)
+        while len(self._intents) > SESSION_RECENT_INTENTS:
+            self._intents.popitem(last=False)
+
+    def info(self):
+        clean_df, weekly_df, weekly_total, analysis_week = self.prepared
+        return {
+            "session_id": self.session_id,
+            "dataset_key": self.dataset_key,
+            "rows": len(clean_df),
+            "weeks": len(weekly_total),
+            "analysis_week": str(analysis_week),
+            "idle_timeout_s": SESSION_IDLE_SECONDS,
+        }
+
+
+# ============================================================
+# Per-process Registry
+# ============================================================
+class SessionRegistry:
+    """
+    Live sessions of this worker. Sessions are connection-scoped, so a
+    client reconnecting to another worker simply re-binds by dataset key
+    (the prepared frames come from the shared store).
+    """
+
+    def __init__(self, max_sessions=None, idle_seconds=None, cache=None):
+        self.max_sessions = SESSION_MAX if max_sessions is None else max_sessions
+        self.idle_seconds = SESSION_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self.cache = memory_cache if cache is None else cache
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.idle_closed = 0
+        self.refused = 0
+        self.refused_memory = 0
+
+    def open(self, dataset_key, tenant, prepared):
+        """
+        Registers a new session, or returns None at capacity (session
+        count, or the memory budget full of other sessions' datasets).
+        Blocking (measures the frames): call it off the event loop.
+        """
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                self.refused += 1
+                return None
+            # Claim the slot before pinning, which runs outside the lock
+            session = Session(dataset_key, tenant, None)
+            self._sessions[session.session_id] = session
+
+        pinned = self.cache.pin(dataset_key, prepared, tenant)
+        if pinned is None:
+            with self._lock:
+                self._sessions.pop(session.session_id, None)
+                self.refused += 1
+                self.refused_memory += 1
+            logger.warning("Session refused: memory budget", extra={"dataset": dataset_key[:12]})
+            return None
+        session.prepared = pinned
+        with self._lock:
+            self.opened += 1
+
+        logger.info("Session opened", extra={"session_id": session.session_id, "dataset": dataset_key[:12]})
+        return session
+
+    def close(self, session, idle=False):
+        with self._lock:
+            if self._sessions.pop(session.session_id, None) is None:
+                return
+            if idle:
+                self.idle_closed += 1
+        # Drop the frames now rather than whenever the handler is collected
+        session.prepared = None
+        self.cache.unpin(session.dataset_key, session.tenant)
+        logger.info(
+            "Session closed",
+            extra={"session_id": session.session_id, "queries": session.queries, "idle": idle}
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "open": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_timeout_s": self.idle_seconds,
+                "opened": self.opened,
+                "idle_closed": self.idle_closed,
+                "refused": self.refused,
+                "refused_memory": self.refused_memory,
+            }
+
+
+session_registry = SessionRegistry()
@@ -0,0 +1,64 @@
+# api/singleflight.py
+
+import asyncio
+import hashlib
+import json
+
+from telemetry.metrics import COALESCED_REQUESTS
+
+
+# =====================================================
+# Request Coalescing (singleflight)
+# =====================================================
+class SingleFlight:
+    """
+    Concurrent calls with the same key share ONE in-flight computation.
+
+    The first caller (leader) starts the work as a task; callers that
+    arrive while it is running await the same task and receive the
+    same result (or exception). The key is forgotten as soon as the
+    work finishes, so later calls recompute / hit the caches normally.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        task = self._inflight.get(key)
+
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            COALESCED_REQUESTS.inc(endpoint=key.split(":", 1)[0])
+
+        # shield: a disconnecting caller must not cancel the shared work
+        return await asyncio.shield(task)
+
+    def in_flight(self):
+        return len(self._inflight)
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight(),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+def request_key(endpoint: str, dataset_hash: str, **params) -> str:
+    """
+    Coalescing key: endpoint + uploaded file content hash + parameters.
+    """
+    payload = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    return f"{endpoint}:{dataset_hash}:{digest}"
+
+
+# Process-wide instance shared by the review routes
+review_flights = SingleFlight()
@@ -0,0 +1,341 @@
+# api/upload.py
+
+import csv
+import hashlib
+import os
+import re
+import zlib
+
+from fastapi import HTTPException, Request
+
+try:
+    from python_multipart.multipart import MultipartParser, MultipartParseError, parse_options_header
+except ImportError:  # python-multipart < 0.0.12
+    from multipart.multipart import MultipartParser, MultipartParseError, parse_options_header
+
+from engines.schema import COLUMN_ROLES
+
+UPLOAD_MAX_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "200")) * 1024 * 1024)
+UPLOAD_MAX_ROWS = int(os.getenv("UPLOAD_MAX_ROWS", "5000000"))
+
+# A CSV header line longer than this is treated as malformed
+MAX_HEADER_BYTES = 64 * 1024
+
+# Multipart framing + small form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Largest accepted non-file form field (query, dataset_key, ...)
+MAX_FIELD_BYTES = 8 * 1024
+
+# Gzip request bodies are inflated at most this much per step, so a
+# compression bomb trips the size limit before it is expanded in memory
+INFLATE_CHUNK_BYTES = 1024 * 1024
+
+# Upload-by-hash: a "dataset_key" form field instead of the file part
+DATASET_KEY_FIELD = "dataset_key"
+DATASET_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+REQUIRED_COLUMNS = (
+    [COLUMN_ROLES["time"]["primary"]]
+    + [COLUMN_ROLES["metrics"]["primary"]]
+    + COLUMN_ROLES["dimensions"]["primary"]
+)
+
+
+# =====================================================
+# OpenAPI Request Bodies (parsed manually, see read_upload)
+# =====================================================
+def upload_openapi(**form_fields):
+    properties = {
+        "file": {"type": "string", "format": "binary"},
+        DATASET_KEY_FIELD: {
+            "type": "string",
+            "description": "SHA-256 of a file the server already has (GET /review/datasets/{key}), sent instead of file",
+        },
+    }
+    properties.update({name: {"type": "string"} for name in form_fields})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": list(form_fields),
+                        "properties": properties,
+                    }
+                }
+            },
+        }
+    }
+
+
+# =====================================================
+# Streaming CSV Upload
+# =====================================================
+class UploadedCSV:
+    """
+    raw_bytes is None for an upload-by-hash; the dataset must then
+    be served from cache (see open_dataset).
+    """
+
+    def __init__(self, raw_bytes, key, columns, rows, form):
+        self.raw_bytes = raw_bytes
+        self.key = key
+        self.columns = columns
+        self.rows = rows
+        self.form = form
+
+
+def validate_header(line: bytes):
+    """
+    Column names from the CSV header line, checked against COLUMN_ROLES.
+    """
+    try:
+        text = line.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV header is not valid UTF-8")
+
+    columns = next(csv.reader([text.rstrip("\r\n")]), [])
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing required columns: {missing}")
+    return columns
+
+
+class _CSVUploadParser:
+    """
+    Multipart callbacks for one request. The "file" part is hashed,
+    size-checked and line-counted as chunks arrive, and its header is
+    validated as soon as the first line is complete — so a bad or
+    oversized upload is rejected without reading the rest of the body.
+    """
+
+    def __init__(self, max_bytes, max_rows):
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+
+        self.form = {}
+        self.file_chunks = []
+        self.file_size = 0
+        self.newlines = 0
+        self.last_byte = b""
+        self.columns = None
+        self.hasher = hashlib.sha256()
+        self.saw_file = False
+
+        self._header_field = b""
+        self._header_value = b""
+        self._part_headers = {}
+        self._part_name = None
+        self._part_is_file = False
+        self._field_chunks = []
+        self._field_size = 0
+
+    # ---------- part headers ----------
+    def on_part_begin(self):
+        self._part_headers = {}
+        self._part_name = None
+        self._part_is_file = False
+        self._field_chunks = []
+        self._field_size = 0
+
+    def on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._part_headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._part_headers.get(b"content-disposition", b""))
+        self._part_name = options.get(b"name", b"").decode("latin-1")
+        self._part_is_file = self._part_name == "file"
+        if self._part_is_file:
+            self.saw_file = True
+
+    # ---------- part data ----------
+    def on_part_data(self, data, start, end):
+        chunk = data[start:end]
+        if not chunk:
+            return
+
+        if not self._part_is_file:
+            self._field_size += len(chunk)
+            if self._field_size > MAX_FIELD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Form field '{self._part_name}' exceeds {MAX_FIELD_BYTES // 1024} KB"
+                )
+            self._field_chunks.append(chunk)
+            return
+
+        self.file_size += len(chunk)
+        if self.file_size > self.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds the {self.max_bytes // (1024 * 1024)} MB upload limit"
+            )
+
+        self.hasher.update(chunk)
+        self.file_chunks.append(chunk)
+        self.newlines += chunk.count(b"\n")
+        self.last_byte = chunk[-1:]
+
+        if self.columns is None:
+            self._sniff_header()
+
+        # Data rows so far (header line excluded)
+        if self.newlines - 1 > self.max_rows:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds the {self.max_rows:,} row limit"
+            )
+
+    def _sniff_header(self):
+        if self.newlines == 0:
+            if self.file_size > MAX_HEADER_BYTES:
+                raise HTTPException(status_code=400, detail="CSV header line is too long or missing")
+            return
+        head = b"".join(self.file_chunks)
+        self.columns = validate_header(head[:head.index(b"\n") + 1])
+
+    def on_part_end(self):
+        if not self._part_is_file:
+            try:
+                self.form[self._part_name] = b"".join(self._field_chunks).decode("utf-8")
+            except UnicodeDecodeError:
+                raise HTTPException(status_code=400, detail=f"Form field '{self._part_name}' is not valid UTF-8")
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    # ---------- result ----------
+    def result(self, required_fields):
+        missing = [f for f in required_fields if f not in self.form]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing form fields: {missing}")
+
+        if not self.saw_file and DATASET_KEY_FIELD in self.form:
+            key = self.form[DATASET_KEY_FIELD].strip().lower()
+            if not DATASET_KEY_PATTERN.match(key):
+                raise HTTPException(status_code=400, detail="dataset_key must be a SHA-256 hex digest")
+            return UploadedCSV(raw_bytes=None, key=key, columns=None, rows=None, form=self.form)
+
+        if not self.saw_file or self.file_size == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="No CSV file uploaded (form field 'file', or 'dataset_key' for a cached dataset)"
+            )
+
+        if self.columns is None:
+            # Single-line file without a trailing newline
+            self.columns = validate_header(b"".join(self.file_chunks))
+
+        rows = self.newlines - 1 + (1 if self.last_byte not in (b"\n", b"") else 0)
+        if rows <= 0:
+            raise HTTPException(status_code=400, detail="CSV has a header but no data rows")
+
+        return UploadedCSV(
+            raw_bytes=b"".join(self.file_chunks),
+            key=self.hasher.hexdigest(),
+            columns=self.columns,
+            rows=rows,
+            form=self.form,
+        )
+
+
+def _inflate(decompressor, chunk):
+    """
+    Yields the decompressed output of chunk in bounded pieces.
+    """
+    while chunk:
+        data = decompressor.decompress(chunk, INFLATE_CHUNK_BYTES)
+        chunk = decompressor.unconsumed_tail
+        if data:
+            yield data
+
+
+async def read_upload(request: Request, form_fields=(), max_bytes=None, max_rows=None) -> UploadedCSV:
+    """
+    Streams a multipart/form-data CSV upload from the request body,
+    inflating it on the fly when sent with Content-Encoding: gzip.
+
+    Raises 413 as soon as the size or row limit is crossed (or up front
+    from Content-Length; chunked bodies are counted as they arrive), or
+    a form field exceeds MAX_FIELD_BYTES, 415 for an unsupported Content-Encoding, and
+    400 for a non-multipart body, a missing file / form field, or a
+    header lacking required columns.
+
+    A "dataset_key" form field may replace the file; the result then
+    has raw_bytes=None.
+    """
+    max_bytes = UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    max_rows = UPLOAD_MAX_ROWS if max_rows is None else max_rows
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit"
+        )
+
+    encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if encoding not in ("identity", "gzip"):
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding '{encoding}' (use gzip)")
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == "gzip" else None
+    max_body = max_bytes + MULTIPART_OVERHEAD_BYTES
+
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit"
+    )
+
+    upload = _CSVUploadParser(max_bytes, max_rows)
+    parser = MultipartParser(boundary, upload.callbacks())
+    received = 0
+    inflated = 0
+
+    try:
+        async for chunk in request.stream():
+            # Bytes on the wire: Content-Length may be absent (chunked)
+            received += len(chunk)
+            if received > max_body:
+                raise too_large
+
+            if decompressor is None:
+                parser.write(chunk)
+                continue
+
+            for data in _inflate(decompressor, chunk):
+                inflated += len(data)
+                if inflated > max_body:
+                    raise too_large
+                parser.write(data)
+
+        if decompressor is not None and not decompressor.eof:
+            raise HTTPException(status_code=400, detail="Truncated gzip request body")
+        parser.finalize()
+    except MultipartParseError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed multipart upload: {e}")
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Malformed gzip request body: {e}")
+
+    return upload.result(form_fields)
@@ -0,0 +1,201 @@
+# api/warmup.py
+
+import importlib
+import os
+import threading
+import time
+
+from telemetry.log import get_logger
+from telemetry.metrics import suppressed
+
+logger = get_logger("warmup")
+
+# Load the heavy pieces in the background once the server is up
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+# Head start for the first liveness check before warmup competes for the GIL
+WARMUP_DELAY_S = float(os.getenv("WARMUP_DELAY_S", "0"))
+
+# Datasets preloaded from the shared store: "recent:N" (most recently
+# used N entries), a comma-separated list of dataset keys, or "none"
+WARMUP_DATASETS = os.getenv("WARMUP_DATASETS", "recent:4")
+
+# Open the LLM provider connection during warmup (no tokens spent)
+WARMUP_PRIME_LLM = os.getenv("WARMUP_PRIME_LLM", "1") == "1"
+
+# Bound on that request (one attempt); readiness does not wait for it
+WARMUP_LLM_TIMEOUT_S = float(os.getenv("WARMUP_LLM_TIMEOUT_S", "5"))
+
+# (step, modules) in load order — everything the request path imports lazily
+WARMUP_MODULES = (
+    ("data_stack", ("numpy", "pandas", "pyarrow", "pyarrow.feather")),
+    ("engines", ("engines.prep_engine", "engines.review_graph", "engines.query_engine")),
+)
+
+# Small bundled dataset (2,000 rows, 53 weeks) the review path is exercised on
+WARMUP_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_data", "warmup_sales.csv"
+)
+
+# Sections computed while warming; the LLM summary is deliberately left out
+WARMUP_FIELDS = ("metrics", "trends", "anomalies")
+
+
+def warmup_dataset_keys(spec=None, cache_dir=None):
+    """
+    Dataset keys selected by WARMUP_DATASETS.
+    """
+    from cache.disk_cache import list_entries
+
+    spec = (WARMUP_DATASETS if spec is None else spec).strip()
+    if not spec or spec == "none":
+        return []
+    if spec.startswith("recent:"):
+        return [e["key"] for e in list_entries(cache_dir)[:int(spec.split(":", 1)[1])]]
+    return [key.strip() for key in spec.split(",") if key.strip()]
+
+
+# ============================================================
+# Warmup State
+# ============================================================
+class Warmup:
+    """
+    Runs on a background thread after startup: imports the lazily-loaded
+    modules, exercises the review path once, pre-builds caches for
+    configured datasets and primes the LLM client. ready flips before
+    the LLM step (which only saves the first summary a handshake) and
+    stays set.
+
+    A failing step is logged and skipped; the request path will simply
+    do that work itself.
+    """
+
+    def __init__(self):
+        self.status = "pending"
+        self.ready = False
+        self.steps = {}
+        self.datasets = []
+        self.seconds = None
+        self.finished_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, delay=None):
+        """
+        Starts a run unless one is in progress. Returns False if it was.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self.status = "running"
+            self._thread = threading.Thread(
+                target=self.run,
+                args=(WARMUP_DELAY_S if delay is None else delay,),
+                name="warmup",
+                daemon=True,
+            )
+            self._thread.start()
+            return True
+
+    def run(self, delay=0.0):
+        if delay:
+            time.sleep(delay)
+
+        self.status = "running"
+        self.steps = {}
+        start = time.perf_counter()
+
+        # Not user traffic: keep it out of the /metrics histograms and counters
+        with suppressed():
+            for step, modules in WARMUP_MODULES:
+                self._step(step, lambda modules=modules: [importlib.import_module(m) for m in modules])
+
+            self._step("hot_paths", self._exercise_review_path)
+            self._step("datasets", self._preload_datasets)
+
+            # Ready without it: a slow or unreachable provider must not
+            # hold back /health/ready (and with it a deploy)
+            self.ready = True
+            self._step("llm_client", self._prime_llm)
+
+        self.seconds = round(time.perf_counter() - start, 3)
+        self.finished_at = time.time()
+        self.status = "done"
+        logger.info(
+            "Warmup finished",
+            extra={"seconds": self.seconds, "steps": self.steps, "datasets": len(self.datasets)}
+        )
+
+    def _step(self, name, fn):
+        step_start = time.perf_counter()
+        try:
+            fn()
+            self.steps[name] = round(time.perf_counter() - step_start, 3)
+        except Exception as e:
+            self.steps[name] = f"failed: {e}"
+            logger.warning("Warmup step %s failed: %s", name, e)
+
+    # --------------------------------------------------------
+    # Steps
+    # --------------------------------------------------------
+    def _exercise_review_path(self):
+        """
+        One review of WARMUP_CSV end to end (CSV parse, prep, engine
+        graph, sanitizer), so first-call setup inside pandas is paid
+        here rather than by the first user. Nothing is cached.
+        """
+        import pandas as pd
+
+        from engines.prep_engine import prepare_data
+        from api.routes.review import build_full_review, to_native
+
+        prepared = prepare_data(pd.read_csv(WARMUP_CSV))
+        to_native(build_full_review(*prepared, fields=WARMUP_FIELDS))
+
+    def _prime_llm(self):
+        from ai.llm_client import get_llm_client, prime_llm_client
+
+        if WARMUP_PRIME_LLM:
+            prime_llm_client(timeout=WARMUP_LLM_TIMEOUT_S)
+        else:
+            get_llm_client()
+
+    def _preload_datasets(self):
+        """
+        Loads the selected datasets from the shared store into the
+        memory cache and memoizes their engine intermediates.
+        """
+        from cache.memory_cache import memory_cache
+        from cache.shared_store import dataset_store
+        from engines.review_graph import run_full_review_graph
+        from api.routes.review import field_targets
+
+        self.datasets = []
+        for key in warmup_dataset_keys(cache_dir=dataset_store.store_dir):
+            with dataset_store.attach(key) as prepared:
+                if prepared is None:
+                    logger.warning("Warmup dataset %s is not in the shared store", key[:12])
+                    continue
+                prepared = memory_cache.put(key, prepared)
+                run_full_review_graph(*prepared, dataset_key=key, targets=field_targets(WARMUP_FIELDS))
+            self.datasets.append(key[:12])
+
+    # --------------------------------------------------------
+    # Inspection
+    # --------------------------------------------------------
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def state(self):
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "seconds": self.seconds,
+            "steps": dict(self.steps),
+            "datasets": list(self.datasets),
+            "finished_at": self.finished_at,
+        }
+
+
+warmup = Warmup()
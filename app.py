@@ -4,8 +4,12 @@ import streamlit as st
 import pandas as pd
 import requests
 import plotly.express as px
-import io
+import gzip
+import hashlib
 import os
+import time
+from requests.adapters import HTTPAdapter
+from urllib3 import encode_multipart_formdata
 # -----------------------------
 # Page Configuration
 # -----------------------------
@@ -18,16 +22,35 @@ st.set_page_config(
 # -----------------------------
 # Project Imports (UI ONLY)
 # -----------------------------
-from viz.charts import (
-    plot_weekly_revenue,
-    plot_country_drivers,
-    plot_channel_trends
-)
+from viz.specs import build_figures
 
 # UPDATED: Use environment variable for API URL (cloud deployment)
 FASTAPI_BASE_URL = os.getenv("FASTAPI_BASE_URL", "http://127.0.0.1:8000")
 FASTAPI_URL_FULL = f"{FASTAPI_BASE_URL}/review/full"
 FASTAPI_URL_QUERY = f"{FASTAPI_BASE_URL}/review/query"
+FASTAPI_URL_JOBS = f"{FASTAPI_BASE_URL}/jobs"
+
+# Uploads above this size run as a background job (no long-held request)
+BACKGROUND_JOB_THRESHOLD_MB = float(os.getenv("BACKGROUND_JOB_THRESHOLD_MB", "5"))
+
+# Give up polling a background job after this long
+JOB_POLL_TIMEOUT_S = int(os.getenv("JOB_POLL_TIMEOUT_S", "900"))
+
+# Upload bodies at least this large are sent gzip-compressed
+UPLOAD_GZIP_MIN_BYTES = int(os.getenv("UPLOAD_GZIP_MIN_BYTES", "16384"))
+UPLOAD_GZIP_LEVEL = int(os.getenv("UPLOAD_GZIP_LEVEL", "6"))
+
+# Client-side result cache: reruns (every widget interaction) and
+# repeated questions are served without calling the API
+UI_CACHE_ENTRIES = int(os.getenv("UI_CACHE_ENTRIES", "32"))
+UI_CACHE_TTL_S = int(os.getenv("UI_CACHE_TTL_S", "3600"))
+
+JOB_STAGE_LABELS = {
+    "parse": "Parsing CSV",
+    "prep": "Preparing data",
+    "engines": "Running analytics engines",
+    "summary": "Writing executive summary",
+}
 
 # Display API URL in sidebar for debugging
 st.sidebar.caption(f"🔗 API: {FASTAPI_BASE_URL}")
@@ -73,9 +96,12 @@ uploaded_file = st.sidebar.file_uploader(
 
 # Store uploaded file in session state
 if uploaded_file is not None:
-    # Read file content and store in session state
-    st.session_state.uploaded_file_content = uploaded_file.read()
-    uploaded_file.seek(0)  # Reset file pointer
+    # Read + hash once per upload, not on every rerun; the hash keys
+    # every cached API result, frame and figure below
+    if st.session_state.get("uploaded_file_id") != uploaded_file.file_id:
+        st.session_state.uploaded_file_content = uploaded_file.getvalue()
+        st.session_state.uploaded_file_key = hashlib.sha256(st.session_state.uploaded_file_content).hexdigest()
+        st.session_state.uploaded_file_id = uploaded_file.file_id
     
     # Show file info
     st.sidebar.success(f"✅ File loaded: {uploaded_file.name}")
@@ -120,6 +146,198 @@ with st.sidebar.expander("ℹ️ How to Use"):
     - Revenue, Units Sold, etc.
     """)
 
+# -----------------------------
+# API Calls (cached by file hash + parameters)
+# -----------------------------
+class APIError(Exception):
+    """
+    Non-200 API response. Raised (never returned) so cached functions
+    only ever store successful results.
+    """
+
+    def __init__(self, response):
+        super().__init__(f"API returned {response.status_code}")
+        self.status_code = response.status_code
+        self.text = response.text
+
+
+class QueryFailed(Exception):
+    """
+    The API answered, but could not answer the question.
+    """
+
+
+@st.cache_resource
+def http_session():
+    """
+    Keep-alive connection pool to the API, shared by every rerun and
+    user of this Streamlit process.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def post_dataset(url, file_key, file_name, content, fields=None, timeout=300):
+    """
+    Multipart POST of the CSV plus form fields. Only the file's key
+    (SHA-256) is sent first; if the API does not have it (409) the
+    body follows, gzip-compressed.
+    """
+    session = http_session()
+    fields = dict(fields or {})
+
+    body, content_type = encode_multipart_formdata({**fields, "dataset_key": file_key})
+    response = session.post(url, data=body, headers={"Content-Type": content_type}, timeout=timeout)
+    if response.status_code != 409:
+        return response
+
+    body, content_type = encode_multipart_formdata({**fields, "file": (file_name, content, "text/csv")})
+    headers = {"Content-Type": content_type}
+    if len(body) >= UPLOAD_GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=UPLOAD_GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return session.post(url, data=body, headers=headers, timeout=timeout)
+
+
+def run_review_job(file_key, file_name, content):
+    """
+    Submits the review to /jobs/review, shows stage progress while
+    polling, and returns the final result response (or the failing
+    status response: 404 once the job expired or its worker restarted).
+    Raises requests.exceptions.Timeout after JOB_POLL_TIMEOUT_S.
+    """
+    submit = post_dataset(f"{FASTAPI_URL_JOBS}/review", file_key, file_name, content)
+    if submit.status_code != 202:
+        return submit
+
+    job = submit.json()
+    progress_bar = st.progress(0, text="Queued...")
+    deadline = time.monotonic() + JOB_POLL_TIMEOUT_S
+
+    try:
+        while True:
+            response = http_session().get(f"{FASTAPI_BASE_URL}{job['status_url']}", timeout=30)
+            if response.status_code != 200:
+                return response
+
+            status = response.json()
+            if status.get("status") in ("done", "failed"):
+                break
+
+            if time.monotonic() > deadline:
+                raise requests.exceptions.Timeout(
+                    f"Job {job['job_id']} not finished after {JOB_POLL_TIMEOUT_S}s"
+                )
+
+            progress = status.get("progress", 0)
+            label = JOB_STAGE_LABELS.get(status.get("stage"), "Queued")
+            progress_bar.progress(progress, text=f"{label}... {progress}%")
+            time.sleep(1)
+    finally:
+        progress_bar.empty()
+
+    # Failed jobs answer 500 with the error as detail
+    return http_session().get(f"{FASTAPI_BASE_URL}{job['result_url']}", timeout=60)
+
+
+class NotCached(Exception):
+    """
+    cached_review lookup miss.
+    """
+
+
+@st.cache_data(max_entries=UI_CACHE_ENTRIES, ttl=UI_CACHE_TTL_S, show_spinner=False)
+def cached_review(file_key, _response=None):
+    """
+    /review/full payload by file hash. Without _response this is only
+    a lookup (raises NotCached on a miss; exceptions are not cached);
+    with one, its JSON is stored. Draws nothing, so a cache hit never
+    replays UI elements.
+    """
+    if _response is None:
+        raise NotCached(file_key)
+    return _response.json()
+
+
+def fetch_review(file_key, file_name, content):
+    """
+    /review/full result for an upload: from the client-side cache, or
+    from the API (large files via a background job with a progress bar,
+    drawn here, outside any cached function).
+    """
+    try:
+        return cached_review(file_key)
+    except NotCached:
+        pass
+
+    if len(content) > BACKGROUND_JOB_THRESHOLD_MB * 1024 * 1024:
+        response = run_review_job(file_key, file_name, content)
+    else:
+        response = post_dataset(FASTAPI_URL_FULL, file_key, file_name, content)
+
+    if response.status_code != 200:
+        raise APIError(response)
+    return cached_review(file_key, response)
+
+
+@st.cache_data(max_entries=UI_CACHE_ENTRIES * 4, ttl=UI_CACHE_TTL_S, show_spinner=False)
+def fetch_query_answer(file_key, question, _content):
+    response = post_dataset(
+        FASTAPI_URL_QUERY,
+        file_key,
+        "data.csv",
+        _content,
+        fields={"query": question},
+        timeout=120
+    )
+
+    if response.status_code != 200:
+        raise APIError(response)
+
+    result = response.json()
+    # Failed answers are not cached — asking again retries
+    if not result.get("success", True):
+        raise QueryFailed(result.get("answer", "Unknown error"))
+    return result
+
+
+# -----------------------------
+# Frames + Figures (cached by file hash)
+# st.cache_resource: shared objects, no copy on each rerun
+# -----------------------------
+@st.cache_resource(max_entries=UI_CACHE_ENTRIES, ttl=UI_CACHE_TTL_S, show_spinner=False)
+def build_review_figures(file_key, _data):
+    return build_figures(_data)
+
+
+@st.cache_resource(max_entries=UI_CACHE_ENTRIES * 4, ttl=UI_CACHE_TTL_S, show_spinner=False)
+def build_query_chart(file_key, question, chart_type, _data):
+    """
+    (DataFrame, figure or None) for a query answer's data.
+    """
+    df_viz = pd.DataFrame(_data)
+
+    # Smart chart rendering based on data structure
+    if chart_type == "bar" and "wow_pct" in df_viz.columns:
+        for dimension, title in (("Country", "Regional Performance"), ("Channel", "Channel Performance")):
+            if dimension in df_viz.columns:
+                fig = px.bar(
+                    df_viz, 
+                    x=dimension, 
+                    y="wow_pct",
+                    title=title,
+                    labels={"wow_pct": "WoW % Change"},
+                    color="wow_pct",
+                    color_continuous_scale="RdYlGn"
+                )
+                return df_viz, fig
+
+    return df_viz, None
+
+
 # -----------------------------
 # Main Execution with Enhanced Error Handling
 # -----------------------------
@@ -128,48 +346,45 @@ if uploaded_file and run_analysis:
     with st.spinner("🔄 Running executive review... This may take 30-60 seconds."):
         
         try:
-            # Reset file pointer
-            uploaded_file.seek(0)
-            
-            response = requests.post(
-                FASTAPI_URL_FULL,
-                files={"file": uploaded_file},
-                timeout=300  # 2 minute timeout
+            # Same file again: served from the client-side cache
+            analysis = fetch_review(
+                st.session_state.uploaded_file_key,
+                uploaded_file.name,
+                st.session_state.uploaded_file_content
             )
+
+        except APIError as e:
+            st.error("❌ Failed to process data via FastAPI.")
             
-            # Check response status
-            if response.status_code != 200:
-                st.error("❌ Failed to process data via FastAPI.")
-                
-                # Show detailed error
-                with st.expander("🔍 Error Details"):
-                    st.code(response.text[:1000])
-                
-                # Troubleshooting tips
-                st.error("**Troubleshooting Tips:**")
-                st.markdown("""
-                1. **Check if FastAPI is running:**
-                   ```bash
-                   uvicorn api.main:app --reload
-                   ```
-                
-                2. **Verify your API key is set:**
-                   ```bash
-                   echo $env:OPENAI_API_KEY  # PowerShell
-                   ```
-                
-                3. **Check the FastAPI terminal for error messages**
-                
-                4. **Try restarting both servers**
-                """)
-                st.stop()
-        
+            # Show detailed error
+            with st.expander("🔍 Error Details"):
+                st.code(e.text[:1000])
+            
+            # Troubleshooting tips
+            st.error("**Troubleshooting Tips:**")
+            st.markdown("""
+            1. **Check if FastAPI is running:**
+               ```bash
+               uvicorn api.main:app --reload
+               ```
+            
+            2. **Verify your API key is set:**
+               ```bash
+               echo $env:OPENAI_API_KEY  # PowerShell
+               ```
+            
+            3. **Check the FastAPI terminal for error messages**
+            
+            4. **Try restarting both servers**
+            """)
+            st.stop()
+    
         except requests.exceptions.Timeout:
-            st.error("⏱️ Request timed out (exceeded 2 minutes)")
+            st.error("⏱️ Request timed out")
             st.warning("This might happen with very large datasets or slow API responses.")
             st.info("**Try these solutions:**")
-            st.markdown("""
-            - Use a smaller dataset (< 50,000 rows)
+            st.markdown(f"""
+            - Files over {BACKGROUND_JOB_THRESHOLD_MB:g} MB run as background jobs with no time limit
             - Check your internet connection (for OpenAI API calls)
             - Verify OpenAI API credits are available
             - Restart the FastAPI server
@@ -211,7 +426,8 @@ python -m uvicorn api.main:app --reload
             st.stop()
 
     # Store analysis data in session state
-    st.session_state.analysis_data = response.json()
+    st.session_state.analysis_data = analysis
+    st.session_state.analysis_key = st.session_state.uploaded_file_key
     st.success("✅ Analysis complete!")
 
 # Display analysis if available in session state
@@ -262,16 +478,9 @@ if st.session_state.analysis_data is not None:
     # =============================
     st.subheader("📈 Weekly Revenue Trend")
 
-    weekly_total_df = pd.DataFrame(
-        data["trends"]["weekly_total"]
-    )
+    figures = build_review_figures(st.session_state.analysis_key, data)
 
-    fig_rev = plot_weekly_revenue(
-        weekly_total=weekly_total_df,
-        anomaly_result=data["anomalies"]["overall_anomaly"]
-    )
-
-    st.plotly_chart(fig_rev, use_container_width=True)
+    st.plotly_chart(figures["weekly_revenue"], use_container_width=True)
 
     st.markdown("---")
 
@@ -284,18 +493,11 @@ if st.session_state.analysis_data is not None:
 
     with col_left:
         st.markdown("**🌍 Country-Level Impact**")
-        fig_country = plot_country_drivers(
-            country_trends=data["trends"]["country_trends"],
-            anomaly_results=data["anomalies"]
-        )
-        st.plotly_chart(fig_country, use_container_width=True)
+        st.plotly_chart(figures["country_drivers"], use_container_width=True)
 
     with col_right:
         st.markdown("**📺 Channel-Level Impact**")
-        fig_channel = plot_channel_trends(
-            channel_trends=data["trends"]["channel_trends"]
-        )
-        st.plotly_chart(fig_channel, use_container_width=True)
+        st.plotly_chart(figures["channel_trends"], use_container_width=True)
 
     st.markdown("---")
 
@@ -318,99 +520,68 @@ if st.session_state.analysis_data is not None:
     with col_ask:
         ask_button = st.button("🔍 Ask", key="ask_button", type="primary")
 
+    # The last question stays on screen across reruns (served from cache)
     if ask_button and user_question:
+        st.session_state.active_question = (st.session_state.uploaded_file_key, user_question)
+
+    active_question = st.session_state.get("active_question")
+    if active_question and active_question[0] == st.session_state.uploaded_file_key:
+        file_key, question = active_question
+
         with st.spinner("🤔 Analyzing your question..."):
             
             try:
                 # Use stored file content from session state
                 if st.session_state.uploaded_file_content is not None:
                     
-                    # Create file-like object from stored content
-                    file_bytes = io.BytesIO(st.session_state.uploaded_file_content)
-                    
-                    # Call query endpoint
-                    query_response = requests.post(
-                        FASTAPI_URL_QUERY,
-                        files={"file": ("data.csv", file_bytes, "text/csv")},
-                        data={"query": user_question},
-                        timeout=120
+                    result = fetch_query_answer(
+                        file_key,
+                        question,
+                        st.session_state.uploaded_file_content
                     )
+
+                    # Display answer in a nice box
+                    st.success("✨ **Answer:**")
+                    st.markdown(result["answer"])
+                    
+                    # Show generated code if available (for custom queries)
+                    if result.get("code_generated"):
+                        with st.expander("🔧 Generated Code (for transparency)"):
+                            st.code(result["code_generated"], language="python")
                     
-                    if query_response.status_code == 200:
-                        result = query_response.json()
-                        
-                        # Check if query was successful
-                        if not result.get("success", True):
-                            st.error(f"❌ Query failed: {result.get('answer', 'Unknown error')}")
-                        else:
-                            # Display answer in a nice box
-                            st.success("✨ **Answer:**")
-                            st.markdown(result["answer"])
-                            
-                            # Show generated code if available (for custom queries)
-                            if result.get("code_generated"):
-                                with st.expander("🔧 Generated Code (for transparency)"):
-                                    st.code(result["code_generated"], language="python")
-                            
-                            # Show key insights
-                            if result.get("key_insights"):
-                                st.markdown("**📊 Key Findings:**")
-                                for insight in result["key_insights"]:
-                                    st.markdown(f"- {insight}")
-                            
-                            # Render suggested visualization
-                            chart_type = result.get("chart_suggestion")
-                            data_result = result.get("data")
-                            
-                            if data_result and isinstance(data_result, list) and len(data_result) > 0:
-                                df_viz = pd.DataFrame(data_result)
-                                
-                                # Smart chart rendering based on data structure
-                                if chart_type == "bar":
-                                    if "Country" in df_viz.columns and "wow_pct" in df_viz.columns:
-                                        fig = px.bar(
-                                            df_viz, 
-                                            x="Country", 
-                                            y="wow_pct",
-                                            title="Regional Performance",
-                                            labels={"wow_pct": "WoW % Change"},
-                                            color="wow_pct",
-                                            color_continuous_scale="RdYlGn"
-                                        )
-                                        st.plotly_chart(fig, use_container_width=True)
-                                    elif "Channel" in df_viz.columns and "wow_pct" in df_viz.columns:
-                                        fig = px.bar(
-                                            df_viz, 
-                                            x="Channel", 
-                                            y="wow_pct",
-                                            title="Channel Performance",
-                                            labels={"wow_pct": "WoW % Change"},
-                                            color="wow_pct",
-                                            color_continuous_scale="RdYlGn"
-                                        )
-                                        st.plotly_chart(fig, use_container_width=True)
-                                    else:
-                                        # Generic bar chart
-                                        st.dataframe(df_viz, use_container_width=True)
-                                
-                                elif chart_type == "table":
-                                    st.dataframe(df_viz, use_container_width=True)
-                                
-                                elif data_result and not isinstance(data_result, list):
-                                    # Scalar result
-                                    st.metric("Result", f"{data_result:,.2f}" if isinstance(data_result, (int, float)) else data_result)
-                            
-                            # Show follow-up questions as clickable suggestions
-                            if result.get("follow_up_questions"):
-                                st.markdown("**💡 You might also want to ask:**")
-                                for fq in result["follow_up_questions"]:
-                                    st.markdown(f"- {fq}")
-                    else:
-                        st.error(f"❌ Failed to process query (Status: {query_response.status_code})")
-                        with st.expander("Error details"):
-                            st.code(query_response.text[:500])
+                    # Show key insights
+                    if result.get("key_insights"):
+                        st.markdown("**📊 Key Findings:**")
+                        for insight in result["key_insights"]:
+                            st.markdown(f"- {insight}")
+                    
+                    # Render suggested visualization
+                    chart_type = result.get("chart_suggestion")
+                    data_result = result.get("data")
+                    
+                    if data_result and isinstance(data_result, list) and len(data_result) > 0:
+                        df_viz, fig = build_query_chart(file_key, question, chart_type, data_result)
+
+                        if fig is not None:
+                            st.plotly_chart(fig, use_container_width=True)
+                        elif chart_type in ("bar", "table"):
+                            st.dataframe(df_viz, use_container_width=True)
+                    
+                    # Show follow-up questions as clickable suggestions
+                    if result.get("follow_up_questions"):
+                        st.markdown("**💡 You might also want to ask:**")
+                        for fq in result["follow_up_questions"]:
+                            st.markdown(f"- {fq}")
                 else:
                     st.error("❌ No file data found. Please upload a file first.")
+
+            except QueryFailed as e:
+                st.error(f"❌ Query failed: {e}")
+
+            except APIError as e:
+                st.error(f"❌ Failed to process query (Status: {e.status_code})")
+                with st.expander("Error details"):
+                    st.code(e.text[:500])
                     
             except requests.exceptions.Timeout:
                 st.error("⏱️ Query timed out")
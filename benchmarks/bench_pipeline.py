@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Offline Pipeline Benchmarks
+
+Times and memory-profiles each stage of the review pipeline on
+synthetic data at several scales, and compares against stored
+baselines with regression thresholds. No server or OpenAI key needed.
+
+Usage:
+    python -m benchmarks.bench_pipeline                      # 10k,100k,1m vs baseline
+    python -m benchmarks.bench_pipeline --scales 10m         # one large run
+    python -m benchmarks.bench_pipeline --check              # exit 1 on regression
+    python -m benchmarks.bench_pipeline --update-baseline    # record new baselines
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# Benchmarks never call the LLM; the local stand-in keeps any
+# accidental call offline and key-free.
+os.environ.setdefault("LLM_PROVIDER", "local")
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from synthetic_data_generator import write_sales_data
+from engines.prep_engine import prepare_data
+from engines.trend_engine import run_trend_engine
+from engines.anomaly_engine import run_anomaly_engine
+from engines.query_engine import execute_query, run_generated_code
+from api.routes.review import to_native
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines.json")
+
+# ============================================================
+# Scales (rows + entity cardinality)
+# ============================================================
+SCALES = {
+    "10k": {"rows": 10_000, "stores": 22, "skus": 5},
+    "100k": {"rows": 100_000, "stores": 200, "skus": 50},
+    "1m": {"rows": 1_000_000, "stores": 2_000, "skus": 500},
+    "10m": {"rows": 10_000_000, "stores": 5_000, "skus": 2_000},
+}
+
+DEFAULT_SCALES = ["10k", "100k", "1m"]
+
+WEEKS = 12
+SEED = 7
+
+# Pre-built intents routed by the query executor (no LLM involved)
+PREBUILT_INTENTS = [
+    "regional_performance",
+    "channel_performance",
+    "revenue_trend",
+    "anomaly_detection",
+    "promotion_impact",
+    "price_demand",
+]
+
+# Representative generated code for custom_exploration queries
+CUSTOM_QUERIES = [
+    "df.groupby('Country', observed=True)['Revenue'].mean().sort_values(ascending=False)",
+    "df.groupby('Store', observed=True)['Revenue'].sum().sort_values(ascending=False).head(5)",
+    "df[df['Discount'] > 0.3][['Store', 'Country', 'Revenue', 'Discount']].sort_values('Revenue', ascending=False)",
+    "df.groupby('SKU', observed=True)['Margin'].sum().sort_values(ascending=False).head(10)",
+    # Filtered dimensions: only observed values may appear in the answer
+    "df[df['Country'] == 'USA']['Country'].value_counts()",
+    "df[df['Country'] == 'USA'].groupby('Store')['Revenue'].sum()",
+]
+
+# Default regression thresholds (ratio vs. baseline)
+TIME_THRESHOLD = 1.5
+MEMORY_THRESHOLD = 1.3
+
+# Stages faster than this are too noisy to gate on
+MIN_GATED_SECONDS = 0.05
+
+
+# ============================================================
+# Data
+# ============================================================
+def dataset_path(scale):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, f"sales_{scale}_w{WEEKS}_s{SEED}.csv")
+
+
+def ensure_dataset(scale):
+    path = dataset_path(scale)
+    if not os.path.exists(path):
+        spec = SCALES[scale]
+        print(f"  generating {spec['rows']:,} rows → {path}")
+        write_sales_data(path, weeks=WEEKS, scenario="mixed", seed=SEED, **spec)
+    return path
+
+
+# ============================================================
+# Measurement
+# ============================================================
+def measure(fn, repeats):
+    """
+    Best-of-N wall time, then one extra run under tracemalloc for the
+    peak allocation (kept separate so tracing doesn't skew timings).
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {"seconds": round(best, 5), "peak_mb": round(peak / 1024 / 1024, 2)}
+
+
+def bench_scale(scale, repeats):
+    path = ensure_dataset(scale)
+    stages = {}
+
+    raw, stages["read_csv"] = measure(lambda: pd.read_csv(path), repeats)
+
+    prepared, stages["prepare_data"] = measure(lambda: prepare_data(raw), repeats)
+    clean_df, weekly_df, weekly_total, _ = prepared
+
+    trends, stages["run_trend_engine"] = measure(
+        lambda: run_trend_engine(df=clean_df, weekly_df=weekly_df, weekly_total=weekly_total),
+        repeats,
+    )
+
+    anomalies, stages["run_anomaly_engine"] = measure(
+        lambda: run_anomaly_engine(weekly_total=weekly_total, weekly_df=weekly_df),
+        repeats,
+    )
+
+    def query_executor():
+        for query_type in PREBUILT_INTENTS:
+            execute_query({"query_type": query_type}, clean_df, weekly_df, weekly_total)
+        for code in CUSTOM_QUERIES:
+            run_generated_code(code, clean_df)
+
+    _, stages["query_executor"] = measure(query_executor, repeats)
+
+    response = {
+        "analysis_week": str(weekly_total.iloc[-1]["week"]),
+        "metrics": trends["overall_revenue_trend"],
+        "trends": {**trends, "weekly_total": weekly_total.to_dict("records")},
+        "anomalies": anomalies,
+        "executive_summary": "",
+    }
+    _, stages["serialization"] = measure(
+        lambda: json.dumps(jsonable_encoder(to_native(response))),
+        repeats,
+    )
+
+    return {"rows": len(raw), "stages": stages}
+
+
+# ============================================================
+# Baselines & Regression Gate
+# ============================================================
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_regressions(results, baseline, time_threshold, memory_threshold):
+    regressions = []
+    for scale, result in results.items():
+        base_stages = baseline.get("scales", {}).get(scale, {}).get("stages", {})
+        for stage, now in result["stages"].items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            if (
+                base["seconds"] >= MIN_GATED_SECONDS
+                and now["seconds"] > base["seconds"] * time_threshold
+            ):
+                regressions.append(
+                    f"{scale}/{stage}: {now['seconds']:.4f}s vs baseline "
+                    f"{base['seconds']:.4f}s (>{time_threshold}x)"
+                )
+            if base["peak_mb"] > 1 and now["peak_mb"] > base["peak_mb"] * memory_threshold:
+                regressions.append(
+                    f"{scale}/{stage}: {now['peak_mb']:.1f} MB peak vs baseline "
+                    f"{base['peak_mb']:.1f} MB (>{memory_threshold}x)"
+                )
+    return regressions
+
+
+def print_table(results, baseline):
+    print(f"\n{'scale':<6} {'stage':<20} {'seconds':>10} {'peak MB':>10} {'vs base':>9}")
+    for scale, result in results.items():
+        base_stages = baseline.get("scales", {}).get(scale, {}).get("stages", {})
+        for stage, m in result["stages"].items():
+            base = base_stages.get(stage)
+            ratio = f"{m['seconds'] / base['seconds']:.2f}x" if base and base["seconds"] else "-"
+            print(f"{scale:<6} {stage:<20} {m['seconds']:>10.4f} {m['peak_mb']:>10.1f} {ratio:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the review pipeline offline.")
+    parser.add_argument("--scales", default=",".join(DEFAULT_SCALES),
+                        help=f"comma-separated, from {list(SCALES)}")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 on regression")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD)
+    parser.add_argument("--output", help="write raw results JSON here")
+    args = parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scales {unknown}")
+
+    results = {}
+    for scale in scales:
+        print(f"▶ {scale}")
+        results[scale] = bench_scale(scale, args.repeats)
+
+    baseline = load_baseline(args.baseline)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline.setdefault("scales", {}).update(results)
+        baseline["machine"] = {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "recorded_at": time.strftime("%Y-%m-%d"),
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n✅ Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.time_threshold, args.memory_threshold)
+    if regressions:
+        print("\n❌ Regressions:")
+        for r in regressions:
+            print(f"  - {r}")
+        return 1 if args.check else 0
+
+    print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Benchmark + Import Budget
+
+Measures, each in a fresh interpreter:
+  1. import time of api.main, and which heavy modules it pulled in
+  2. process start → first healthy GET /health/live and → ready
+     (GET /health/ready, after the background warmup) on a real
+     uvicorn server
+  3. (optional) the first /review/full once ready
+
+The API must import without the data stack / LLM SDK (they load lazily
+or in the background warmup, see api/warmup.py). --check exits 1 when
+the import exceeds --budget-ms or a heavy module is imported eagerly.
+
+Usage:
+    python -m benchmarks.cold_start                      # report
+    python -m benchmarks.cold_start --check              # CI gate
+    python -m benchmarks.cold_start --runs 5 --request   # + first review request
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+SAMPLE_CSV = os.path.join(REPO_DIR, "ferrero_rocher_sales_dataset.csv")
+
+# Must not be imported by `import api.main`
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "openai", "engines.prep_engine", "engines.review_graph")
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "900"))
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import api.main
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "heavy": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("LLM_PROVIDER", "local")
+    env["PYTHONPATH"] = REPO_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+# ============================================================
+# 1. Import Time
+# ============================================================
+def measure_import():
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=REPO_DIR, env=_env(), capture_output=True, text=True, check=True,
+    )
+    # Startup logs may share stdout; the probe's JSON is the last line
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top=8):
+    """
+    Largest cumulative import times under api.main (python -X importtime).
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=REPO_DIR, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        # Top-level packages only (nested entries are counted in their parents)
+        if "." not in name:
+            rows.append((int(cumulative) / 1000, name))
+    return sorted(rows, reverse=True)[:top]
+
+
+# ============================================================
+# 2. Process Start → First Healthy Response (+ first request)
+# ============================================================
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(client, path, start, timeout):
+    while True:
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError(f"{path} never returned 200")
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+
+
+def measure_server(first_request=False, timeout=60):
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result = {}
+    try:
+        with httpx.Client(base_url=url, timeout=timeout) as client:
+            result["first_healthy_s"] = _wait_for(client, "/health/live", start, timeout)
+            result["ready_s"] = _wait_for(client, "/health/ready", start, timeout)
+
+            if first_request:
+                with open(SAMPLE_CSV, "rb") as f:
+                    data = f.read()
+                request_start = time.perf_counter()
+                response = client.post("/review/full", files={"file": ("sample.csv", data, "text/csv")})
+                response.raise_for_status()
+                result["first_review_s"] = time.perf_counter() - request_start
+    finally:
+        server.terminate()
+        server.wait(10)
+    return result
+
+
+# ============================================================
+# CLI
+# ============================================================
+def _summary(values):
+    return f"median {statistics.median(values) * 1000:7.0f} ms   max {max(values) * 1000:7.0f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure API cold start and enforce the import budget.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="median import time allowed for api.main")
+    parser.add_argument("--request", action="store_true", help="also time the first /review/full")
+    parser.add_argument("--skip-server", action="store_true", help="import checks only")
+    parser.add_argument("--check", action="store_true", help="exit 1 when over budget")
+    args = parser.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    import_times = [r["seconds"] for r in imports]
+    heavy = sorted({m for r in imports for m in r["heavy"]})
+
+    print("▶ import api.main")
+    print(f"    {_summary(import_times)}   (budget {args.budget_ms:.0f} ms)")
+    print(f"    eagerly imported heavy modules: {heavy or 'none'}")
+    print("    slowest top-level imports:")
+    for ms, name in slowest_imports():
+        print(f"      {ms:8.1f} ms  {name}")
+
+    if not args.skip_server:
+        runs = [measure_server(args.request) for _ in range(args.runs)]
+        print("▶ process start → first healthy GET /health/live")
+        print(f"    {_summary([r['first_healthy_s'] for r in runs])}")
+        print("▶ process start → ready (GET /health/ready, warmup done)")
+        print(f"    {_summary([r['ready_s'] for r in runs])}")
+        if args.request:
+            print("▶ first /review/full once ready")
+            print(f"    {_summary([r['first_review_s'] for r in runs])}")
+
+    over_budget = statistics.median(import_times) * 1000 > args.budget_ms
+    if over_budget:
+        print(f"\n❌ import exceeds the {args.budget_ms:.0f} ms budget")
+    if heavy:
+        print(f"\n❌ {heavy} must be imported lazily (see api/warmup.py)")
+
+    return 1 if args.check and (over_budget or heavy) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
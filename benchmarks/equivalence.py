@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Golden-Output Equivalence Harness
+
+Runs the reference pipeline (plain object/str dimensions, freshly
+prepared) and every registered optimized path over the same datasets,
+and diffs every output field: prepared frames, trend and anomaly
+engine results, and query-executor results. Numbers are compared with
+tolerances; everything else must match exactly.
+
+Real datasets are additionally checked against frozen golden snapshots
+(benchmarks/golden/), so a change to the reference itself is caught too.
+
+An optimized path may only be the default once it is registered in
+OPTIMIZED_PATHS and this harness passes with it. Whether a path is the
+default is read from the production code (see PRODUCTION_DEFAULTS),
+not declared here. --check exits 1 when any path mismatches; the
+Render build (render.yaml buildCommand) runs it, so a deploy whose
+default path diverges from the reference fails to build.
+
+Usage:
+    python -m benchmarks.equivalence                  # report
+    python -m benchmarks.equivalence --check          # exit 1 on any mismatch
+    python -m benchmarks.equivalence --rows 200000    # larger generated datasets
+    python -m benchmarks.equivalence --update-golden  # re-freeze reference snapshots
+"""
+
+import argparse
+import inspect
+import json
+import math
+import os
+import sys
+import tempfile
+
+# Nothing here calls the LLM; keep any accidental call offline
+os.environ.setdefault("LLM_PROVIDER", "local")
+
+import numpy as np
+import pandas as pd
+
+from synthetic_data_generator import SCENARIOS, generate_sales_data
+from cache.disk_cache import CACHE_MAX_BYTES, save_prepared, load_prepared
+from engines.prep_engine import prepare_data
+from engines.trend_engine import run_trend_engine
+from engines.anomaly_engine import run_anomaly_engine
+from engines.query_engine import execute_query, run_generated_code
+from engines.review_graph import run_full_review_graph
+from benchmarks.bench_pipeline import PREBUILT_INTENTS, CUSTOM_QUERIES
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+
+REAL_DATASETS = {
+    "ferrero_rocher": os.path.join(REPO_DIR, "ferrero_rocher_sales_dataset.csv"),
+    "sample_sales": os.path.join(REPO_DIR, "sample_data", "sample_sales_data.csv"),
+}
+
+# Tolerances for float comparisons (reordered sums drift in the last bits)
+REL_TOL = 1e-9
+ABS_TOL = 1e-9
+
+MAX_REPORTED_DIFFS = 10
+
+
+# ============================================================
+# Pipelines (reference + optimized paths)
+# ============================================================
+def reference_prepare(raw):
+    """
+    The notebook-equivalent path every optimization is measured against.
+    """
+    return prepare_data(raw, encode_dimensions=False)
+
+
+def categorical_prepare(raw):
+    return prepare_data(raw, encode_dimensions=True)
+
+
+def disk_cache_prepare(raw):
+    """
+    Prepared frames after a Feather round trip, read back memory-mapped.
+    """
+    prepared = prepare_data(raw)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        save_prepared("equivalence", *prepared[:3], cache_dir=cache_dir, evict=False)
+        loaded = load_prepared("equivalence", cache_dir=cache_dir, memory_map=False)
+    return loaded
+
+
+def reference_engines(clean_df, weekly_df, weekly_total, analysis_week):
+    return (
+        run_trend_engine(df=clean_df, weekly_df=weekly_df, weekly_total=weekly_total),
+        run_anomaly_engine(weekly_total=weekly_total, weekly_df=weekly_df),
+    )
+
+
+def graph_engines(clean_df, weekly_df, weekly_total, analysis_week):
+    """
+    The /review/full engine DAG (shared intermediates, parallel nodes).
+    """
+    results = run_full_review_graph(
+        clean_df, weekly_df, weekly_total, analysis_week,
+        targets=["trend_results", "anomaly_results"],
+    )
+    return results["trend_results"], results["anomaly_results"]
+
+
+# name → (prepare function, engine runner)
+OPTIMIZED_PATHS = {
+    "categorical_dimensions": (categorical_prepare, reference_engines),
+    "disk_cache_roundtrip": (disk_cache_prepare, reference_engines),
+    "engine_graph": (reference_prepare, graph_engines),
+}
+
+
+# ============================================================
+# Production Switches (is each path what the API runs today?)
+# ============================================================
+def _calls(fn, name):
+    """
+    True when fn's code references name (a call or an import of it).
+    """
+    fn = inspect.unwrap(fn)
+    return name in fn.__code__.co_names
+
+
+def _api_review():
+    # Imported lazily: only the report needs the API module
+    import api.routes.review as review
+    return review
+
+
+PRODUCTION_DEFAULTS = {
+    # open_dataset calls prepare_data(df): the signature default applies
+    "categorical_dimensions": lambda: (
+        _calls(_api_review().open_dataset, "prepare_data")
+        and inspect.signature(prepare_data).parameters["encode_dimensions"].default is True
+    ),
+    # Prepared frames are served from the shared store unless its budget is 0
+    "disk_cache_roundtrip": lambda: (
+        _calls(_api_review().open_dataset, "attach") and CACHE_MAX_BYTES > 0
+    ),
+    "engine_graph": lambda: _calls(_api_review().build_full_review, "run_full_review_graph"),
+}
+
+
+def is_production_default(name):
+    return bool(PRODUCTION_DEFAULTS[name]())
+
+
+def run_outputs(prepared, engines=reference_engines):
+    """
+    Every field a client can observe, keyed by output name.
+    """
+    clean_df, weekly_df, weekly_total, analysis_week = prepared
+    trends, anomalies = engines(*prepared)
+
+    outputs = {
+        "analysis_week": analysis_week,
+        "weekly_total": weekly_total,
+        "weekly_df": weekly_df,
+        "clean_df": clean_df,
+        "trends": trends,
+        "anomalies": anomalies,
+    }
+
+    for query_type in PREBUILT_INTENTS:
+        outputs[f"query.{query_type}"] = execute_query(
+            {"query_type": query_type}, clean_df, weekly_df, weekly_total
+        )
+    for i, code in enumerate(CUSTOM_QUERIES):
+        outputs[f"custom.{i}"] = run_generated_code(code, clean_df)
+
+    return outputs
+
+
+# ============================================================
+# Canonical Form + Diff
+# ============================================================
+def canonical(obj):
+    """
+    Reduce outputs to plain Python values. Categorical columns are
+    decoded to labels, so encoding alone never counts as a difference.
+    """
+    if isinstance(obj, pd.DataFrame):
+        frame = obj.reset_index(drop=True)
+        return {
+            "columns": [str(c) for c in frame.columns],
+            "rows": [
+                [canonical(v) for v in row]
+                for row in frame.astype(object).itertuples(index=False, name=None)
+            ],
+        }
+    if isinstance(obj, pd.Series):
+        return [[canonical(k), canonical(v)] for k, v in obj.astype(object).items()]
+    if isinstance(obj, dict):
+        return {str(k): canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [canonical(v) for v in obj]
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if obj is None or obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    return obj
+
+
+def diff(expected, actual, path="", out=None):
+    """
+    Collect "path: expected != actual" lines for every mismatched leaf.
+    """
+    out = [] if out is None else out
+
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for k in sorted(set(expected) | set(actual)):
+            if k not in actual or k not in expected:
+                out.append(f"{path}.{k}: present only in {'reference' if k in expected else 'optimized'}")
+            else:
+                diff(expected[k], actual[k], f"{path}.{k}", out)
+        return out
+
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            out.append(f"{path}: length {len(expected)} != {len(actual)}")
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            diff(e, a, f"{path}[{i}]", out)
+        return out
+
+    numeric = (int, float)
+    if (
+        isinstance(expected, numeric) and isinstance(actual, numeric)
+        and not isinstance(expected, bool) and not isinstance(actual, bool)
+    ):
+        if not math.isclose(expected, actual, rel_tol=REL_TOL, abs_tol=ABS_TOL):
+            out.append(f"{path}: {expected!r} != {actual!r}")
+        return out
+
+    if expected != actual:
+        out.append(f"{path}: {expected!r} != {actual!r}")
+    return out
+
+
+def compare(reference, candidate):
+    """
+    Returns {output name: [diff lines]} for outputs that differ.
+    """
+    mismatches = {}
+    for name in reference:
+        lines = diff(reference[name], candidate.get(name), name)
+        if lines:
+            mismatches[name] = lines
+    return mismatches
+
+
+# ============================================================
+# Datasets
+# ============================================================
+def generated_datasets(rows, seed):
+    """
+    One dataset per scenario, plus one with the nulls prepare_data
+    repairs (missing dimensions, missing revenue, unparseable dates).
+    """
+    datasets = {}
+    for i, scenario in enumerate(SCENARIOS):
+        datasets[f"generated.{scenario}"] = generate_sales_data(
+            rows=rows, weeks=10, scenario=scenario, seed=seed + i
+        )
+
+    dirty = generate_sales_data(rows=rows, weeks=10, scenario="mixed", seed=seed + 99)
+    rng = np.random.default_rng(seed)
+    for col, frac in (("Country", 0.02), ("Channel", 0.02), ("Promotion", 0.3), ("Revenue", 0.05)):
+        dirty.loc[rng.random(len(dirty)) < frac, col] = None
+    dirty.loc[rng.random(len(dirty)) < 0.01, "Date"] = "not a date"
+    datasets["generated.with_nulls"] = dirty
+
+    return datasets
+
+
+def real_datasets():
+    return {
+        f"real.{name}": pd.read_csv(path)
+        for name, path in REAL_DATASETS.items()
+        if os.path.exists(path)
+    }
+
+
+# ============================================================
+# Golden Snapshots (reference outputs of the real datasets)
+# ============================================================
+def golden_path(dataset):
+    return os.path.join(GOLDEN_DIR, f"{dataset.split('.', 1)[1]}.json")
+
+
+def golden_view(outputs):
+    """
+    Engine + query outputs only; the prepared frames are too large to
+    freeze and are covered by the path comparison.
+    """
+    return {k: v for k, v in outputs.items() if k not in ("clean_df", "weekly_df")}
+
+
+def check_golden(dataset, outputs, update):
+    path = golden_path(dataset)
+    snapshot = golden_view(outputs)
+
+    if update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(snapshot, f, indent=1, sort_keys=True)
+        return None
+
+    if not os.path.exists(path):
+        return {"golden": [f"no snapshot at {path} (run --update-golden)"]}
+
+    with open(path) as f:
+        frozen = json.load(f)
+    # Round-trip through JSON so tuples/ints compare like the frozen copy
+    return compare(frozen, json.loads(json.dumps(snapshot)))
+
+
+# ============================================================
+# CLI
+# ============================================================
+def print_mismatches(mismatches):
+    for name, lines in mismatches.items():
+        print(f"      {name}: {len(lines)} difference(s)")
+        for line in lines[:MAX_REPORTED_DIFFS]:
+            print(f"        - {line}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff optimized pipeline paths against the reference.")
+    parser.add_argument("--rows", type=int, default=20_000, help="rows per generated dataset")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--paths", default=",".join(OPTIMIZED_PATHS),
+                        help=f"comma-separated, from {list(OPTIMIZED_PATHS)}")
+    parser.add_argument("--skip-generated", action="store_true")
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 on any mismatch")
+    args = parser.parse_args(argv)
+
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    unknown = [p for p in paths if p not in OPTIMIZED_PATHS]
+    if unknown:
+        parser.error(f"unknown paths {unknown}")
+
+    datasets = real_datasets()
+    if not args.skip_generated:
+        datasets.update(generated_datasets(args.rows, args.seed))
+
+    failed_paths = set()
+    failed = False
+
+    for dataset, raw in datasets.items():
+        print(f"▶ {dataset} ({len(raw):,} rows)")
+        reference = canonical(run_outputs(reference_prepare(raw)))
+
+        if dataset.startswith("real."):
+            mismatches = check_golden(dataset, reference, args.update_golden)
+            if args.update_golden:
+                print(f"    golden: frozen → {golden_path(dataset)}")
+            elif mismatches:
+                failed = True
+                print("    ❌ reference vs golden snapshot")
+                print_mismatches(mismatches)
+            else:
+                print("    ✅ reference matches golden snapshot")
+
+        for name in paths:
+            prepare, engines = OPTIMIZED_PATHS[name]
+            mismatches = compare(reference, canonical(run_outputs(prepare(raw), engines)))
+            if mismatches:
+                failed_paths.add(name)
+                print(f"    ❌ {name}")
+                print_mismatches(mismatches)
+            else:
+                print(f"    ✅ {name}")
+
+    print()
+    for name in paths:
+        is_default = is_production_default(name)
+        if name in failed_paths:
+            status = "BLOCKED — is the default, must be fixed or reverted" if is_default else "BLOCKED from becoming default"
+            failed = True
+        else:
+            status = "equivalent (default)" if is_default else "equivalent — eligible to become default"
+        print(f"{name:<26} {status}")
+
+    return 1 if failed and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Offline Load Test
+
+Replays concurrent /review/full and /review/query traffic against the
+FastAPI app (in-process by default, or a running server via --url) and
+reports throughput and p50/p95/p99 latency per endpoint.
+
+In-process runs use the local LLM stand-in (ai/local_llm.py), so no
+OpenAI credits are spent and LLM latency is a fixed, known quantity.
+
+Usage:
+    python -m benchmarks.load_test                                   # 200 requests, 16 concurrent
+    python -m benchmarks.load_test --requests 1000 --concurrency 64
+    python -m benchmarks.load_test --mix full=1,query=3 --datasets 4 --rows 50000
+    LOCAL_LLM_LATENCY_MS=800 LOCAL_LLM_ERROR_RATE=0.05 python -m benchmarks.load_test
+    python -m benchmarks.load_test --url http://localhost:8000       # live server
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Must be set before the app is imported (LLM_PROVIDER is read at import)
+os.environ.setdefault("LLM_PROVIDER", "local")
+
+import httpx
+import numpy as np
+
+from synthetic_data_generator import SCENARIOS, generate_sales_data
+
+QUERIES = [
+    "Which region performed best?",
+    "Show me channel trends",
+    "Are there any anomalies?",
+    "How did promotions impact sales?",
+    "What is the average revenue by country?",
+    "Top 5 stores by revenue",
+]
+
+
+# ============================================================
+# Workload
+# ============================================================
+def build_datasets(count, rows, weeks, seed):
+    """
+    One CSV payload per dataset, cycling through the scenarios so the
+    run mixes cache hits with distinct uploads.
+    """
+    payloads = []
+    for i in range(count):
+        df = generate_sales_data(
+            rows=rows,
+            weeks=weeks,
+            scenario=SCENARIOS[i % len(SCENARIOS)],
+            seed=seed + i,
+        )
+        payloads.append(df.to_csv(index=False).encode("utf-8"))
+    return payloads
+
+
+def parse_mix(text):
+    """
+    "full=1,query=3" → {"full": 1.0, "query": 3.0}
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("full", "query"):
+            raise ValueError(f"Unknown endpoint '{name}' in --mix (expected full/query)")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_schedule(total, mix, n_datasets, seed):
+    rng = random.Random(seed)
+    endpoints = list(mix)
+    weights = [mix[e] for e in endpoints]
+    return [
+        (rng.choices(endpoints, weights)[0], rng.randrange(n_datasets), rng.choice(QUERIES))
+        for _ in range(total)
+    ]
+
+
+# ============================================================
+# Driver
+# ============================================================
+async def send(client, endpoint, payload, query):
+    files = {"file": ("load_test.csv", payload, "text/csv")}
+    if endpoint == "full":
+        return await client.post("/review/full", files=files)
+    return await client.post("/review/query", files=files, data={"query": query})
+
+
+async def run_load(client, schedule, payloads, concurrency):
+    results = []
+    queue = asyncio.Queue()
+    for item in schedule:
+        queue.put_nowait(item)
+
+    async def worker():
+        while True:
+            try:
+                endpoint, dataset, query = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await send(client, endpoint, payloads[dataset], query)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            results.append((endpoint, status, time.perf_counter() - start))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+
+def make_client(url, timeout):
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+
+    from api.main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://load-test",
+        timeout=timeout,
+    )
+
+
+# ============================================================
+# Report
+# ============================================================
+def summarize(results, elapsed):
+    rows = []
+    for endpoint in sorted({r[0] for r in results}) + ["all"]:
+        subset = [r for r in results if endpoint == "all" or r[0] == endpoint]
+        latencies = np.array([r[2] for r in subset]) * 1000
+        errors = sum(1 for r in subset if r[1] != 200)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        rows.append({
+            "endpoint": endpoint,
+            "requests": len(subset),
+            "errors": errors,
+            "rps": len(subset) / elapsed,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        })
+    return rows
+
+
+def print_report(rows, elapsed, results):
+    print(f"\nCompleted {len(results)} requests in {elapsed:.2f}s\n")
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for r in rows:
+        print(
+            f"{r['endpoint']:<10} {r['requests']:>9} {r['errors']:>7} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}"
+        )
+
+    statuses = {}
+    for _, status, _ in results:
+        if status != 200:
+            statuses[status] = statuses.get(status, 0) + 1
+    if statuses:
+        print("\nNon-200 responses:", ", ".join(f"{k}×{v}" for k, v in sorted(statuses.items(), key=str)))
+
+
+# ============================================================
+# CLI
+# ============================================================
+async def amain(args):
+    payloads = build_datasets(args.datasets, args.rows, args.weeks, args.seed)
+    schedule = build_schedule(args.requests, parse_mix(args.mix), len(payloads), args.seed)
+
+    target = args.url or "in-process app (LLM_PROVIDER=%s)" % os.environ["LLM_PROVIDER"]
+    print(f"Load test → {target}")
+    print(f"  {args.requests} requests, concurrency {args.concurrency}, mix {args.mix}, "
+          f"{args.datasets} dataset(s) × {args.rows:,} rows")
+
+    async with make_client(args.url, args.timeout) as client:
+        results, elapsed = await run_load(client, schedule, payloads, args.concurrency)
+
+    rows = summarize(results, elapsed)
+    print_report(rows, elapsed, results)
+    total_errors = rows[-1]["errors"]
+    return 1 if args.fail_on_error and total_errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the review API.")
+    parser.add_argument("--url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default="full=1,query=1", help="Endpoint weights, e.g. full=1,query=3")
+    parser.add_argument("--datasets", type=int, default=2, help="Distinct CSV uploads to rotate through")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--fail-on-error", action="store_true", help="Exit 1 if any request fails")
+    args = parser.parse_args(argv)
+
+    return asyncio.run(amain(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
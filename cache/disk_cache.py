@@ -0,0 +1,283 @@
+# cache/disk_cache.py
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+# pyarrow is imported on first save/load, keeping it off the API's
+# cold-start import path
+
+# ============================================================
+# Cache Location & Budget (env-configurable)
+# ============================================================
+CACHE_DIR = os.getenv("DATASET_CACHE_DIR", ".dataset_cache")
+CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Frames persisted per dataset, in prepare_data() return order
+PREPARED_FRAMES = ("clean_df", "weekly_df", "weekly_total")
+
+META_FILE = "meta.json"
+
+# In-flight write directories are named <key>.tmp-<random>
+TMP_MARKER = ".tmp-"
+
+# Temp dirs older than this were left by a killed writer and are swept
+STALE_TMP_SECONDS = 3600
+
+
+# ============================================================
+# Content Hash Key
+# ============================================================
+def dataset_key(raw_bytes: bytes) -> str:
+    """
+    Content hash of the uploaded file. Identical uploads map to the
+    same cache entry regardless of file name.
+    """
+    return hashlib.sha256(raw_bytes).hexdigest()
+
+
+def _entry_dir(key, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, key)
+
+
+def has_prepared(key, cache_dir=None) -> bool:
+    return os.path.isfile(os.path.join(_entry_dir(key, cache_dir), META_FILE))
+
+
+def read_meta(key, cache_dir=None):
+    """
+    The entry's meta.json (rows per frame, bytes, created_at), or None.
+    """
+    try:
+        with open(os.path.join(_entry_dir(key, cache_dir), META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ============================================================
+# Write Path
+# ============================================================
+def save_prepared(key, clean_df, weekly_df, weekly_total, cache_dir=None, is_pinned=None, evict=True):
+    """
+    Persist the prepared frames as uncompressed Feather (Arrow IPC)
+    files so they can later be memory-mapped instead of re-parsed.
+
+    Writes into a private temp directory (unique per call, so threads
+    and workers preparing the same upload never share files) and
+    renames it into place, so readers never observe a half-written
+    entry. The temp directory is removed if anything fails.
+
+    Then evicts down to CACHE_MAX_BYTES unless evict is False (callers
+    with their own budget evict themselves).
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+
+    final_dir = _entry_dir(key, cache_dir)
+    if os.path.isdir(final_dir):
+        return final_dir
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=f"{key}{TMP_MARKER}")
+    try:
+        frames = dict(zip(PREPARED_FRAMES, (clean_df, weekly_df, weekly_total)))
+        total_bytes = 0
+
+        for name, frame in frames.items():
+            path = os.path.join(tmp_dir, f"{name}.feather")
+            # preserve_index keeps the exact pandas index across the round trip
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            feather.write_feather(table, path, compression="uncompressed")
+            total_bytes += os.path.getsize(path)
+
+        meta = {
+            "key": key,
+            "created_at": time.time(),
+            "bytes": total_bytes,
+            "rows": {name: int(len(frame)) for name, frame in frames.items()},
+        }
+        with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+    except BaseException:
+        # e.g. ENOSPC: leave nothing behind
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    try:
+        os.rename(tmp_dir, final_dir)
+    except OSError:
+        # Another thread or worker won the race — its entry is equivalent
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if evict:
+        evict_to_size(cache_dir=cache_dir, is_pinned=is_pinned)
+    return final_dir
+
+
+# ============================================================
+# Read Path (memory-mapped)
+# ============================================================
+def load_prepared(key, cache_dir=None, memory_map=True):
+    """
+    Load a prepared dataset from the cache.
+
+    Returns the same tuple as prepare_data():
+        clean_df, weekly_df, weekly_total, analysis_week
+    or None on a cache miss.
+    """
+    entry = _entry_dir(key, cache_dir)
+    if not has_prepared(key, cache_dir):
+        return None
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    frames = []
+    try:
+        for name in PREPARED_FRAMES:
+            table = feather.read_table(
+                os.path.join(entry, f"{name}.feather"),
+                memory_map=memory_map,
+            )
+            # split_blocks avoids consolidating columns into a fresh copy
+            frames.append(table.to_pandas(split_blocks=True))
+    except (OSError, pa.ArrowInvalid):
+        # Entry was evicted or corrupted mid-read — treat as a miss
+        return None
+
+    # Touch the entry so size-based eviction is least-recently-used
+    os.utime(os.path.join(entry, META_FILE))
+
+    clean_df, weekly_df, weekly_total = frames
+    analysis_week = weekly_total.iloc[-1]["week"]
+
+    return clean_df, weekly_df, weekly_total, analysis_week
+
+
+# ============================================================
+# Inspection & Eviction
+# ============================================================
+def list_entries(cache_dir=None):
+    """
+    Returns cache entries, most recently used first.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        # Skip in-flight writes and bookkeeping directories
+        if name.startswith(".") or TMP_MARKER in name:
+            continue
+        meta_path = os.path.join(cache_dir, name, META_FILE)
+        if not os.path.isfile(meta_path):
+            continue
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        meta["last_used_at"] = os.path.getmtime(meta_path)
+        entries.append(meta)
+
+    return sorted(entries, key=lambda e: e["last_used_at"], reverse=True)
+
+
+def remove_entry(key, cache_dir=None):
+    shutil.rmtree(_entry_dir(key, cache_dir), ignore_errors=True)
+
+
+def remove_stale_tmp(cache_dir=None, max_age=STALE_TMP_SECONDS):
+    """
+    Removes temp directories left by writers that were killed mid-write.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try:
+            if TMP_MARKER in name and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            continue
+
+
+def evict_to_size(max_bytes=None, cache_dir=None, is_pinned=None):
+    """
+    Drop least-recently-used entries until the cache fits in max_bytes.
+    Entries for which is_pinned(key) is true are never evicted.
+    Returns the evicted keys.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    remove_stale_tmp(cache_dir)
+    entries = list_entries(cache_dir)
+
+    total = sum(e["bytes"] for e in entries)
+    evicted = []
+
+    while entries and total > max_bytes:
+        oldest = entries.pop()
+        if is_pinned is not None and is_pinned(oldest["key"]):
+            continue
+        remove_entry(oldest["key"], cache_dir)
+        total -= oldest["bytes"]
+        evicted.append(oldest["key"])
+
+    return evicted
+
+
+# ============================================================
+# CLI: python -m cache.disk_cache {ls,prune,clear}
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m cache.disk_cache",
+        description="Inspect and prune the prepared-dataset cache.",
+    )
+    parser.add_argument("--dir", default=None, help=f"cache directory (default: {CACHE_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("ls", help="list cached datasets")
+
+    prune = sub.add_parser("prune", help="evict LRU entries down to a size budget")
+    prune.add_argument("--max-mb", type=float, default=CACHE_MAX_BYTES / (1024 * 1024))
+
+    sub.add_parser("clear", help="remove every cached dataset")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "ls":
+        entries = list_entries(args.dir)
+        total = sum(e["bytes"] for e in entries)
+        for e in entries:
+            last_used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e["last_used_at"]))
+            print(
+                f"{e['key'][:16]}  {e['bytes'] / 1024 / 1024:8.2f} MB  "
+                f"{e['rows']['clean_df']:>10} rows  last used {last_used}"
+            )
+        print(f"{len(entries)} entries, {total / 1024 / 1024:.2f} MB total")
+
+    elif args.command == "prune":
+        evicted = evict_to_size(int(args.max_mb * 1024 * 1024), args.dir)
+        print(f"Evicted {len(evicted)} entries")
+
+    elif args.command == "clear":
+        entries = list_entries(args.dir)
+        for e in entries:
+            remove_entry(e["key"], args.dir)
+        print(f"Removed {len(entries)} entries")
+
+
+if __name__ == "__main__":
+    main()
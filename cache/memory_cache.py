@@ -0,0 +1,205 @@
+# cache/memory_cache.py
+
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+
+# ============================================================
+# Memory Budget (env-configurable)
+# ============================================================
+MEMORY_BUDGET_BYTES = int(os.getenv("DATASET_MEMORY_BUDGET_MB", "256")) * 1024 * 1024
+
+DEFAULT_TENANT = "default"
+
+# X-Tenant-ID is client-supplied: ids outside this charset / length
+# are served as DEFAULT_TENANT
+TENANT_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+# Tenants with their own hit/miss counters; the rest share one row
+MAX_TRACKED_TENANTS = int(os.getenv("DATASET_MAX_TRACKED_TENANTS", "256"))
+OTHER_TENANTS = "(other)"
+
+
+def tenant_id(value):
+    """
+    The tenant a request is served as: value when it is a safe token,
+    else DEFAULT_TENANT.
+    """
+    if value and TENANT_PATTERN.fullmatch(value):
+        return value
+    return DEFAULT_TENANT
+
+
+# ============================================================
+# Footprint Measurement
+# ============================================================
+def prepared_nbytes(prepared) -> int:
+    """
+    Real memory footprint of a prepare_data() tuple: every DataFrame
+    (clean_df and the weekly_df / weekly_total cubes) measured with
+    memory_usage(deep=True) so object/string columns are counted.
+    """
+    import pandas as pd
+
+    return int(sum(
+        part.memory_usage(deep=True).sum()
+        for part in prepared
+        if isinstance(part, pd.DataFrame)
+    ))
+
+
+# ============================================================
+# Byte-budgeted LRU Cache (per process, multi-tenant)
+# ============================================================
+class MemoryDatasetCache:
+    """
+    Keeps prepared datasets resident, keyed by (tenant, dataset key).
+    Least-recently-used entries are evicted once the total footprint
+    exceeds max_bytes. Evicted entries are rebuilt by the caller's
+    loader (shared on-disk store, or a fresh parse of the upload).
+
+    Pinned entries (open interactive sessions) are never evicted but
+    stay charged to max_bytes; pin() refuses once they would fill it.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = MEMORY_BUDGET_BYTES if max_bytes is None else max_bytes
+        self._entries = OrderedDict()  # (tenant, key) -> (prepared, nbytes)
+        self._pins = {}  # (tenant, key) -> pin count
+        self._used_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _count_locked(self, tenant, counter):
+        if tenant not in self._counters and len(self._counters) >= MAX_TRACKED_TENANTS:
+            tenant = OTHER_TENANTS
+        counters = self._counters.setdefault(tenant, {"hits": 0, "misses": 0, "evictions": 0})
+        counters[counter] += 1
+
+    def get(self, key, tenant=DEFAULT_TENANT):
+        tenant = tenant_id(tenant)
+        with self._lock:
+            entry = self._entries.get((tenant, key))
+            if entry is None:
+                self._count_locked(tenant, "misses")
+                return None
+
+            self._entries.move_to_end((tenant, key))
+            self._count_locked(tenant, "hits")
+            return entry[0]
+
+    def put(self, key, prepared, tenant=DEFAULT_TENANT):
+        tenant = tenant_id(tenant)
+        nbytes = prepared_nbytes(prepared)
+
+        with self._lock:
+            if self._pins.get((tenant, key)):
+                # Resident for a session: keep serving the pinned frames
+                return self._entries[(tenant, key)][0]
+
+            old = self._entries.pop((tenant, key), None)
+            if old is not None:
+                self._used_bytes -= old[1]
+
+            # An entry bigger than the whole budget is never held
+            if nbytes > self.max_bytes:
+                return prepared
+
+            self._entries[(tenant, key)] = (prepared, nbytes)
+            self._used_bytes += nbytes
+            self._evict_locked()
+
+        return prepared
+
+    def get_or_load(self, key, loader, tenant=DEFAULT_TENANT):
+        """
+        Returns the cached entry, or calls loader() and caches its result.
+        """
+        prepared = self.get(key, tenant)
+        if prepared is None:
+            prepared = self.put(key, loader(), tenant)
+        return prepared
+
+    def discard(self, key, tenant=DEFAULT_TENANT):
+        tenant = tenant_id(tenant)
+        with self._lock:
+            if self._pins.get((tenant, key)):
+                return
+            old = self._entries.pop((tenant, key), None)
+            if old is not None:
+                self._used_bytes -= old[1]
+
+    def pin(self, key, prepared, tenant=DEFAULT_TENANT):
+        """
+        Holds the entry resident until unpin() (the resident frames if
+        it is already cached, else prepared). Returns the pinned frames,
+        or None when pinned entries would exceed max_bytes.
+        """
+        tenant = tenant_id(tenant)
+        entry_key = (tenant, key)
+        nbytes = prepared_nbytes(prepared)
+
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if not self._pins.get(entry_key):
+                charged = entry[1] if entry is not None else nbytes
+                if self._pinned_bytes_locked() + charged > self.max_bytes:
+                    return None
+
+            if entry is None:
+                entry = self._entries[entry_key] = (prepared, nbytes)
+                self._used_bytes += nbytes
+            self._entries.move_to_end(entry_key)
+            self._pins[entry_key] = self._pins.get(entry_key, 0) + 1
+            self._evict_locked()
+            return entry[0]
+
+    def unpin(self, key, tenant=DEFAULT_TENANT):
+        """
+        Releases one pin; the entry becomes evictable with the last one.
+        """
+        entry_key = (tenant_id(tenant), key)
+        with self._lock:
+            count = self._pins.get(entry_key, 0) - 1
+            if count > 0:
+                self._pins[entry_key] = count
+                return
+            self._pins.pop(entry_key, None)
+            self._evict_locked()
+
+    def _pinned_bytes_locked(self):
+        return sum(self._entries[k][1] for k in self._pins if k in self._entries)
+
+    def _evict_locked(self):
+        # Least recently used first, skipping pinned entries
+        for entry_key in list(self._entries):
+            if self._used_bytes <= self.max_bytes:
+                break
+            if self._pins.get(entry_key):
+                continue
+            _, nbytes = self._entries.pop(entry_key)
+            self._used_bytes -= nbytes
+            self._count_locked(entry_key[0], "evictions")
+
+    def stats(self):
+        with self._lock:
+            tenants = defaultdict(lambda: {"entries": 0, "bytes": 0})
+            for (tenant, _), (_, nbytes) in self._entries.items():
+                tenants[tenant]["entries"] += 1
+                tenants[tenant]["bytes"] += nbytes
+
+            for tenant, counters in self._counters.items():
+                tenants[tenant].update(counters)
+
+            return {
+                "max_bytes": self.max_bytes,
+                "used_bytes": self._used_bytes,
+                "pinned_bytes": self._pinned_bytes_locked(),
+                "entries": len(self._entries),
+                "tenants": dict(tenants),
+            }
+
+
+# Process-wide cache used by the API routes
+memory_cache = MemoryDatasetCache()
@@ -0,0 +1,173 @@
+# cache/shared_store.py
+
+import itertools
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+from cache.disk_cache import (
+    CACHE_DIR,
+    CACHE_MAX_BYTES,
+    evict_to_size,
+    has_prepared,
+    list_entries,
+    load_prepared,
+    save_prepared,
+)
+
+# ============================================================
+# Shared Dataset Store (multi-worker)
+#
+# Every worker process memory-maps the same Arrow files from the
+# cache directory, so the OS page cache holds ONE copy of each
+# prepared dataset (clean_df + weekly_df / weekly_total cubes) no
+# matter how many gunicorn workers attach to it. DATASET_CACHE_DIR on
+# /dev/shm keeps the store entirely in RAM, but only if /dev/shm is
+# larger than DATASET_CACHE_MAX_MB.
+#
+# Reference counts are per-process pin files under .refs/<key>/, so
+# a crashed worker's pins are ignored once its pid is gone.
+# ============================================================
+REFS_DIR = ".refs"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedDatasetStore:
+    def __init__(self, store_dir=None, max_bytes=None):
+        self.store_dir = store_dir or CACHE_DIR
+        self.max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._pin_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # Reference Counting
+    # --------------------------------------------------------
+    def _refs_dir(self, key):
+        return os.path.join(self.store_dir, REFS_DIR, key)
+
+    def _pin(self, key):
+        refs_dir = self._refs_dir(key)
+        with self._lock:
+            pin_id = next(self._pin_ids)
+        pin_path = os.path.join(refs_dir, f"{os.getpid()}-{pin_id}")
+        while True:
+            os.makedirs(refs_dir, exist_ok=True)
+            try:
+                open(pin_path, "w").close()
+                return pin_path
+            except FileNotFoundError:
+                # A concurrent unpin removed the emptied directory; retry
+                continue
+
+    def _unpin(self, pin_path):
+        try:
+            os.remove(pin_path)
+        except FileNotFoundError:
+            pass
+        try:
+            # Drop the key's refs dir once its last pin is gone
+            os.rmdir(os.path.dirname(pin_path))
+        except OSError:
+            pass
+
+    def refcount(self, key):
+        """
+        Number of live attachments to key across all worker processes.
+        """
+        refs_dir = self._refs_dir(key)
+        if not os.path.isdir(refs_dir):
+            return 0
+
+        count = 0
+        for name in os.listdir(refs_dir):
+            pid = int(name.split("-", 1)[0])
+            if _pid_alive(pid):
+                count += 1
+            else:
+                # Stale pin from a dead worker
+                self._unpin(os.path.join(refs_dir, name))
+        return count
+
+    def is_pinned(self, key):
+        return self.refcount(key) > 0
+
+    # --------------------------------------------------------
+    # Store Operations
+    # --------------------------------------------------------
+    @contextmanager
+    def attach(self, key):
+        """
+        Pin key for the duration of the block and yield its prepared
+        frames (memory-mapped), or None if the store does not have it.
+        Pinned entries are skipped by eviction; misses leave no pin.
+        """
+        if not has_prepared(key, self.store_dir):
+            yield None
+            return
+
+        pin_path = self._pin(key)
+        try:
+            prepared = load_prepared(key, cache_dir=self.store_dir)
+        except BaseException:
+            self._unpin(pin_path)
+            raise
+        if prepared is None:
+            # Evicted between the check and the load
+            self._unpin(pin_path)
+            yield None
+            return
+
+        try:
+            yield prepared
+        finally:
+            self._unpin(pin_path)
+
+    def put(self, key, clean_df, weekly_df, weekly_total):
+        entry = save_prepared(
+            key,
+            clean_df,
+            weekly_df,
+            weekly_total,
+            cache_dir=self.store_dir,
+            evict=False,
+        )
+        # The store's own budget, and evicted keys lose their refs dirs
+        self.evict()
+        return entry
+
+    def evict(self, max_bytes=None):
+        evicted = evict_to_size(
+            self.max_bytes if max_bytes is None else max_bytes,
+            cache_dir=self.store_dir,
+            is_pinned=self.is_pinned,
+        )
+        for key in evicted:
+            shutil.rmtree(self._refs_dir(key), ignore_errors=True)
+        return evicted
+
+    def stats(self):
+        entries = list_entries(self.store_dir)
+        return {
+            "store_dir": self.store_dir,
+            "entries": len(entries),
+            "bytes": sum(e["bytes"] for e in entries),
+            "max_bytes": self.max_bytes,
+            "pinned": {
+                e["key"]: n for e in entries
+                if (n := self.refcount(e["key"])) > 0
+            },
+        }
+
+
+# Process-wide store used by the API routes
+dataset_store = SharedDatasetStore()
@@ -0,0 +1,59 @@
+# cache/spec_cache.py
+
+import os
+import threading
+from collections import OrderedDict
+
+# Encoded chart-spec responses (viz/specs.py) kept per process
+CHART_CACHE_ENTRIES = int(os.getenv("CHART_CACHE_ENTRIES", "128"))
+
+
+# =========================================================
+# Encoded Chart-Spec Cache (per process)
+# =========================================================
+class ChartSpecCache:
+    """
+    LRU of encoded chart-spec bodies keyed by dataset hash + chart
+    parameters (api.singleflight.request_key). Specs are deterministic
+    for a dataset, so entries never go stale.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = CHART_CACHE_ENTRIES if max_entries is None else max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if self.max_entries <= 0:
+            return body
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": sum(len(body) for body in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+chart_spec_cache = ChartSpecCache()
@@ -3,6 +3,9 @@
 import numpy as np
 import pandas as pd
 
+from engines.trend_engine import country_weekly_wow
+from telemetry.metrics import timed
+
 
 # =========================================================
 # Z-score Utility (safe, notebook-aligned)
@@ -17,6 +20,7 @@ def compute_z_score(series):
 # =========================================================
 # Overall Revenue Anomaly (CONSUMES precomputed WoW)
 # =========================================================
+@timed("anomaly.overall_revenue_anomaly")
 def overall_revenue_anomaly(weekly_total, threshold=2):
     """
     Expects weekly_total to already contain:
@@ -49,23 +53,14 @@ def overall_revenue_anomaly(weekly_total, threshold=2):
 # =========================================================
 # Country-level Revenue Anomalies (Rolling Window)
 # =========================================================
-def country_revenue_anomalies(weekly_df, window=8, threshold=2):
+@timed("anomaly.country_revenue_anomalies")
+def country_revenue_anomalies(weekly_df, window=8, threshold=2, country_weekly=None):
     anomalies = []
 
-    country_weekly = (
-        weekly_df
-        .groupby(["week", "Country"], as_index=False)["Revenue"]
-        .sum()
-        .sort_values("week")
-    )
-
-    country_weekly["wow_pct"] = (
-        country_weekly
-        .groupby("Country")["Revenue"]
-        .pct_change() * 100
-    )
+    if country_weekly is None:
+        country_weekly = country_weekly_wow(weekly_df)
 
-    for country, group in country_weekly.groupby("Country"):
+    for country, group in country_weekly.groupby("Country", observed=True):
         recent = group.dropna(subset=["wow_pct"]).tail(window)
 
         if len(recent) < 4:
@@ -0,0 +1,229 @@
+# engines/dag.py
+
+import contextvars
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
+
+from admission.limits import stage_slot
+from telemetry.profiling import single_threaded
+
+# Worker threads for independent engine nodes (1 = run inline, in order)
+ENGINE_WORKERS = int(os.getenv("ENGINE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Datasets whose shared intermediates are kept per process
+ENGINE_MEMO_DATASETS = int(os.getenv("ENGINE_MEMO_DATASETS", "64"))
+
+
+# ============================================================
+# Memoized Intermediates (per dataset)
+# ============================================================
+class IntermediateMemo:
+    """
+    LRU of {node name: value} per dataset key. Only nodes declared
+    memoize=True are stored; their values must be treated as read-only.
+    """
+
+    def __init__(self, max_datasets=None):
+        self.max_datasets = ENGINE_MEMO_DATASETS if max_datasets is None else max_datasets
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                return {}
+            self._entries.move_to_end(key)
+            return dict(values)
+
+    def update(self, key, values):
+        if not values or self.max_datasets <= 0:
+            return
+        with self._lock:
+            self._entries.setdefault(key, {}).update(values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_datasets:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "max_datasets": self.max_datasets,
+            }
+
+
+# ============================================================
+# Engine Graph
+# ============================================================
+class Node:
+    def __init__(self, name, fn, inputs, memoize, stage, inline):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.memoize = memoize
+        self.stage = stage
+        self.inline = inline
+
+
+class EngineGraph:
+    """
+    Engine functions declared with their inputs. run() resolves only
+    what the requested targets need, reuses memoized intermediates,
+    and runs nodes whose inputs are ready concurrently — so a run takes
+    critical-path time rather than the sum of its stages.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.nodes = {}
+
+    def add(self, name, fn, inputs=(), memoize=False, stage=None, inline=False):
+        """
+        stage names the admission limiter (admission/limits.py) a call
+        must hold a slot of, if any. inline nodes run in the calling
+        (request) thread instead of the shared pool: for I/O-bound work
+        such as LLM calls, which would otherwise hold pool threads while
+        other requests' engine nodes queue behind them.
+        """
+        if name in self.nodes:
+            raise ValueError(f"Node '{name}' already defined in graph '{self.name}'")
+        self.nodes[name] = Node(name, fn, inputs, memoize, stage, inline)
+        return fn
+
+    def node(self, name, inputs=(), memoize=False, stage=None, inline=False):
+        """
+        Decorator form of add().
+        """
+        def register(fn):
+            return self.add(name, fn, inputs, memoize, stage, inline)
+        return register
+
+    def required(self, targets, available):
+        """
+        Nodes that must run to produce targets, given values already
+        available (graph inputs + memoized intermediates).
+        """
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed or name in available:
+                continue
+            if name not in self.nodes:
+                raise ValueError(f"Graph '{self.name}' has no node or input named '{name}'")
+            needed.add(name)
+            stack.extend(self.nodes[name].inputs)
+        return needed
+
+    def run(self, inputs, targets=None, memo=None, memo_key=None, executor=None, on_node=None):
+        """
+        Returns {name: value} for every target (default: all nodes).
+        on_node(name, completed, total) is called as each node finishes.
+        """
+        targets = list(self.nodes) if targets is None else list(targets)
+
+        values = dict(inputs)
+        if memo is not None and memo_key is not None:
+            values.update({k: v for k, v in memo.get(memo_key).items() if k in self.nodes})
+
+        pending = self.required(targets, values)
+        fresh = {}
+
+        total = len(pending)
+
+        def finished(name, value):
+            values[name] = fresh[name] = value
+            if on_node is not None:
+                on_node(name, len(fresh), total)
+
+        if executor is None:
+            self._run_inline(pending, values, finished)
+        else:
+            self._run_parallel(pending, values, finished, executor)
+
+        if memo is not None and memo_key is not None:
+            memo.update(memo_key, {k: v for k, v in fresh.items() if self.nodes[k].memoize})
+
+        return {name: values[name] for name in targets}
+
+    def _ready(self, pending, values, running=()):
+        ready = [
+            name for name in self.nodes
+            if name in pending and all(i in values for i in self.nodes[name].inputs)
+        ]
+        if pending and not ready and not running:
+            raise ValueError(f"Graph '{self.name}' has a cycle through {sorted(pending)}")
+        return ready
+
+    def _call(self, name, values):
+        node = self.nodes[name]
+        with stage_slot(node.stage) if node.stage else nullcontext():
+            return node.fn(*(values[i] for i in node.inputs))
+
+    def _run_inline(self, pending, values, finished):
+        while pending:
+            for name in self._ready(pending, values):
+                finished(name, self._call(name, values))
+                pending.discard(name)
+
+    def _run_parallel(self, pending, values, finished, executor):
+        running = {}
+        try:
+            while pending or running:
+                inline = []
+                for name in self._ready(pending, values, running):
+                    pending.discard(name)
+                    if self.nodes[name].inline:
+                        inline.append(name)
+                        continue
+                    # Each node keeps the request's context (request id, profile spans)
+                    ctx = contextvars.copy_context()
+                    running[executor.submit(ctx.run, self._call, name, values)] = name
+
+                # Pool nodes submitted above keep running meanwhile
+                for name in inline:
+                    finished(name, self._call(name, values))
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    finished(name, future.result())
+        finally:
+            for future in running:
+                future.cancel()
+
+
+# ============================================================
+# Shared Worker Pool + Memo
+# ============================================================
+engine_memo = IntermediateMemo()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def engine_executor():
+    """
+    Process-wide pool for engine nodes, or None (run inline) when
+    ENGINE_WORKERS <= 1 or the request is being cProfiled.
+    """
+    global _executor
+    if ENGINE_WORKERS <= 1 or single_threaded():
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=ENGINE_WORKERS,
+                thread_name_prefix="engine",
+            )
+        return _executor
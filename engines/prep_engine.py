@@ -2,48 +2,56 @@
 
 import pandas as pd
 
+from engines.schema import COLUMN_ROLES
+from telemetry.metrics import timed, StepTimer
+
+
+PRIMARY_KEY = "transaction_id"
+
+
 # ============================================================
-# Column Role Contract (LOCKED – mirrors notebook)
+# Dimension Encoding (categorical codes + shared dictionary)
 # ============================================================
-COLUMN_ROLES = {
-    "time": {
-        "primary": "Date",
-        "grain": "weekly",
-    },
-    "metrics": {
-        "primary": "Revenue",
-        "secondary": [
-            "Units Sold",
-            "Margin",
-            "Margin %",
-            "Discount",
-            "Unit Price",
-        ],
-    },
-    "dimensions": {
-        "primary": [
-            "Country",
-            "Channel",
-            "Store",
-        ],
-        "secondary": [
-            "SKU",
-            "Promotion",
-        ],
-    },
-}
+def encode_dimension_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert every present dimension column to a categorical dtype.
+    Categories are sorted, so groupby output order is unchanged.
+    """
+    dimension_cols = (
+        COLUMN_ROLES["dimensions"]["primary"]
+        + COLUMN_ROLES["dimensions"]["secondary"]
+    )
 
-PRIMARY_KEY = "transaction_id"
+    for col in dimension_cols:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    # promotion_trend() fills nulls with this label — keep it encodable
+    if "Promotion" in df.columns and "No Promotion" not in df["Promotion"].cat.categories:
+        df["Promotion"] = df["Promotion"].cat.add_categories("No Promotion")
+
+    return df
+
+
+class EmptyDatasetError(ValueError):
+    """
+    No row survived validation (unparseable dates / missing revenue).
+    """
 
 
 # ============================================================
 # Main Preparation Engine
 # ============================================================
-def prepare_data(df: pd.DataFrame):
+@timed("prepare_data")
+def prepare_data(df: pd.DataFrame, encode_dimensions: bool = True):
     """
     Canonical data preparation layer.
     Mirrors the Jupyter notebook logic exactly.
 
+    With encode_dimensions, dimension columns are stored as categoricals
+    (integer codes + one shared label dictionary per column). Engines
+    group on the codes; labels are decoded when results are serialized.
+
     Returns:
         clean_df
         weekly_df
@@ -51,6 +59,8 @@ def prepare_data(df: pd.DataFrame):
         analysis_week
     """
 
+    steps = StepTimer("prepare_data")
+
     df = df.copy()
 
     # --------------------------------------------------------
@@ -66,6 +76,8 @@ def prepare_data(df: pd.DataFrame):
     if missing_cols:
         raise ValueError(f"Missing required columns: {missing_cols}")
 
+    steps.mark("1_validate")
+
     # --------------------------------------------------------
     # 2. Parse Date
     # --------------------------------------------------------
@@ -79,15 +91,19 @@ def prepare_data(df: pd.DataFrame):
 
     df = df.dropna(subset=[TIME_COL])
 
+    steps.mark("2_parse_date")
+
     # --------------------------------------------------------
     # 3. Create WEEK column (CRITICAL)
     # --------------------------------------------------------
     df["week"] = (
         df[TIME_COL]
         .dt.to_period("W")
-        .apply(lambda r: r.start_time)
+        .dt.start_time
     )
 
+    steps.mark("3_week")
+
     # --------------------------------------------------------
     # 4. Coerce Numeric Metrics
     # --------------------------------------------------------
@@ -100,6 +116,8 @@ def prepare_data(df: pd.DataFrame):
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
+    steps.mark("4_numeric")
+
     # --------------------------------------------------------
     # 5. Handle Missing Revenue / Units / Price
     # --------------------------------------------------------
@@ -121,6 +139,13 @@ def prepare_data(df: pd.DataFrame):
 
     df = df.dropna(subset=[REVENUE_COL])
 
+    if df.empty:
+        raise EmptyDatasetError(
+            f"No valid rows: every row lacks a parseable {TIME_COL} or a {REVENUE_COL} value"
+        )
+
+    steps.mark("5_revenue")
+
     # --------------------------------------------------------
     # 6. Fill Dimension Nulls
     # --------------------------------------------------------
@@ -130,6 +155,11 @@ def prepare_data(df: pd.DataFrame):
     if "Promotion" in df.columns:
         df["Promotion"] = df["Promotion"].fillna("No Promotion")
 
+    if encode_dimensions:
+        df = encode_dimension_columns(df)
+
+    steps.mark("6_dimensions")
+
     # --------------------------------------------------------
     # 7. Weekly Aggregations
     # --------------------------------------------------------
@@ -137,7 +167,8 @@ def prepare_data(df: pd.DataFrame):
         df
         .groupby(
             ["week"] + COLUMN_ROLES["dimensions"]["primary"],
-            as_index=False
+            as_index=False,
+            observed=True
         )
         .agg({
             "Revenue": "sum",
@@ -157,9 +188,12 @@ def prepare_data(df: pd.DataFrame):
         weekly_total["Revenue"].pct_change() * 100
     )
 
+    steps.mark("7_aggregate")
+
     # --------------------------------------------------------
     # 8. Analysis Week (LATEST WEEK ONLY)
     # --------------------------------------------------------
     analysis_week = weekly_total.iloc[-1]["week"]
+    steps.mark("8_analysis_week")
 
     return df, weekly_df, weekly_total, analysis_week
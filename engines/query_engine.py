@@ -3,13 +3,6 @@
 import json
 import pandas as pd
 import numpy as np
-from openai import OpenAI
-import os
-
-# Load environment variables from .env file
-from dotenv import load_dotenv
-
-load_dotenv(encoding='utf-8')
 
 
 from engines.trend_engine import (
@@ -20,12 +13,16 @@ from engines.trend_engine import (
     unit_price_trend
 )
 from engines.anomaly_engine import run_anomaly_engine
+from telemetry.metrics import timed
+from telemetry.log import get_logger, log_sampled
+from ai.llm_client import get_llm_client
+from admission.limits import Overloaded, stage_slot
 
-# ============================================================
-# OpenAI Client
-# ============================================================
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = get_logger("query_engine")
 
+# pandas >= 3 always copies on write, so a shallow copy already keeps
+# writes away from the original; older versions need a deep copy
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
 
 # ============================================================
 # JSON Sanitizer Helper (for Timestamp handling)
@@ -133,6 +130,7 @@ QUERY_CAPABILITIES = {
 # ============================================================
 # Intent Classifier (ENHANCED)
 # ============================================================
+@timed("llm.classify_intent")
 def classify_query_intent(user_query: str) -> dict:
     """
     Uses GPT-4o-mini to classify user intent and extract parameters.
@@ -181,7 +179,7 @@ Examples:
 Respond ONLY with valid JSON, no other text.
 """
 
-    response = client.chat.completions.create(
+    response = get_llm_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.1,
@@ -194,6 +192,7 @@ Respond ONLY with valid JSON, no other text.
 # ============================================================
 # Custom Query Execution (NEW!)
 # ============================================================
+@timed("llm.generate_pandas_query")
 def generate_pandas_query(user_query: str, df_info: dict) -> str:
     """
     Generate safe Pandas code for custom data exploration.
@@ -219,7 +218,7 @@ Generate SAFE Python code that:
 2. Uses ONLY pandas (pd) and numpy (np) operations
 3. Returns a result (DataFrame, Series, or scalar) - DO NOT use print()
 4. ALLOWED operations: filter [], query(), groupby(), agg(), mean(), sum(), count(), min(), max(), sort_values(), head(), tail(), describe(), value_counts(), unique(), nunique()
-5. FORBIDDEN: import, exec, eval, open, file, os, sys, subprocess, __builtins__, compile
+5. FORBIDDEN: import, exec, eval, open, file, os, sys, subprocess, __builtins__, compile, inplace=True, pop(), insert(), update()
 
 Return ONLY the Python code (one line or multiple lines), no explanations, no markdown.
 
@@ -238,7 +237,7 @@ Code: df[df['Store'] == 'Walmart']['Revenue'].sum()
 
 Your code:"""
 
-    response = client.chat.completions.create(
+    response = get_llm_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.1
@@ -252,6 +251,120 @@ Your code:"""
     return code
 
 
+def plain_dtype(dtype):
+    """
+    Categorical dimensions (engines/prep_engine.py) as the dtype of
+    their values; anything else unchanged.
+    """
+    if isinstance(dtype, pd.CategoricalDtype):
+        return dtype.categories.dtype
+    return dtype
+
+
+def query_frame(clean_df):
+    """
+    The frame generated code runs against: a private copy, so nothing
+    it does can reach the cached clean_df shared by later requests.
+
+    Categorical dimensions are decoded back to plain values, so a
+    filtered value_counts() / groupby() lists only observed values,
+    exactly as it would on the uploaded CSV.
+    """
+    frame = clean_df.copy(deep=not COPY_ON_WRITE)
+    for col, dtype in frame.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype(plain_dtype(dtype))
+    return frame
+
+
+def run_generated_code(pandas_code: str, clean_df) -> dict:
+    """
+    Validate and execute generated Pandas code against clean_df, and
+    convert the result into the custom_exploration response shape.
+    Execution errors propagate to the caller.
+    """
+    
+    # Step 2: Security validation
+    dangerous_patterns = [
+        'import ', 'exec(', 'eval(', '__', 'open(', 'file(',
+        'os.', 'sys.', 'subprocess', 'requests.', 'urllib',
+        'compile(', 'globals(', 'locals(', 'vars(', 'dir(',
+        '__builtins__', 'getattr', 'setattr', 'delattr',
+        # In-place mutation (the frame is a copy, but fail loudly anyway)
+        'inplace', '.pop(', '.insert(', '.update(', '__setitem__', '__delitem__'
+    ]
+    
+    code_lower = pandas_code.lower()
+    for pattern in dangerous_patterns:
+        if pattern.lower() in code_lower:
+            return {
+                "success": False,
+                "query_type": "custom_exploration",
+                "error": f"Security: Query contains forbidden operation '{pattern}'",
+                "code_generated": pandas_code
+            }
+    
+    # Step 3: Execute in restricted namespace
+    namespace = {
+        'df': query_frame(clean_df),
+        'pd': pd,
+        'np': np
+    }
+    
+    # Execute the code
+    with stage_slot("custom_query"), timed("custom_query.eval"):
+        result = eval(pandas_code, {"__builtins__": {}}, namespace)
+    
+    logger.debug("Custom query executed", extra={"result_type": type(result).__name__})
+    
+    # Step 4: Convert result to JSON-serializable format using sanitizer
+    if isinstance(result, pd.DataFrame):
+        # Limit to top 50 rows for performance
+        result_limited = result.head(50)
+        result_data = sanitize_for_json(result_limited)
+        result_type = "dataframe"
+        result_shape = f"{len(result)} rows × {len(result.columns)} columns"
+        
+    elif isinstance(result, pd.Series):
+        # Limit to top 50 entries
+        result_limited = result.head(50)
+        result_data = sanitize_for_json(result_limited)
+        result_type = "series"
+        result_shape = f"{len(result)} entries"
+        
+    elif isinstance(result, (int, float, np.integer, np.floating)):
+        result_data = float(result)
+        result_type = "scalar"
+        result_shape = "single value"
+        
+    elif isinstance(result, pd.Timestamp):
+        result_data = result.isoformat()
+        result_type = "timestamp"
+        result_shape = "date/time"
+        
+    elif isinstance(result, str):
+        result_data = result
+        result_type = "string"
+        result_shape = "text"
+        
+    else:
+        result_data = sanitize_for_json(result)
+        result_type = "other"
+        result_shape = "converted"
+    
+    return {
+        "success": True,
+        "query_type": "custom_exploration",
+        "data": result_data,
+        "code_generated": pandas_code,
+        "metadata": {
+            "result_type": result_type,
+            "result_shape": result_shape,
+            "calculation_performed": True
+        }
+    }
+
+
 def execute_custom_query(user_query: str, clean_df, weekly_df) -> dict:
     """
     Execute custom data exploration queries using AI-generated Pandas code.
@@ -270,99 +383,27 @@ def execute_custom_query(user_query: str, clean_df, weekly_df) -> dict:
     # Provide dataset schema info to AI
     df_info = {
         "columns": clean_df.columns.tolist(),
-        "dtypes": {col: str(dtype) for col, dtype in clean_df.dtypes.items()},
+        "dtypes": {col: str(plain_dtype(dtype)) for col, dtype in clean_df.dtypes.items()},
         "row_count": len(clean_df)
     }
     
     try:
-        print(f"🔍 Generating pandas code for: {user_query}")
+        logger.debug("Generating pandas code", extra={"query": user_query})
         
         # Step 1: Generate pandas code
         pandas_code = generate_pandas_query(user_query, df_info)
         
-        print(f"📝 Generated code: {pandas_code}")
-        
-        # Step 2: Security validation
-        dangerous_patterns = [
-            'import ', 'exec(', 'eval(', '__', 'open(', 'file(',
-            'os.', 'sys.', 'subprocess', 'requests.', 'urllib',
-            'compile(', 'globals(', 'locals(', 'vars(', 'dir(',
-            '__builtins__', 'getattr', 'setattr', 'delattr'
-        ]
-        
-        code_lower = pandas_code.lower()
-        for pattern in dangerous_patterns:
-            if pattern.lower() in code_lower:
-                return {
-                    "success": False,
-                    "query_type": "custom_exploration",
-                    "error": f"Security: Query contains forbidden operation '{pattern}'",
-                    "code_generated": pandas_code
-                }
-        
-        # Step 3: Execute in restricted namespace
-        namespace = {
-            'df': clean_df,
-            'pd': pd,
-            'np': np
-        }
-        
-        # Execute the code
-        result = eval(pandas_code, {"__builtins__": {}}, namespace)
-        
-        print(f"✅ Code executed successfully. Result type: {type(result)}")
-        
-        # Step 4: Convert result to JSON-serializable format using sanitizer
-        if isinstance(result, pd.DataFrame):
-            # Limit to top 50 rows for performance
-            result_limited = result.head(50)
-            result_data = sanitize_for_json(result_limited)
-            result_type = "dataframe"
-            result_shape = f"{len(result)} rows × {len(result.columns)} columns"
-            
-        elif isinstance(result, pd.Series):
-            # Limit to top 50 entries
-            result_limited = result.head(50)
-            result_data = sanitize_for_json(result_limited)
-            result_type = "series"
-            result_shape = f"{len(result)} entries"
-            
-        elif isinstance(result, (int, float, np.integer, np.floating)):
-            result_data = float(result)
-            result_type = "scalar"
-            result_shape = "single value"
-            
-        elif isinstance(result, pd.Timestamp):
-            result_data = result.isoformat()
-            result_type = "timestamp"
-            result_shape = "date/time"
-            
-        elif isinstance(result, str):
-            result_data = result
-            result_type = "string"
-            result_shape = "text"
-            
-        else:
-            result_data = sanitize_for_json(result)
-            result_type = "other"
-            result_shape = "converted"
-        
-        return {
-            "success": True,
-            "query_type": "custom_exploration",
-            "data": result_data,
-            "code_generated": pandas_code,
-            "metadata": {
-                "result_type": result_type,
-                "result_shape": result_shape,
-                "calculation_performed": True
-            }
-        }
+        log_sampled(logger, "Generated pandas code", lambda: pandas_code)
         
+        # Steps 2-4: Validate, execute, serialize
+        return run_generated_code(pandas_code, clean_df)
+
+    except Overloaded:
+        # Surface as 429/503 rather than a failed answer
+        raise
+
     except Exception as e:
-        print(f"❌ Custom query execution failed: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.warning("Custom query execution failed: %s", e, exc_info=True)
         
         return {
             "success": False,
@@ -493,6 +534,7 @@ def execute_query(intent: dict, clean_df, weekly_df, weekly_total) -> dict:
 # ============================================================
 # Response Generator (ENHANCED)
 # ============================================================
+@timed("llm.natural_response")
 def generate_natural_response(user_query: str, query_result: dict) -> dict:
     """
     Generates natural language response with visualization suggestion.
@@ -551,7 +593,7 @@ Respond in JSON format:
 }}
 """
 
-    response = client.chat.completions.create(
+    response = get_llm_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.3,
@@ -568,38 +610,45 @@ def process_natural_language_query(
     user_query: str,
     clean_df,
     weekly_df,
-    weekly_total
+    weekly_total,
+    intent: dict = None
 ) -> dict:
     """
     Main orchestrator for natural language queries.
     NOW SUPPORTS BOTH PRE-COMPUTED AND CUSTOM QUERIES.
     
+    intent: a previously classified intent for this exact question
+    (interactive sessions reuse them), skipping the classifier call.
+
     Returns complete response with data and formatted answer.
     """
     
-    print(f"\n{'='*60}")
-    print(f"Processing query: {user_query}")
-    print(f"{'='*60}")
+    logger.debug("Processing query", extra={"query": user_query})
     
     # Step 1: Classify intent
-    intent = classify_query_intent(user_query)
+    if intent is None:
+        intent = classify_query_intent(user_query)
+    else:
+        intent = dict(intent)
     intent["original_query"] = user_query  # Store for custom queries
     
-    print(f"✅ Intent classified: {intent['query_type']} (confidence: {intent.get('confidence', 'N/A')})")
+    logger.debug(
+        "Intent classified",
+        extra={"query_type": intent["query_type"], "confidence": intent.get("confidence")}
+    )
     
     # Step 2: Execute query
     query_result = execute_query(intent, clean_df, weekly_df, weekly_total)
     
     if query_result.get("success", True):
-        print(f"✅ Query executed successfully")
+        logger.debug("Query executed")
     else:
-        print(f"❌ Query execution failed: {query_result.get('error')}")
+        logger.info("Query execution failed: %s", query_result.get("error"))
     
     # Step 3: Generate natural response
     nl_response = generate_natural_response(user_query, query_result)
     
-    print(f"✅ Natural language response generated")
-    print(f"{'='*60}\n")
+    logger.debug("Natural language response generated")
     
     # Step 4: Combine everything
     return {
@@ -0,0 +1,119 @@
+# engines/review_graph.py
+
+from engines.dag import EngineGraph, engine_memo, engine_executor
+from engines.trend_engine import (
+    country_weekly_wow,
+    overall_revenue_trend,
+    country_trends,
+    channel_trends,
+    promotion_trend,
+    unit_price_trend,
+)
+from engines.anomaly_engine import overall_revenue_anomaly, country_revenue_anomalies
+from ai.ai_summary import build_ai_prompt, generate_ai_summary
+from telemetry.metrics import timed
+from telemetry.log import get_logger
+
+logger = get_logger("review_graph")
+
+AI_FALLBACK_SUMMARY = (
+    "Executive summary could not be generated due to an AI service issue. "
+    "All deterministic analytics and signals are valid."
+)
+
+# ============================================================
+# Full Review Graph
+# Inputs: clean_df, weekly_df, weekly_total, analysis_week
+# ============================================================
+full_review_graph = EngineGraph("full_review")
+
+# Engine nodes hold an "engines" admission slot while running; the LLM
+# call is limited separately by the "llm" stage inside the client and
+# runs inline in the request thread, so waiting on the provider never
+# occupies the shared engine pool.
+
+# Shared by country_trends and country_revenue_anomalies — computed once
+full_review_graph.add("country_weekly", country_weekly_wow, ["weekly_df"], memoize=True, stage="engines")
+
+# ---------------- Trend Engine ----------------
+full_review_graph.add("overall_revenue_trend", overall_revenue_trend, ["weekly_total"], stage="engines")
+full_review_graph.add("country_trends", country_trends, ["weekly_df", "country_weekly"], stage="engines")
+full_review_graph.add("channel_trends", channel_trends, ["weekly_df"], stage="engines")
+full_review_graph.add("promotion_trend", promotion_trend, ["clean_df"], stage="engines")
+full_review_graph.add("unit_price_trend", unit_price_trend, ["weekly_df"], stage="engines")
+
+
+@full_review_graph.node("trend_results", [
+    "overall_revenue_trend", "country_trends", "channel_trends",
+    "promotion_trend", "unit_price_trend",
+])
+def assemble_trends(overall, country, channel, promotion, unit_price):
+    return {
+        "overall_revenue_trend": overall,
+        "country_trends": country,
+        "channel_trends": channel,
+        "promotion_trend": promotion,
+        "unit_price_trend": unit_price,
+    }
+
+
+# ---------------- Anomaly Engine ----------------
+full_review_graph.add("overall_anomaly", overall_revenue_anomaly, ["weekly_total"], stage="engines")
+
+
+@full_review_graph.node("driver_anomalies", ["weekly_df", "country_weekly"], stage="engines")
+def driver_anomalies(weekly_df, country_weekly):
+    return country_revenue_anomalies(weekly_df, country_weekly=country_weekly)
+
+
+@full_review_graph.node("anomaly_results", ["overall_anomaly", "driver_anomalies"])
+def assemble_anomalies(overall, drivers):
+    return {
+        "overall_anomaly": overall,
+        "driver_anomalies": drivers,
+    }
+
+
+# ---------------- AI Executive Summary (FAULT-TOLERANT) ----------------
+@full_review_graph.node("prompt", ["trend_results", "anomaly_results", "analysis_week"], inline=True)
+def ai_prompt(trend_results, anomaly_results, analysis_week):
+    return build_ai_prompt(
+        trend_results=trend_results,
+        anomaly_results=anomaly_results,
+        analysis_week=analysis_week
+    )
+
+
+@full_review_graph.node("executive_summary", ["prompt"], inline=True)
+def executive_summary(prompt):
+    try:
+        summary = generate_ai_summary(prompt)
+        logger.debug("AI summary generated")
+        return summary
+    except Exception as ai_error:
+        logger.warning("AI summary failed, falling back: %s", ai_error)
+        return AI_FALLBACK_SUMMARY
+
+
+# ============================================================
+# Runner
+# ============================================================
+def run_full_review_graph(clean_df, weekly_df, weekly_total, analysis_week, dataset_key=None, targets=None, on_node=None):
+    """
+    Resolves targets (default: every node) for one prepared dataset.
+    Intermediates are memoized under dataset_key when one is given.
+    """
+    with timed("full_review_graph"):
+        return full_review_graph.run(
+            {
+                "clean_df": clean_df,
+                "weekly_df": weekly_df,
+                "weekly_total": weekly_total,
+                "analysis_week": analysis_week,
+            },
+            targets=targets,
+            memo=engine_memo,
+            memo_key=dataset_key,
+            executor=engine_executor(),
+            on_node=on_node,
+        )
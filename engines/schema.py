@@ -0,0 +1,35 @@
+# engines/schema.py
+
+# Kept free of pandas so the API can validate upload headers
+# without importing the data stack.
+
+# ============================================================
+# Column Role Contract (LOCKED – mirrors notebook)
+# ============================================================
+COLUMN_ROLES = {
+    "time": {
+        "primary": "Date",
+        "grain": "weekly",
+    },
+    "metrics": {
+        "primary": "Revenue",
+        "secondary": [
+            "Units Sold",
+            "Margin",
+            "Margin %",
+            "Discount",
+            "Unit Price",
+        ],
+    },
+    "dimensions": {
+        "primary": [
+            "Country",
+            "Channel",
+            "Store",
+        ],
+        "secondary": [
+            "SKU",
+            "Promotion",
+        ],
+    },
+}
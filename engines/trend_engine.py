@@ -2,9 +2,12 @@
 
 import pandas as pd
 
+from telemetry.metrics import timed
+
 # =========================================================
 # Overall Revenue Trend (CONSUMES precomputed WoW)
 # =========================================================
+@timed("trend.overall_revenue_trend")
 def overall_revenue_trend(weekly_total):
     """
     Expects weekly_total to already contain:
@@ -29,22 +32,38 @@ def overall_revenue_trend(weekly_total):
 
 
 # =========================================================
-# Country-level Trends (Top & Bottom Movers)
+# Country x Week Revenue + WoW (SHARED with anomaly engine)
 # =========================================================
-def country_trends(weekly_df):
+@timed("trend.country_weekly_wow")
+def country_weekly_wow(weekly_df):
+    """
+    Country revenue per week with its week-over-week % change.
+    Read-only for consumers — it is memoized and shared across engines.
+    """
     country_weekly = (
         weekly_df
-        .groupby(["week", "Country"], as_index=False)["Revenue"]
+        .groupby(["week", "Country"], as_index=False, observed=True)["Revenue"]
         .sum()
         .sort_values("week")
     )
 
     country_weekly["wow_pct"] = (
         country_weekly
-        .groupby("Country")["Revenue"]
+        .groupby("Country", observed=True)["Revenue"]
         .pct_change() * 100
     )
 
+    return country_weekly
+
+
+# =========================================================
+# Country-level Trends (Top & Bottom Movers)
+# =========================================================
+@timed("trend.country_trends")
+def country_trends(weekly_df, country_weekly=None):
+    if country_weekly is None:
+        country_weekly = country_weekly_wow(weekly_df)
+
     latest_week = country_weekly["week"].max()
 
     movers = (
@@ -63,17 +82,18 @@ def country_trends(weekly_df):
 # =========================================================
 # Channel-level Trends
 # =========================================================
+@timed("trend.channel_trends")
 def channel_trends(weekly_df):
     channel_weekly = (
         weekly_df
-        .groupby(["week", "Channel"], as_index=False)["Revenue"]
+        .groupby(["week", "Channel"], as_index=False, observed=True)["Revenue"]
         .sum()
         .sort_values("week")
     )
 
     channel_weekly["wow_pct"] = (
         channel_weekly
-        .groupby("Channel")["Revenue"]
+        .groupby("Channel", observed=True)["Revenue"]
         .pct_change() * 100
     )
 
@@ -90,6 +110,7 @@ def channel_trends(weekly_df):
 # =========================================================
 # Promotion Trend (SEMANTICALLY MATCHES NOTEBOOK)
 # =========================================================
+@timed("trend.promotion_trend")
 def promotion_trend(df):
     if "Promotion" not in df.columns:
         return []
@@ -97,14 +118,14 @@ def promotion_trend(df):
     promo_weekly = (
         df
         .assign(promo_flag=df["Promotion"].fillna("No Promotion"))
-        .groupby(["week", "promo_flag"], as_index=False)["Revenue"]
+        .groupby(["week", "promo_flag"], as_index=False, observed=True)["Revenue"]
         .sum()
         .sort_values("week")
     )
 
     promo_weekly["wow_pct"] = (
         promo_weekly
-        .groupby("promo_flag")["Revenue"]
+        .groupby("promo_flag", observed=True)["Revenue"]
         .pct_change() * 100
     )
 
@@ -121,6 +142,7 @@ def promotion_trend(df):
 # =========================================================
 # Unit Price & Demand Trend (WEIGHTED, NOTEBOOK-CORRECT)
 # =========================================================
+@timed("trend.unit_price_trend")
 def unit_price_trend(weekly_df):
     weekly = (
         weekly_df
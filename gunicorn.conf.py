@@ -0,0 +1,34 @@
+# gunicorn.conf.py
+#
+# Multi-worker deployment mode:
+#   gunicorn api.main:app -c gunicorn.conf.py
+#
+# Workers share prepared datasets through the memory-mapped store in
+# DATASET_CACHE_DIR (see cache/shared_store.py), so adding workers does
+# not multiply dataset memory.
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# WEB_CONCURRENCY=auto → one worker per core
+_concurrency = os.getenv("WEB_CONCURRENCY", "1")
+workers = (
+    multiprocessing.cpu_count() if _concurrency == "auto"
+    else int(_concurrency)
+)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Large reviews + LLM calls can legitimately take minutes
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def on_starting(server):
+    # Create the shared store up front so workers don't race on mkdir
+    from cache.disk_cache import CACHE_DIR
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
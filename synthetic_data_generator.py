@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Synthetic Sales Data Generator
+
+Generates transaction data matching the ferrero_rocher_sales_dataset.csv
+schema, with scenario-controlled performance in the latest week.
+
+Usage:
+    python synthetic_data_generator.py --scenario growth --weeks 4 --output test_data.csv
+    python synthetic_data_generator.py --rows 10000000 --stores 5000 --skus 2000 --output big.csv
+
+Scenarios (latest week vs. prior weeks):
+    growth       +12% revenue
+    decline      -8% revenue
+    mixed        some countries up, some down
+    promotional  heavy promotion mix with a promo-driven demand lift
+    normal       baseline noise only
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# Schema & Reference Values (mirrors data_dictionary_ferrero_rocher.csv)
+# ============================================================
+COLUMNS = [
+    "transaction_id", "Store", "Country", "SKU", "Date", "Channel",
+    "Promotion", "Units Sold", "Unit Price", "Discount", "Revenue",
+    "Margin %", "Margin",
+]
+
+COUNTRIES = ["UK", "USA", "India", "UAE", "Canada", "Australia", "Singapore"]
+
+BASE_STORES = [
+    "Walmart", "Tesco", "Carrefour", "Amazon Fresh", "Costco", "7-Eleven",
+    "FairPrice(NTUC)", "DMart", "Sobeys", "Loblaws", "Reliance Fresh", "Viva",
+    "Kmart", "Spencers", "Spinneys", "Asda", "ShengSiong", "Woolworths",
+    "Aldy", "Lulu Hypermarket", "BigW", "Coles",
+]
+
+BASE_SKUS = {
+    "Ferrero Rocher T3": 120,
+    "Ferrero Rocher 16pc": 350,
+    "Ferrero Rocher 24pc": 550,
+    "Ferrero Collection 15pc": 650,
+    "Ferrero Rocher 32pc": 750,
+}
+
+CHANNELS = ["Online", "Wholesale", "Retail", "Offline"]
+CHANNEL_WEIGHTS = [0.36, 0.32, 0.31, 0.01]
+
+PROMOTIONS = {
+    "Diwali Promo": 0.15,
+    "Valentine Promo": 0.10,
+    "NewYear Sale": 0.25,
+    "Buy1Get1": 0.50,
+    "Christmas Promo": 0.20,
+}
+
+SCENARIOS = ("growth", "decline", "mixed", "promotional", "normal")
+
+# Latest-week demand multiplier per scenario
+LATEST_WEEK_LIFT = {
+    "growth": 1.12,
+    "decline": 0.92,
+    "promotional": 1.0,
+    "normal": 1.0,
+}
+
+# mixed: per-country latest-week multiplier (cycled over COUNTRIES)
+MIXED_COUNTRY_LIFT = [1.15, 0.88, 1.06, 0.93, 1.10, 0.90, 1.00]
+
+PROMO_SHARE = {"promotional": 0.85}
+DEFAULT_PROMO_SHARE = 0.35
+PROMO_DEMAND_LIFT = 1.25
+
+
+# ============================================================
+# Entity Catalogues (scale to thousands of stores / SKUs)
+# ============================================================
+def build_stores(n_stores):
+    if n_stores <= len(BASE_STORES):
+        names = BASE_STORES[:n_stores]
+    else:
+        names = BASE_STORES + [
+            f"Store {i:05d}" for i in range(n_stores - len(BASE_STORES))
+        ]
+    # Each store operates in one home country
+    countries = [COUNTRIES[i % len(COUNTRIES)] for i in range(len(names))]
+    return np.array(names, dtype=object), np.array(countries, dtype=object)
+
+
+def build_skus(n_skus, rng):
+    names = list(BASE_SKUS)[:n_skus]
+    prices = list(BASE_SKUS.values())[:n_skus]
+    extra = n_skus - len(names)
+    if extra > 0:
+        names += [f"Ferrero SKU {i:05d}" for i in range(extra)]
+        prices += list(rng.integers(120, 751, size=extra))
+    return np.array(names, dtype=object), np.array(prices, dtype=np.int64)
+
+
+# ============================================================
+# Generator
+# ============================================================
+def generate_chunk(
+    rng, n_rows, start_index, weeks, scenario, stores, store_countries,
+    skus, sku_prices, start_date,
+):
+    """
+    Generate n_rows transactions. Rows are spread uniformly over weeks;
+    the scenario shapes demand in the latest week.
+    """
+    # Balanced week assignment keeps per-week row counts equal
+    week = np.arange(start_index, start_index + n_rows) % weeks
+    day = rng.integers(0, 7, size=n_rows)
+
+    # Format each distinct date once, then index (strftime per row is slow)
+    date_labels = pd.date_range(start_date, periods=weeks * 7, freq="D").strftime("%d-%m-%Y")
+    dates = np.asarray(date_labels, dtype=object)[week * 7 + day]
+
+    store_idx = rng.integers(0, len(stores), size=n_rows)
+    sku_idx = rng.integers(0, len(skus), size=n_rows)
+    channel = rng.choice(np.array(CHANNELS, dtype=object), size=n_rows, p=CHANNEL_WEIGHTS)
+
+    promo_share = PROMO_SHARE.get(scenario, DEFAULT_PROMO_SHARE)
+    promo_names = np.array(list(PROMOTIONS), dtype=object)
+    promo_discounts = np.array(list(PROMOTIONS.values()))
+    is_promo = rng.random(n_rows) < promo_share
+    promo_idx = rng.integers(0, len(promo_names), size=n_rows)
+
+    promotion = np.where(is_promo, promo_names[promo_idx], None)
+    discount = np.where(is_promo, promo_discounts[promo_idx], 0.0)
+
+    # ---------------- Demand ----------------
+    demand = rng.integers(10, 200, size=n_rows).astype(float)
+    latest = week == (weeks - 1)
+
+    if scenario == "mixed":
+        country_pos = np.arange(len(stores)) % len(COUNTRIES)
+        lift = np.array(MIXED_COUNTRY_LIFT)[country_pos[store_idx]]
+        demand = np.where(latest, demand * lift, demand)
+    else:
+        demand = np.where(latest, demand * LATEST_WEEK_LIFT[scenario], demand)
+
+    if scenario == "promotional":
+        demand = np.where(is_promo, demand * PROMO_DEMAND_LIFT, demand)
+
+    units = np.maximum(np.rint(demand), 1).astype(np.int64)
+
+    # ---------------- Money ----------------
+    unit_price = sku_prices[sku_idx]
+    revenue = units * unit_price * (1 - discount)
+    margin_pct = rng.integers(25, 41, size=n_rows)
+    margin = revenue * margin_pct / 100
+
+    width = max(6, len(str(start_index + n_rows)))
+    ids = np.char.add("TXN_", np.char.zfill(
+        np.arange(start_index + 1, start_index + n_rows + 1).astype(str), width
+    ))
+
+    return pd.DataFrame({
+        "transaction_id": ids.astype(object),
+        "Store": stores[store_idx],
+        "Country": store_countries[store_idx],
+        "SKU": skus[sku_idx],
+        "Date": dates,
+        "Channel": channel,
+        "Promotion": promotion,
+        "Units Sold": units,
+        "Unit Price": unit_price,
+        "Discount": discount,
+        "Revenue": revenue,
+        "Margin %": margin_pct,
+        "Margin": margin,
+    }, columns=COLUMNS)
+
+
+def iter_sales_data(
+    rows=20_000, weeks=8, scenario="normal", stores=len(BASE_STORES),
+    skus=len(BASE_SKUS), seed=42, start_date="2025-01-06", chunk_rows=1_000_000,
+):
+    """
+    Yield the dataset as DataFrame chunks so 10M+ rows never need to
+    be held in memory at once.
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario '{scenario}'. Choose from {SCENARIOS}")
+
+    rng = np.random.default_rng(seed)
+    store_names, store_countries = build_stores(stores)
+    sku_names, sku_prices = build_skus(skus, rng)
+
+    produced = 0
+    while produced < rows:
+        n = min(chunk_rows, rows - produced)
+        yield generate_chunk(
+            rng, n, produced, weeks, scenario, store_names, store_countries,
+            sku_names, sku_prices, start_date,
+        )
+        produced += n
+
+
+def generate_sales_data(**kwargs) -> pd.DataFrame:
+    """
+    Generate the full dataset in memory (see iter_sales_data for options).
+    """
+    return pd.concat(list(iter_sales_data(**kwargs)), ignore_index=True)
+
+
+def write_sales_data(output, **kwargs):
+    """
+    Stream the dataset to CSV chunk by chunk. Returns rows written.
+    """
+    written = 0
+    for i, chunk in enumerate(iter_sales_data(**kwargs)):
+        chunk.to_csv(output, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        written += len(chunk)
+    return written
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic weekly sales data.")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="normal")
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--stores", type=int, default=len(BASE_STORES))
+    parser.add_argument("--skus", type=int, default=len(BASE_SKUS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-date", default="2025-01-06", help="Monday of the first week")
+    parser.add_argument("--output", default="synthetic_sales_data.csv")
+    args = parser.parse_args(argv)
+
+    if args.weeks < 2:
+        parser.error("--weeks must be at least 2 for week-over-week analysis")
+
+    rows = write_sales_data(
+        args.output,
+        rows=args.rows,
+        weeks=args.weeks,
+        scenario=args.scenario,
+        stores=args.stores,
+        skus=args.skus,
+        seed=args.seed,
+        start_date=args.start_date,
+    )
+    print(f"✅ Wrote {rows:,} rows ({args.scenario}, {args.weeks} weeks) to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
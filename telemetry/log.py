@@ -0,0 +1,162 @@
+# telemetry/log.py
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+
+# ============================================================
+# Logging Configuration (env-configurable)
+# ============================================================
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Fraction of verbose (DEBUG) payload logs that are actually emitted
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+# "json" for log aggregation, "text" for local development
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+ROOT_LOGGER = "insight"
+
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has — anything else came in via extra=
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id",
+}
+
+_listener = None
+
+
+# ============================================================
+# Record Enrichment & Formatting
+# ============================================================
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        entry.update({
+            k: v for k, v in vars(record).items()
+            if k not in _RESERVED_ATTRS
+        })
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = {k: v for k, v in vars(record).items() if k not in _RESERVED_ATTRS}
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+# ============================================================
+# Setup (queued, non-blocking handlers)
+# ============================================================
+def configure_logging(level=None, fmt=None, stream=None):
+    """
+    Route the "insight" logger tree through a QueueHandler so request
+    threads only enqueue records; a background QueueListener thread
+    does the formatting and the (blocking) write to stdout.
+    Safe to call more than once.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(TextFormatter() if (fmt or LOG_FORMAT) == "text" else JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers[:] = [queue_handler]
+    logger.setLevel(level or LOG_LEVEL)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return logger
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the listener thread.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def get_logger(name):
+    """
+    Module loggers live under "insight." so they share the queued handler.
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+# ============================================================
+# Sampled Verbose Payloads
+# ============================================================
+def log_sampled(logger, msg, payload, rate=None):
+    """
+    Emit a DEBUG record with a verbose payload for a sample of calls.
+
+    payload is a zero-argument callable, so expensive renders (df.head(),
+    week lists, generated code) are skipped entirely unless DEBUG is on
+    and this call wins the sample.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= (LOG_SAMPLE_RATE if rate is None else rate):
+        return
+    logger.debug(msg, extra={"payload": payload()})
+
+
+# Client-supplied ids are echoed in logs and profile file names
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9-]{1,64}")
+
+
+def new_request_id():
+    return f"{int(time.time() * 1000):x}-{random.getrandbits(32):08x}"
+
+
+def client_request_id(value):
+    """
+    The caller's X-Request-ID when it is a safe token, else a new id.
+    """
+    if value and REQUEST_ID_PATTERN.fullmatch(value):
+        return value
+    return new_request_id()
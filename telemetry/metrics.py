@@ -0,0 +1,286 @@
+# telemetry/metrics.py
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from telemetry.profiling import record_span
+
+# ============================================================
+# Minimal Prometheus-format Metrics (no external dependency)
+#
+# Metrics are per process. In multi-worker mode each gunicorn
+# worker exposes its own series on /metrics.
+# ============================================================
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+BYTES_BUCKETS = (
+    1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000,
+)
+
+
+# Set while work that is not user traffic runs (startup warmup);
+# copied into engine pool threads with the rest of the context
+_suppressed = contextvars.ContextVar("metrics_suppressed", default=False)
+
+
+@contextmanager
+def suppressed():
+    """
+    Counters and histograms ignore updates inside this block. Gauges
+    still move: they track current state, not traffic.
+    """
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        if self.kind == "counter" and _suppressed.get():
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_label_str(self.labelnames, key)} {_fmt(v)}"
+            for key, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        if _suppressed.get():
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self):
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                labels = _label_str(self.labelnames, key, [("le", _fmt(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _label_str(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_fmt(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ============================================================
+# Review Pipeline Metrics
+# ============================================================
+STAGE_SECONDS = Histogram(
+    "review_stage_seconds",
+    "Wall time per pipeline stage (csv_parse, prepare_data, engine functions, LLM calls, serialize).",
+    labelnames=("stage",),
+)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "End-to-end HTTP request latency.",
+    labelnames=("path", "status"),
+)
+
+RESPONSE_BYTES = Histogram(
+    "http_response_bytes",
+    "Response body size in bytes.",
+    labelnames=("path",),
+    buckets=BYTES_BUCKETS,
+)
+
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being processed.",
+)
+
+ROWS_INGESTED = Counter(
+    "review_rows_ingested_total",
+    "CSV rows parsed from uploads.",
+)
+
+CACHE_LOOKUPS = Counter(
+    "dataset_cache_lookups_total",
+    "Prepared-dataset cache lookups by layer (memory, shared_store) and result (hit, miss).",
+    labelnames=("layer", "result"),
+)
+
+COALESCED_REQUESTS = Counter(
+    "review_coalesced_requests_total",
+    "Requests served by joining an identical in-flight computation.",
+    labelnames=("endpoint",),
+)
+
+# ------------------------------------------------------------
+# Admission Control (admission/limits.py)
+# ------------------------------------------------------------
+ADMISSION_ACTIVE = Gauge(
+    "admission_active",
+    "Work currently holding a slot, per stage (requests, ingest, engines, custom_query, llm).",
+    labelnames=("stage",),
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Work waiting for a slot, per stage.",
+    labelnames=("stage",),
+)
+
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "Time spent waiting for a slot, per stage.",
+    labelnames=("stage",),
+)
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Work turned away per stage and reason (queue_full, timeout).",
+    labelnames=("stage", "reason"),
+)
+
+
+@contextmanager
+def timed(stage):
+    """
+    Record the wall time of a block (or, as a decorator, a function)
+    in review_stage_seconds{stage=...}.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def observe_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    record_span(stage, seconds)
+
+
+class StepTimer:
+    """
+    Times consecutive steps of one function without re-nesting it:
+    each mark() records the time since the previous mark as
+    review_stage_seconds{stage="<prefix>.<step>"}.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._last = time.perf_counter()
+
+    def mark(self, step):
+        now = time.perf_counter()
+        observe_stage(f"{self.prefix}.{step}", now - self._last)
+        self._last = now
@@ -0,0 +1,141 @@
+# telemetry/profiling.py
+
+import contextvars
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# ============================================================
+# Per-request Profiling (opt-in)
+#
+#   X-Profile: timing | cprofile | tracemalloc   (or ?profile=...)
+#
+# "timing" adds a per-stage breakdown to the response. The capture
+# modes also write a cProfile (.pstats) or tracemalloc (.tracemalloc)
+# snapshot to PROFILE_DIR for offline analysis — they are disabled
+# unless PROFILE_CAPTURE_ENABLED=1.
+# ============================================================
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".profiles")
+PROFILE_CAPTURE_ENABLED = os.getenv("PROFILE_CAPTURE_ENABLED", "0") == "1"
+
+PROFILE_MODES = ("timing", "cprofile", "tracemalloc")
+
+_active_spans = contextvars.ContextVar("profile_spans", default=None)
+
+# Set while a cProfile capture runs in this context
+_profiling_calls = contextvars.ContextVar("profiling_calls", default=False)
+
+# tracemalloc and the profiler hook are process-wide: one capture at a
+# time, concurrent requests fall back to timing
+_capture_lock = threading.Lock()
+
+
+def record_span(stage, seconds):
+    """
+    Called for every timed stage; a no-op unless a profile is active
+    in the current context.
+    """
+    spans = _active_spans.get()
+    if spans is not None:
+        spans.append((stage, seconds))
+
+
+def single_threaded():
+    """
+    True while a cProfile capture is active in the current context. The
+    profiler only hooks the thread that enabled it, so work that would
+    go to a pool should run inline instead (see engines/dag.py).
+    """
+    return _profiling_calls.get()
+
+
+def parse_profile_mode(value):
+    """
+    Normalize the header / query value. Returns None when profiling
+    was not requested.
+    """
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in ("0", "false", "off", "no"):
+        return None
+    return value if value in PROFILE_MODES else "timing"
+
+
+class RequestProfile:
+    def __init__(self, mode, request_id="-"):
+        self.mode = mode
+        self.request_id = request_id
+        self.spans = []
+        self.total_seconds = 0.0
+        self.dump_path = None
+        self.note = None
+
+        if mode in ("cprofile", "tracemalloc") and not PROFILE_CAPTURE_ENABLED:
+            self.mode = "timing"
+            self.note = f"{mode} capture disabled (set PROFILE_CAPTURE_ENABLED=1)"
+
+    @contextmanager
+    def capture(self):
+        token = _active_spans.set(self.spans)
+        profiler = None
+        started_tracemalloc = False
+
+        capturing = self.mode in ("cprofile", "tracemalloc")
+        if capturing and not _capture_lock.acquire(blocking=False):
+            self.note = f"{self.mode} capture skipped (another capture is in progress)"
+            self.mode = "timing"
+            capturing = False
+
+        try:
+            if self.mode == "cprofile":
+                profiler = cProfile.Profile()
+                calls_token = _profiling_calls.set(True)
+                profiler.enable()
+            elif self.mode == "tracemalloc" and not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+                started_tracemalloc = True
+
+            start = time.perf_counter()
+            try:
+                yield self
+            finally:
+                self.total_seconds = time.perf_counter() - start
+                _active_spans.reset(token)
+
+                if profiler is not None:
+                    profiler.disable()
+                    _profiling_calls.reset(calls_token)
+                    self.dump_path = self._dump_path("pstats")
+                    profiler.dump_stats(self.dump_path)
+                elif self.mode == "tracemalloc" and tracemalloc.is_tracing():
+                    self.dump_path = self._dump_path("tracemalloc")
+                    tracemalloc.take_snapshot().dump(self.dump_path)
+                    if started_tracemalloc:
+                        tracemalloc.stop()
+        finally:
+            if capturing:
+                _capture_lock.release()
+
+    def _dump_path(self, ext):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(PROFILE_DIR, f"{stamp}-{self.request_id}.{ext}")
+
+    def report(self):
+        report = {
+            "mode": self.mode,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "stages": [
+                {"stage": stage, "ms": round(seconds * 1000, 2)}
+                for stage, seconds in self.spans
+            ],
+        }
+        if self.dump_path:
+            report["dump"] = self.dump_path
+        if self.note:
+            report["note"] = self.note
+        return report
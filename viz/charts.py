@@ -1,22 +1,39 @@
 # viz/charts.py
 
+import os
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from viz.downsample import downsample_weekly_total
+
+# Driver charts show the N largest movers plus one "Other" bar (0 = all)
+CHART_TOP_N = int(os.getenv("CHART_TOP_N", "25"))
+
+# Driver charts with more entities than this switch to a WebGL dot plot
+CHART_WEBGL_MIN_POINTS = int(os.getenv("CHART_WEBGL_MIN_POINTS", "1000"))
+
+# More anomalies than this are marked by one overlay trace instead of arrows
+CHART_MAX_ANNOTATIONS = int(os.getenv("CHART_MAX_ANNOTATIONS", "20"))
+
 
 # =========================================================
 # Weekly Revenue Trend (with Anomaly Highlight)
 # =========================================================
-def plot_weekly_revenue(weekly_total, anomaly_result):
+def plot_weekly_revenue(weekly_total, anomaly_result, max_points=None):
     """
     Expects weekly_total to contain:
     - week
     - Revenue
+
+    Long histories are downsampled to max_points (default
+    CHART_MAX_POINTS), keeping extremes and anomalous weeks.
     """
 
     fig = px.line(
-        weekly_total,
+        downsample_weekly_total(weekly_total, max_points),
         x="week",
         y="Revenue",
         markers=True,
@@ -48,42 +65,109 @@ def plot_weekly_revenue(weekly_total, anomaly_result):
 
 
 # =========================================================
-# Country-level Drivers (WoW % with Annotations)
+# Driver Charts (WoW % per entity: Country, Channel, Store, SKU...)
 # =========================================================
-def plot_country_drivers(country_trends, anomaly_results):
+def top_movers(df, entity, top_n=None, keep=()):
     """
-    country_trends: list of dicts with Country + wow_pct
-    anomaly_results: output of anomaly_engine
+    The top_n rows with the largest |wow_pct| (plus any entity in keep),
+    in their original order, followed by one "Other (k)" row. Its WoW %
+    is revenue-weighted, derived from each row's Revenue and wow_pct
+    (rows without a usable wow_pct are left out of both weeks).
     """
-
-    if not country_trends:
-        return go.Figure()
-
-    df = pd.DataFrame(country_trends)
-
-    fig = px.bar(
-        df,
-        x="Country",
-        y="wow_pct",
-        title="Country-level Revenue Change (WoW %)",
-        labels={"wow_pct": "WoW % Change"},
-    )
-
-    # Annotate anomalous countries
-    for anomaly in anomaly_results.get("driver_anomalies", []):
-        fig.add_annotation(
-            x=anomaly["entity"],
-            y=anomaly["wow_pct"],
+    top_n = CHART_TOP_N if top_n is None else top_n
+    if top_n <= 0 or len(df) <= top_n:
+        return df
+
+    ranked = df["wow_pct"].abs().rank(method="first", ascending=False)
+    shown = (ranked <= top_n) | df[entity].isin(list(keep))
+    rest = df[~shown]
+    if rest.empty:
+        return df
+
+    other = {entity: f"Other ({len(rest)})"}
+    if "Revenue" in rest:
+        other["Revenue"] = rest["Revenue"].sum()
+        # Only rows whose previous revenue can be recovered (no prior
+        # week, or -100 % from zero, would skew one side of the ratio)
+        wow = rest["wow_pct"].astype(float)
+        comparable = rest[np.isfinite(wow) & (wow > -100)]
+        revenue = comparable["Revenue"].sum()
+        previous = (comparable["Revenue"] / (1 + comparable["wow_pct"] / 100)).sum()
+        other["wow_pct"] = (revenue / previous - 1) * 100 if previous else np.nan
+    else:
+        other["wow_pct"] = rest["wow_pct"].mean()
+
+    return pd.concat([df[shown], pd.DataFrame([other])], ignore_index=True)
+
+
+def _mark_anomalies_with_arrows(fig, points):
+    # One layout update for all arrows (add_annotation re-validates the layout each call)
+    fig.update_layout(annotations=[
+        dict(
+            x=x,
+            y=y,
             text="Anomaly",
             showarrow=True,
             arrowhead=2,
             arrowcolor="red",
             font=dict(color="red"),
         )
+        for x, y in points
+    ])
+
+
+def _anomaly_overlay(points, trace=go.Scatter, hover=None):
+    x, y = zip(*points) if points else ((), ())
+    return trace(
+        x=list(x),
+        y=list(y),
+        mode="markers",
+        marker=dict(color="red", size=10, symbol="diamond"),
+        name="Anomaly",
+        hovertext=hover,
+        hoverinfo="text+y" if hover else None,
+    )
+
+
+def plot_driver_changes(trends, entity, anomalies=(), top_n=None, title=None):
+    """
+    trends: list of dicts with <entity> + wow_pct (+ Revenue)
+    anomalies: driver anomalies ({"entity", "wow_pct"[, "dimension"]})
+
+    Beyond top_n entities the rest collapse into "Other"; beyond
+    CHART_WEBGL_MIN_POINTS bars the chart becomes a WebGL dot plot
+    ranked by WoW %.
+    """
+
+    if not trends:
+        return go.Figure()
+
+    title = title or f"{entity}-level Revenue Change (WoW %)"
+    anomalies = [a for a in anomalies if a.get("dimension", entity) == entity]
+
+    df = top_movers(pd.DataFrame(trends), entity, top_n, keep=[a["entity"] for a in anomalies])
+
+    if len(df) > CHART_WEBGL_MIN_POINTS:
+        fig = _plot_dense_drivers(df, entity, anomalies, title)
+    else:
+        fig = px.bar(
+            df,
+            x=entity,
+            y="wow_pct",
+            title=title,
+            labels={"wow_pct": "WoW % Change"},
+        )
+
+        points = [(a["entity"], a["wow_pct"]) for a in anomalies]
+        if len(points) > CHART_MAX_ANNOTATIONS:
+            fig.add_trace(_anomaly_overlay(points))
+        elif points:
+            _mark_anomalies_with_arrows(fig, points)
+
+        fig.update_layout(xaxis_title=entity)
 
     fig.update_layout(
         template="plotly_white",
-        xaxis_title="Country",
         yaxis_title="WoW % Change",
         showlegend=False,
     )
@@ -91,32 +175,69 @@ def plot_country_drivers(country_trends, anomaly_results):
     return fig
 
 
+def _plot_dense_drivers(df, entity, anomalies, title):
+    """
+    One Scattergl trace of entities sorted by WoW % (x = rank), plus
+    one trace for all anomalies; names are in the hover text.
+    """
+    ranked = df.sort_values("wow_pct", ascending=False, ignore_index=True)
+    names = ranked[entity].astype(str)
+
+    fig = go.Figure(go.Scattergl(
+        x=np.arange(1, len(ranked) + 1),
+        y=ranked["wow_pct"].to_numpy(),
+        mode="markers",
+        marker=dict(size=4),
+        hovertext=names.to_numpy(),
+        hoverinfo="text+y",
+        name=entity,
+    ))
+
+    position = pd.Series(np.arange(1, len(ranked) + 1), index=names)
+    flagged = [str(a["entity"]) for a in anomalies if str(a["entity"]) in position.index]
+    if flagged:
+        fig.add_trace(_anomaly_overlay(
+            [(position[name], ranked["wow_pct"].iloc[position[name] - 1]) for name in flagged],
+            trace=go.Scattergl,
+            hover=flagged,
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=f"{entity} (ranked by WoW %, {len(ranked):,} total)",
+    )
+    return fig
+
+
 # =========================================================
-# Channel-level Revenue Trends (WoW %)
+# Country-level Drivers (WoW % with Annotations)
 # =========================================================
-def plot_channel_trends(channel_trends):
+def plot_country_drivers(country_trends, anomaly_results, top_n=None):
     """
-    channel_trends: list of dicts with Channel + wow_pct
+    country_trends: list of dicts with Country + wow_pct
+    anomaly_results: output of anomaly_engine
     """
 
-    if not channel_trends:
-        return go.Figure()
+    return plot_driver_changes(
+        country_trends,
+        "Country",
+        anomalies=anomaly_results.get("driver_anomalies", []),
+        top_n=top_n,
+        title="Country-level Revenue Change (WoW %)",
+    )
 
-    df = pd.DataFrame(channel_trends)
 
-    fig = px.bar(
-        df,
-        x="Channel",
-        y="wow_pct",
-        title="Channel-level Revenue Change (WoW %)",
-        labels={"wow_pct": "WoW % Change"},
-    )
+# =========================================================
+# Channel-level Revenue Trends (WoW %)
+# =========================================================
+def plot_channel_trends(channel_trends, top_n=None):
+    """
+    channel_trends: list of dicts with Channel + wow_pct
+    """
 
-    fig.update_layout(
-        template="plotly_white",
-        xaxis_title="Channel",
-        yaxis_title="WoW % Change",
-        showlegend=False,
+    return plot_driver_changes(
+        channel_trends,
+        "Channel",
+        top_n=top_n,
+        title="Channel-level Revenue Change (WoW %)",
     )
-
-    return fig
@@ -0,0 +1,143 @@
+# viz/downsample.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Points per plotted series; longer series are downsampled to this
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "500"))
+
+
+# =========================================================
+# Largest-Triangle-Three-Buckets (LTTB)
+# =========================================================
+def lttb_indices(x, y, target):
+    """
+    Positions of the target points LTTB keeps from (x, y): the first
+    and last point, plus per bucket the point spanning the largest
+    triangle with its neighbours. x must be increasing.
+    """
+    n = len(y)
+    if target >= n or n <= 2:
+        return np.arange(n)
+    if target <= 2:
+        return np.array([0, n - 1])
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Interior points split into target - 2 buckets
+    edges = np.linspace(1, n - 1, target - 1).astype(int)
+    kept = np.empty(target, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+
+    previous = 0
+    for b in range(target - 2):
+        start, stop = edges[b], edges[b + 1]
+
+        # Third corner: mean of the next bucket (the last point for the final one)
+        if b + 2 < len(edges):
+            next_start, next_stop = stop, edges[b + 2]
+        else:
+            next_start, next_stop = n - 1, n
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[b + 1] = previous
+
+    return kept
+
+
+def _numeric_axis(x):
+    """
+    x as floats for triangle areas: dates as timestamps, anything
+    non-numeric (week labels) as its position.
+    """
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype("int64").to_numpy(dtype=float)
+    if pd.api.types.is_numeric_dtype(x):
+        return x.to_numpy(dtype=float)
+    parsed = pd.to_datetime(x, errors="coerce")
+    if parsed.notna().all():
+        return parsed.astype("int64").to_numpy(dtype=float)
+    return np.arange(len(x), dtype=float)
+
+
+def downsample_indices(x, y, max_points=None, keep=None):
+    """
+    Sorted positions to plot: at most max_points (default
+    CHART_MAX_POINTS), always including the minimum, the maximum and
+    the positions flagged in keep (boolean mask or positions), which
+    win over the cap if they alone exceed it.
+    """
+    max_points = CHART_MAX_POINTS if max_points is None else max_points
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+
+    y = pd.Series(y).to_numpy(dtype=float)
+    finite = np.isfinite(y)
+    filled = np.where(finite, y, np.nanmean(y) if finite.any() else 0.0)
+
+    must = set()
+    if finite.any():
+        must.update((int(np.nanargmin(y)), int(np.nanargmax(y))))
+    if keep is not None:
+        keep = np.asarray(keep)
+        must.update(int(i) for i in (np.flatnonzero(keep) if keep.dtype == bool else keep))
+    must -= {0, n - 1}
+
+    kept = lttb_indices(_numeric_axis(x), filled, max(max_points - len(must), 2))
+    return np.union1d(kept, np.fromiter(must, dtype=int, count=len(must)))
+
+
+def downsample_frame(df, x, y, max_points=None, keep=None):
+    """
+    Rows of df chosen by downsample_indices on columns x, y
+    (df unchanged when it already fits).
+    """
+    if len(df) <= (CHART_MAX_POINTS if max_points is None else max_points):
+        return df
+    return df.iloc[downsample_indices(df[x], df[y], max_points, keep)]
+
+
+# =========================================================
+# Weekly Revenue Series
+# =========================================================
+def weekly_anomaly_mask(weekly_total, threshold=2):
+    """
+    Weeks whose revenue_wow_pct z-score reaches the overall anomaly
+    threshold (engines/anomaly_engine.py), plus the latest week.
+    """
+    from engines.anomaly_engine import compute_z_score
+
+    mask = np.zeros(len(weekly_total), dtype=bool)
+    if len(weekly_total):
+        mask[-1] = True
+    if "revenue_wow_pct" in weekly_total:
+        series = weekly_total["revenue_wow_pct"].reset_index(drop=True).dropna()
+        if len(series) >= 4:
+            z = compute_z_score(series)
+            mask[z.index[z.abs() >= threshold]] = True
+    return mask
+
+
+def downsample_weekly_total(weekly_total, max_points=None):
+    """
+    weekly_total (week, Revenue, ...) capped at max_points, keeping
+    extremes and anomalous weeks.
+    """
+    return downsample_frame(
+        weekly_total,
+        x="week",
+        y="Revenue",
+        max_points=max_points,
+        keep=weekly_anomaly_mask(weekly_total),
+    )
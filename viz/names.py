@@ -0,0 +1,23 @@
+# viz/names.py
+
+# Plain data only: imported by api/routes/charts.py, which must not
+# load plotly / pandas until a chart is actually drawn (viz/specs.py).
+
+
+# =========================================================
+# Charts and the Review Sections They Are Built From
+# =========================================================
+CHART_FIELDS = {
+    "weekly_revenue": ("weekly_total", "overall_anomaly"),
+    "country_drivers": ("country_trends", "driver_anomalies"),
+    "channel_trends": ("channel_trends",),
+}
+
+CHART_NAMES = tuple(CHART_FIELDS)
+
+
+def chart_fields(charts):
+    """
+    /review/full fields needed to draw the given charts.
+    """
+    return tuple(sorted({field for chart in charts for field in CHART_FIELDS[chart]}))
@@ -0,0 +1,82 @@
+# viz/specs.py
+
+import json
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from viz.charts import (
+    plot_weekly_revenue,
+    plot_country_drivers,
+    plot_channel_trends,
+)
+from viz.names import CHART_NAMES
+
+# Template every chart in viz/charts.py is drawn with
+CHART_TEMPLATE = "plotly_white"
+
+
+def build_figures(review, charts=CHART_NAMES, max_points=None, top_n=None):
+    """
+    Plotly figures from a /review/full response (or the subset of it
+    named by chart_fields).
+    """
+    trends = review.get("trends", {})
+    anomalies = review.get("anomalies", {})
+
+    builders = {
+        "weekly_revenue": lambda: plot_weekly_revenue(
+            weekly_total=pd.DataFrame(trends["weekly_total"]),
+            anomaly_result=anomalies["overall_anomaly"],
+            max_points=max_points,
+        ),
+        "country_drivers": lambda: plot_country_drivers(
+            country_trends=trends["country_trends"],
+            anomaly_results=anomalies,
+            top_n=top_n,
+        ),
+        "channel_trends": lambda: plot_channel_trends(
+            channel_trends=trends["channel_trends"],
+            top_n=top_n,
+        ),
+    }
+    return {chart: builders[chart]() for chart in charts}
+
+
+# =========================================================
+# Compact Figure JSON
+# =========================================================
+def figure_spec(fig):
+    """
+    {"data", "layout"} as Plotly.js takes them, without trace uids or
+    the layout template (sent once per response, see template_spec).
+    """
+    spec = json.loads(pio.to_json(fig, validate=False, remove_uids=True))
+    spec["layout"].pop("template", None)
+    return spec
+
+
+def template_spec():
+    """
+    The shared template, for layout.template on the client.
+    """
+    blank = go.Figure(layout={"template": CHART_TEMPLATE})
+    return json.loads(pio.to_json(blank, validate=False))["layout"]["template"]
+
+
+def chart_specs(review, charts=CHART_NAMES, max_points=None, top_n=None, include_template=True):
+    """
+    Response body for the chart-spec endpoint.
+    """
+    body = {
+        "analysis_week": review["analysis_week"],
+        "charts": {
+            chart: figure_spec(fig)
+            for chart, fig in build_figures(review, charts, max_points, top_n).items()
+        },
+    }
+    if include_template:
+        body["template"] = template_spec()
+    return body
+